@@ -85,8 +85,7 @@ class StreamHandler(BaseBusHandler):
 
     async def _read(self, n):
         async for m in self._stream:
-            for b in m:
-                self._bus.char_in(b)
+            self._bus.data_in(m)
         n.cancel_scope.cancel()
 
     async def _write(self):
@@ -9,6 +9,9 @@ We do not reverse the actual input.
 
 from __future__ import annotations
 
+import sys
+from array import array
+
 
 def _bitrev(x, n):
     y = 0
@@ -27,6 +30,37 @@ def _bytecrc_r(crc, poly, depth):
     return crc
 
 
+# (poly, depth) => lookup table; shared by all instances
+_tables: dict[tuple[int, int], list[int]] = {}
+
+
+def _get_table(poly, depth):
+    try:
+        return _tables[poly, depth]
+    except KeyError:
+        pass
+    table = [_bytecrc_r(b, poly, depth) for b in range(1 << depth)]
+    _tables[poly, depth] = table
+    return table
+
+
+# poly => table for two bytes at a time
+_tables16: dict[int, array] = {}
+
+
+def _get_table16(poly):
+    try:
+        return _tables16[poly]
+    except KeyError:
+        pass
+    t0 = _get_table(poly, 8)
+    t1 = [(v >> 8) ^ t0[v & 0xFF] for v in t0]
+    # compact storage is friendlier to the CPU cache than a list of ints
+    table = array("L", (t1[i & 0xFF] ^ t0[i >> 8] for i in range(1 << 16)))
+    _tables16[poly] = table
+    return table
+
+
 class _CRCmeta(type):
     def __new__(typ, name, bases, dct):
         poly = dct.get("_poly", None)
@@ -38,13 +72,16 @@ class _CRCmeta(type):
         # poly = _bitrev(poly, width)
 
         cls = super().__new__(typ, name, bases, dct)
+        if cls._depth is not None:
+            _get_table(poly, cls._depth)
         return cls
 
 
 class _CRC(metaclass=_CRCmeta):
-    _table = None  # filled by metaclasse
+    _table = None  # shared per polynomial and depth, see `_get_table`
     _width = None  # degree of polynomial
     _poly = None  # non-reversed polynomial, no 2^_width term!
+    _depth = None  # default number of bits per table lookup
 
     """
     Simple CRC update function. @n is the bit length of the input.
@@ -55,10 +92,7 @@ class _CRC(metaclass=_CRCmeta):
         if bits is None:
             bits = self._depth
         self._bits = bits
-        self._table = table = []
-        poly = self._poly
-        for b in range(1 << bits):
-            table.append(_bytecrc_r(b, poly, bits))
+        self._table = _get_table(self._poly, bits)
 
     def reset(self):
         self.crc = 0
@@ -73,6 +107,42 @@ class _CRC(metaclass=_CRCmeta):
             self.crc >> self._bits
         )
 
+    def update_buf(self, buf):
+        """
+        Mix a buffer of bytes into the CRC.
+
+        Equal to, but much faster than, calling `crc.update_n(b,8)` for
+        each byte. This works regardless of `self._bits`.
+        """
+        t = _get_table(self._poly, 8) if self._bits != 8 else self._table
+        crc = self.crc
+        for b in buf:
+            crc = t[(b ^ crc) & 0xFF] ^ (crc >> 8)
+        self.crc = crc
+
+    def update_buf2(self, buf):
+        """
+        Like `update_buf`, but processes two bytes per table lookup.
+
+        The table has 65536 entries and is built when first used. In
+        CPython this only pays off for long buffers; ``moat util bench
+        bus.crc`` compares the variants.
+        """
+        t = _get_table16(self._poly)
+        crc = self.crc
+        n = len(buf)
+        end = n & ~1
+        words = array("H")
+        words.frombytes(buf[:end])
+        if sys.byteorder == "big":
+            words.byteswap()
+        for w in words:
+            crc = t[(crc ^ w) & 0xFFFF] ^ (crc >> 16)
+        if end < n:
+            t = _get_table(self._poly, 8)
+            crc = t[(buf[end] ^ crc) & 0xFF] ^ (crc >> 8)
+        self.crc = crc
+
     def update_n(self, data, bits):
         """
         Mix an n-bit data word into the CRC.
@@ -243,6 +243,18 @@ class BusMessage:  # noqa:D101
         if self.code is None:
             self._gen_code()
 
+    def add_bytes(self, data: bytes):
+        """
+        Feed a number of bytes into this buffer.
+
+        This is equivalent to, but faster than, calling
+        ``add_chunk(b, 8)`` for each byte.
+        """
+        self._data.append(BitArray(bytes=data))
+
+        if self.code is None:
+            self._gen_code()
+
     def add_written(self, data):
         """
         Feed data into this buffer. (The buffer should initially be new.)
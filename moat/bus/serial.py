@@ -56,6 +56,7 @@ class SerBus:
     * send (msg)         -- send a message with priority (or not).
     * send_ack ()        -- ack a message
     * char_in (bits)     -- received this character from serial/pipe
+    * data_in (bytes)    -- received these characters from serial/pipe
     * timeout()          -- when the timer triggers
     """
 
@@ -222,6 +223,32 @@ class SerBus:
             # ugh, overflow?
             self.report_error(ERR.OVERFLOW)
 
+    def data_in(self, buf: bytes):
+        """
+        process a chunk of incoming serial data
+
+        This is equivalent to calling `char_in` for each byte, but a
+        message's payload is checksummed and stored in one go.
+        """
+        i = 0
+        n = len(buf)
+        while i < n:
+            if self.s_in != S.DATA:
+                self.char_in(buf[i])
+                i += 1
+                continue
+
+            self.idle = 0
+            j = min(n, i + self.len_in)
+            chunk = buf[i:j]
+            self.m_in.add_bytes(chunk)
+            self.crc_in.update_buf(chunk)
+            self.len_in -= j - i
+            i = j
+            if self.len_in == 0:
+                self.s_in = S.CRC1
+                self.crc_in = self.crc_in.finish()
+
     def send_data(self, msg) -> bytes:
         """
         Generate chunk of bytes to send for this message.
@@ -237,14 +264,12 @@ class SerBus:
 
         crc = CRC16()
         h = msg.header.bytes
-        for b in h:
-            crc.update(b)
-            res.append(b)
+        crc.update_buf(h)
+        res += h
 
         d = msg.data
-        for b in d:
-            crc.update(b)
-            res.append(b)
+        crc.update_buf(d)
+        res += d
 
         crc = crc.finish()
         res.append(crc >> 8)
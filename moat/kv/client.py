@@ -451,14 +451,9 @@ class Client:
     async def dh_secret(self, length=1024):
         """Exchange a diffie-hellman secret with the server"""
         if self._dh_key is None:
-            from moat.lib.diffiehellman import DiffieHellman  # noqa: PLC0415
+            from moat.lib.diffiehellman.pool import new_key  # noqa: PLC0415
 
-            def gen_key():
-                k = DiffieHellman(key_length=length, group=(5 if length < 32 else 14))
-                k.generate_public_key()
-                return k
-
-            k = await anyio.to_thread.run_sync(gen_key)
+            k = await anyio.to_thread.run_sync(new_key, length)
             res = await self._request(
                 "diffie_hellman",
                 pubkey=num2byte(k.public_key),
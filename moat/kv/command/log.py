@@ -32,13 +32,17 @@ async def dest(obj, path, incremental):
 
 @cli.command()
 @click.option("-f", "--full", is_flag=1, help="Also dump internal state")
+@click.option("-s", "--snapshot", is_flag=True, help="Write an indexed snapshot")
 @click.argument("path", nargs=1)
 @click.pass_obj
-async def save(obj, path, full):
+async def save(obj, path, full, snapshot):
     """
     Write the server's current state to a file.
+
+    A snapshot loads faster than a plain log. Load it before any
+    incremental log that continues from it.
     """
-    res = await obj.client._request("save", path=path, full=full)  # noqa:SLF001
+    res = await obj.client._request("save", path=path, full=full, snapshot=snapshot)  # noqa:SLF001
     if obj.meta:
         yprint(res, stream=obj.stdout)
 
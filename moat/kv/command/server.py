@@ -11,8 +11,8 @@ from moat.kv.server import Server
     "-l",
     "--load",
     type=click.Path(readable=True, exists=True, allow_dash=False),
-    default=None,
-    help="Event log to preload.",
+    multiple=True,
+    help="Snapshot or event log to preload. Repeat to load a log on top of a snapshot.",
 )
 @click.option(
     "-s",
@@ -94,8 +94,8 @@ async def cli(obj, name, load, save, init, incremental, eval_, auth, force, node
 
     async with as_service(obj) as evt:
         s = Server(name, cfg=obj.cfg["kv"], **kw)
-        if load is not None:
-            await s.load(path=load, local=True, authoritative=auth)
+        for i, path in enumerate(load):
+            await s.load(path=path, local=True, authoritative=auth and i == len(load) - 1)
         if nodes:
             await s.fetch_data(nodes, authoritative=auth)
 
@@ -6,6 +6,7 @@ TODO: message chains should be refactored to arrays: much lower overhead.
 
 from __future__ import annotations
 
+import struct
 import weakref
 from logging import getLogger
 
@@ -557,9 +558,48 @@ class NodeEvent:  ## no __hash__
         return self
 
 
+def _map_split(data: bytes) -> tuple[int, bytes]:
+    # split an encoded msgpack map into its length and its items
+    b = data[0]
+    if b & 0xF0 == 0x80:
+        return b & 0x0F, data[1:]
+    if b == 0xDE:
+        return struct.unpack_from(">H", data, 1)[0], data[3:]
+    if b == 0xDF:
+        return struct.unpack_from(">I", data, 1)[0], data[5:]
+    raise ValueError(f"Not a map: {data[:8]!r}")
+
+
+def encode_items(codec, items: dict) -> tuple[int, bytes]:
+    """
+    Encode the key/value pairs of @items with the msgpack @codec.
+
+    The result can be appended to an encoded map with `extend_map`.
+    """
+    return _map_split(codec.encode(items))
+
+
+def extend_map(data: bytes, *items: tuple[int, bytes]) -> bytes:
+    """
+    Add key/value pairs, as returned by `encode_items`, to the encoded
+    msgpack map @data. The keys must not already be present.
+    """
+    n, res = _map_split(data)
+    for k, d in items:
+        n += k
+        res += d
+    if n < 16:
+        return bytes((0x80 | n,)) + res
+    if n < 0x10000:
+        return struct.pack(">BH", 0xDE, n) + res
+    return struct.pack(">BI", 0xDF, n) + res
+
+
 class UpdateEvent:
     """Represents an event which updates something."""
 
+    _ser_cache = None
+
     def __init__(self, event: NodeEvent, entry: Entry, new_value, old_value=NotGiven, tock=None):
         self.event = event
         self.entry = entry
@@ -606,6 +646,41 @@ class UpdateEvent:
         res.tock = self.entry.tock
         return res
 
+    def encode_entry(self, codec, chop_path=0, nchain=2, conv=None, stats=None):
+        """Serialize this event's entry for a watcher, and encode it
+        with the msgpack @codec.
+
+        All watchers that see this event share the result, so the entry
+        is only serialized and encoded once per set of arguments.
+
+        Returns a new dict with the entry's path and tock, which the
+        caller may modify, and the encoded value and change chain as
+        arguments to `extend_map`. The value is `None` if the entry has
+        been deleted.
+
+        @stats, if given, counts cache ``hits`` and ``misses``.
+        """
+        key = (nchain, conv, chop_path)
+        cache = self._ser_cache
+        if cache is None:
+            cache = self._ser_cache = {}
+        try:
+            path, tock, value, rest = cache[key]
+        except KeyError:
+            if stats is not None:
+                stats.misses += 1
+            res = self.entry.serialize(chop_path=chop_path, nchain=nchain, conv=conv)
+            path = res.pop("path")
+            tock = res.pop("tock")
+            value = res.pop("value", NotGiven)
+            value = None if value is NotGiven else encode_items(codec, {"value": value})
+            rest = encode_items(codec, res)
+            cache[key] = path, tock, value, rest
+        else:
+            if stats is not None:
+                stats.hits += 1
+        return attrdict(path=path, tock=tock), value, rest
+
     @classmethod
     def deserialize(cls, root, msg, cache, nulls_ok=False, conv=None):  # noqa:D102
         if conv is None:
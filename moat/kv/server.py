@@ -52,6 +52,7 @@ from moat.util import (
     num2byte,
     run_tcp_server,
 )
+from moat.lib.diffiehellman.pool import KeyPool
 
 from . import _version_tuple
 from . import client as moat_kv_client  # needs to be mock-able
@@ -67,7 +68,8 @@ from .exceptions import (
     ServerConnectionError,
     ServerError,
 )
-from .model import Node, NodeEvent, NodeSet, UpdateEvent, Watcher
+from .model import Entry, Node, NodeEvent, NodeSet, UpdateEvent, Watcher, extend_map
+from .snapshot import Snapshot, is_snapshot, write_snapshot
 from .types import ACLFinder, ACLStepper, ConvNull, NullACL, RootEntry
 
 from typing import TYPE_CHECKING, Any
@@ -196,6 +198,11 @@ class StreamCommand:
 
     async def send(self, **msg):
         """Send a message to the client."""
+        await self.send_raw((), **msg)
+
+    async def send_raw(self, raw, /, **msg):
+        """Send a message to the client, with pre-encoded items @raw
+        (see `ServerClient.send`)."""
         msg["seq"] = self.seq
         if not self.multiline:
             if self.multiline is None:
@@ -206,7 +213,7 @@ class StreamCommand:
         try:
             if self.dw is not None:
                 msg["wseq"] = await self.dw.next_seq()
-            await self.client.send(msg)
+            await self.client.send(msg, raw)
         except ClosedResourceError:
             self.client.logger.info("OERR %d", self.client._client_nr)  # noqa: SLF001
 
@@ -608,15 +615,16 @@ class SCmd_watch(StreamCommand):
                         a.block("r")
                     a = a.step(p)
                 else:
-                    res = m.entry.serialize(
+                    res, value, rest = m.encode_entry(
+                        client.server.codec,
                         chop_path=client._chop_path,  # noqa: SLF001
                         nchain=nchain,
                         conv=conv,
+                        stats=client.server.watch_ser,
                     )
                     shorter(res)
-                    if not a.allows("r"):
-                        res.pop("value", None)
-                    await self.send(**res)
+                    raw = (rest,) if value is None or not a.allows("r") else (value, rest)
+                    await self.send_raw(raw, **res)
 
 
 class SCmd_msg_monitor(StreamCommand):
@@ -764,18 +772,15 @@ class ServerClient:
     async def cmd_diffie_hellman(self, msg):  # noqa: D102
         if self._dh_key:
             raise RuntimeError("Can't call dh twice")
-        from moat.lib.diffiehellman import DiffieHellman  # noqa: PLC0415
 
         def gen_key():
-            length = msg.get("length", 1024)
-            k = DiffieHellman(key_length=length, group=(5 if length < 32 else 14))
-            k.generate_public_key()
             k.generate_shared_secret(byte2num(msg.pubkey))
             self._dh_key = num2byte(k.shared_secret)[0:32]
-            return k
 
         async with self.server.crypto_limiter:
-            k = await anyio.to_thread.run_sync(gen_key)
+            # Only pool the lengths we asked for. This is not authenticated.
+            k = await self.server.dh_pool.get(msg.get("length", 1024), want=False)
+            await anyio.to_thread.run_sync(gen_key)
         return {"pubkey": num2byte(k.public_key)}
 
     cmd_diffie_hellman.noAuth = True
@@ -1144,7 +1149,7 @@ class ServerClient:
 
     async def cmd_save(self, msg):  # noqa: D102
         full = msg.get("full", False)
-        await self.server.save(path=msg.path, full=full)
+        await self.server.save(path=msg.path, full=full, snapshot=msg.get("snapshot", False))
 
         return True
 
@@ -1175,7 +1180,13 @@ class ServerClient:
         msg.path = (None, "auth")
         return await self.cmd_set_value(msg, _nulls_ok=True)
 
-    async def send(self, msg):  # noqa: D102
+    async def send(self, msg, raw=()):
+        """
+        Send @msg to the client.
+
+        @raw contains key/value pairs that have already been encoded,
+        see `UpdateEvent.encode_entry`. They're added to the message.
+        """
         self.logger.debug("OUT%d %s", self._client_nr, msg)
         if self._send_lock is None:
             return
@@ -1187,7 +1198,10 @@ class ServerClient:
             if "tock" not in msg:
                 msg["tock"] = self.server.tock
             try:
-                await self.stream.send(self.codec.encode(msg))
+                data = self.codec.encode(msg)
+                if raw:
+                    data = extend_map(data, *raw)
+                await self.stream.send(data)
             except ClosedResourceError:
                 self.logger.info("ERO%d %r", self._client_nr, msg)
                 self._send_lock = None
@@ -1392,6 +1406,7 @@ class Server:
     sending_missing = None
     ports = None
     _tock = 0
+    _local_data = False  # data only come from local files
 
     def __init__(self, name: str, cfg: dict | None = None, init: Any = NotGiven):
         self.codec = get_codec("std-msgpack")
@@ -1410,7 +1425,11 @@ class Server:
         self.node = Node(name, None, cache=self.node_cache)
 
         self._init = init
+        # hits and misses of the watchers' shared encoding cache
+        self.watch_ser = attrdict(hits=0, misses=0)
         self.crypto_limiter = anyio.Semaphore(3)
+        self.dh_pool = KeyPool(self.cfg.server.dh_pool)
+        self.dh_pool.want(1024)
         self.logger = logging.getLogger("moat.kv.server." + name)
         self._delete_also_nodes = NodeSet()
 
@@ -1735,7 +1754,9 @@ class Server:
             res.node_drop = list(self.node_drop)
         if debug:
             nd = res.debug = attrdict()
-            # TODO insert some debugging info
+            # TODO insert more debugging info
+            nd.watch_ser = attrdict(self.watch_ser)
+            nd.dh_pool = self.dh_pool.stats
 
         if debugger:
             try:
@@ -2233,6 +2254,7 @@ class Server:
         if self.node.tick is not None:
             self.logger.debug("Ready")
             self._ready.set()
+            self._local_data = False
             await self._set_tock()
         else:
             # self.logger.debug("Not yet ready.")
@@ -2395,6 +2417,7 @@ class Server:
         stream: io.IOBase | None = None,
         local: bool = False,
         authoritative: bool = False,
+        bulk: bool = True,
     ):
         """Load data from this stream
 
@@ -2402,38 +2425,157 @@ class Server:
           ``fd``: The stream to read.
           ``local``: Flag whether this file contains initial data and thus
                      its contents shall not be broadcast. Don't set this if
-                     the server is already operational.
+                     the server is already operational. You may load
+                     more than one local file, e.g. a snapshot and then
+                     the log that continues it.
+
+        If @path is a snapshot (see `moat.kv.snapshot`), it is decoded
+        in worker threads. Load the incremental log afterwards.
+
+        Local files are loaded in batches (see `_load_batch`) unless
+        @bulk is cleared or the server is paranoid.
         """
         longer = PathLongener(())
 
-        if local and self.node.tick is not None:
+        if local and self.node.tick is not None and not self._local_data:
             raise RuntimeError("This server already has data.")
         elif not local and self.node.tick is None:
             raise RuntimeError("This server is not yet operational.")
+        bulk = bulk and local and self.paranoid_root is None and not self.root.monitors
+        if path is not None and path != "-" and await anyio.to_thread.run_sync(is_snapshot, path):
+            await self._load_snapshot(path, bulk=bulk)
+        else:
+            await self._load_stream(path, stream, longer, bulk=bulk)
+        if local:
+            self._local_data = True
+
+        if authoritative:
+            self._discard_all_missing()
+
+        self.logger.debug("Loading finished.")
+
+    async def _load_entry(self, m):
+        if "tock" in m:
+            await self.tock_seen(m.tock)
+        else:
+            m.tock = self.tock
+        m = UpdateEvent.deserialize(self.root, m, cache=self.node_cache, nulls_ok=True)
+        await self.tock_seen(m.tock)
+        await m.entry.apply(m, server=self, root=self.paranoid_root, loading=True)
+
+    async def _load_batch(self, msgs: list[attrdict]):
+        """
+        Apply a batch of entries from a local file.
+
+        Nobody watches the tree while it's loaded, so entries that are
+        new and don't have a special type are set directly, bypassing
+        `Entry.apply`'s chain resolution and watcher notification. The
+        tock value is updated once per batch. Anything else, including
+        deletions, is loaded via `_load_entry`.
+        """
+        tock = 0
+        for m in msgs:
+            t = m.get("tock", None)
+            if t is not None and t > tock:
+                tock = t
+        await self.tock_seen(tock)
+
+        root = self.root
+        cache = self.node_cache
+        for m in msgs:
+            if "tock" not in m:
+                m.tock = self.tock
+            entry = root.follow(m.path, create=True, nulls_ok=True)
+            if (
+                "value" not in m  # deleted: needs tombstone tracking
+                or entry.chain is not None
+                or entry.data is not NotGiven
+                or type(entry).set is not Entry.set
+                or (evt := NodeEvent.deserialize(m, cache=cache)) is None
+            ):
+                await self._load_entry(m)
+                continue
+
+            entry._data = m.value  # noqa:SLF001
+            entry.tock = m.tock
+            entry.chain = evt
+            for n, t in entry.chain_links():
+                n.seen(t, entry)
+
+    async def _load_snapshot(self, path: str, threads: int = 4, bulk: bool = False):
+        """
+        Load a snapshot file.
+
+        Blocks are decoded by up to @threads worker threads, ahead of
+        applying them here.
+        """
+        snap = await anyio.to_thread.run_sync(Snapshot, path)
+        try:
+            await self._process_info(snap.info)
+
+            nb = len(snap.blocks)
+            res: list[list | None] = [None] * nb
+            done = [anyio.Event() for _ in range(nb)]
+            ahead = anyio.Semaphore(2 * threads)
+            limiter = anyio.CapacityLimiter(threads)
+
+            async def decode(i):
+                try:
+                    res[i] = await anyio.to_thread.run_sync(snap.block, i, limiter=limiter)
+                finally:
+                    done[i].set()
+
+            async with anyio.create_task_group() as tg:
+
+                async def feeder():
+                    for i in range(nb):
+                        await ahead.acquire()
+                        tg.start_soon(decode, i)
+
+                tg.start_soon(feeder)
+                for i in range(nb):
+                    await done[i].wait()
+                    ms, res[i] = res[i], None
+                    ahead.release()
+                    if ms is None:
+                        raise RuntimeError(f"Snapshot {path}: block {i} not decoded")
+                    if bulk:
+                        await self._load_batch(ms)
+                    else:
+                        for m in ms:
+                            await self._load_entry(m)
+        finally:
+            snap.close()
+
+    async def _load_stream(self, path, stream, longer, bulk: bool = False):
+        batch = []
         async with MsgReader(path=path, stream=stream, codec="std-msgpack") as rdr:
             async for m in rdr:
                 if m is None:
                     continue
-                if "value" in m:
+                if "value" in m or ("path" in m and "tock" in m):
+                    # an entry, or a deleted entry's tombstone
                     longer(m)
-                    if "tock" in m:
-                        await self.tock_seen(m.tock)
-                    else:
-                        m.tock = self.tock
-                    m = UpdateEvent.deserialize(self.root, m, cache=self.node_cache, nulls_ok=True)  # noqa:PLW2901
-                    await self.tock_seen(m.tock)
-                    await m.entry.apply(m, server=self, root=self.paranoid_root, loading=True)
-                elif "info" in m:
+                    if not bulk:
+                        await self._load_entry(m)
+                        continue
+                    batch.append(m)
+                    if len(batch) >= 1000:
+                        await self._load_batch(batch)
+                        batch = []
+                    continue
+
+                if batch:
+                    await self._load_batch(batch)
+                    batch = []
+                if "info" in m:
                     await self._process_info(m["info"])
                 elif "nodes" in m or "known" in m or "deleted" in m or "tock" in m:  # XXX LEGACY
                     await self._process_info(m)
                 else:
                     self.logger.warning("Unknown message in stream: %s", repr(m))
-
-        if authoritative:
-            self._discard_all_missing()
-
-        self.logger.debug("Loading finished.")
+        if batch:
+            await self._load_batch(batch)
 
     def _discard_all_missing(self):
         for n in self._nodes.values():
@@ -2459,8 +2601,16 @@ class Server:
         await writer(msg)  # XXX legacy
         await self.root.walk(saver, full=full)
 
-    async def save(self, path: str | None = None, stream=None, full=True):
-        """Save the current state to ``path`` or ``stream``."""
+    async def save(self, path: str | None = None, stream=None, full=True, snapshot=False):
+        """Save the current state to ``path`` or ``stream``.
+
+        If @snapshot is set, write an indexed snapshot instead of a
+        message stream.
+        """
+        if snapshot:
+            msg = await self.get_state(nodes=True, known=True, deleted=False)
+            await write_snapshot(self.root, msg, path=path, stream=stream, full=full)
+            return
         shorter = PathShortener([])
         async with MsgWriter(path=path, stream=stream, codec="std-msgpack") as mw:
             await self._save(mw, shorter, full=full)
@@ -2702,6 +2852,8 @@ class Server:
 
             await self.spawn(self._run_del, delay3)
             await self.spawn(self._delete_also)
+            if self.dh_pool.size:
+                await self.spawn(self.dh_pool.run)
 
             if log_path is not None:
                 await self.run_saver(path=log_path, save_state=not log_inc, wait=False)
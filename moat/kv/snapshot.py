@@ -0,0 +1,212 @@
+"""
+Indexed snapshots of a MoaT-KV tree.
+
+A snapshot file contains the serialized entries of a tree, sorted by
+path and grouped into blocks that can be decoded independently. An
+index of these blocks and the server's state are stored at the end of
+the file. Thus a reader can mmap the file, look up a single entry
+without decoding the rest, or decode the blocks in parallel.
+
+Layout::
+
+    MAGIC
+    block*      msgpack list of serialized entries, path-shortened
+    index       msgpack dict: info, count, blocks=[[first_path, offset, length, count]…]
+    trailer     index offset (8 bytes, big endian), MAGIC
+
+The stream format written by `MsgWriter` is still used for the
+incremental log that's loaded on top of a snapshot.
+"""
+
+from __future__ import annotations
+
+import anyio
+import mmap
+import struct
+from bisect import bisect_right
+
+from moat.util import NotGiven, PathLongener, PathShortener, attrdict, get_codec
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from moat.util import Path
+
+    from .model import Entry
+
+    from collections.abc import Iterator
+
+__all__ = ["Snapshot", "is_snapshot", "write_snapshot"]
+
+MAGIC = b"MoaT-KV snapshot\x00\x01"
+_TRAILER = struct.Struct(">Q")
+
+#: Entries per block.
+BLOCK_SIZE = 1000
+
+
+def path_key(path) -> tuple:
+    """
+    The sort key for paths in a snapshot.
+
+    Path elements may have different types, so sort by type name first.
+    """
+    return tuple((type(p).__name__, p) for p in path)
+
+
+def _sorted_entries(entry: Entry, full: bool, top: bool = True) -> Iterator[Entry]:
+    if entry.data is not NotGiven:
+        yield entry
+    for k, v in sorted(entry.items(), key=lambda kv: (type(kv[0]).__name__, kv[0])):
+        if k is None and top and not full:
+            continue
+        yield from _sorted_entries(v, full, False)
+
+
+async def write_snapshot(
+    root: Entry,
+    info: dict,
+    path: str | None = None,
+    stream=None,
+    nchain: int = -1,
+    full: bool = False,
+    block_size: int = BLOCK_SIZE,
+):
+    """
+    Write a snapshot of the tree at @root to @path or @stream.
+
+    @info is the server state, as returned by ``Server.get_state``.
+    @nchain and @full are passed to `Entry.serialize` and `Entry.walk`,
+    respectively.
+    """
+    if (path is None) == (stream is None):
+        raise RuntimeError("You need to specify either path or stream")
+    codec = get_codec("std-msgpack")
+    blocks = []
+    count = 0
+
+    if path is not None:
+        stream = await anyio.open_file(path, "wb")
+    try:
+        await stream.write(MAGIC)
+        pos = len(MAGIC)
+
+        first = None
+        it = _sorted_entries(root, full)
+        while True:
+            buf = []
+            shorter = PathShortener([])
+            for entry in it:
+                res = entry.serialize(nchain=nchain)
+                if first is None:
+                    first = res.path
+                shorter(res)
+                buf.append(res)
+                if len(buf) >= block_size:
+                    break
+            if not buf:
+                break
+            data = codec.encode(buf)
+            blocks.append([first, pos, len(data), len(buf)])
+            await stream.write(data)
+            pos += len(data)
+            count += len(buf)
+            first = None
+
+        data = codec.encode(dict(info=info, count=count, blocks=blocks))
+        await stream.write(data + _TRAILER.pack(pos) + MAGIC)
+    finally:
+        if path is not None:
+            with anyio.CancelScope(shield=True):
+                await stream.aclose()
+
+
+def is_snapshot(path: str) -> bool:
+    "Check whether the file at @path is a snapshot."
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+class Snapshot:
+    """
+    Read access to a snapshot file.
+
+    The file is mapped into memory. Blocks are decoded on demand; this
+    is thread safe.
+
+    Usage::
+
+        with Snapshot(path) as snap:
+            for i in range(len(snap.blocks)):
+                for msg in snap.block(i):
+                    process(msg)
+    """
+
+    def __init__(self, path: str):
+        self._f = open(path, "rb")  # noqa:SIM115
+        try:
+            self._map = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ)
+        except BaseException:
+            self._f.close()
+            raise
+        try:
+            self._read_index()
+        except BaseException:
+            self.close()
+            raise
+
+    def _read_index(self):
+        m = self._map
+        tl = _TRAILER.size + len(MAGIC)
+        if len(m) < len(MAGIC) + tl or m[: len(MAGIC)] != MAGIC or m[-len(MAGIC) :] != MAGIC:
+            raise ValueError("Not a MoaT-KV snapshot")
+        (pos,) = _TRAILER.unpack_from(m, len(m) - tl)
+        idx = get_codec("std-msgpack").decode(m[pos : len(m) - tl])
+
+        self.info: attrdict = idx["info"]
+        self.count: int = idx["count"]
+        self.blocks: list[list] = idx["blocks"]
+        self._keys = [path_key(b[0]) for b in self.blocks]
+
+    def close(self):
+        "Release the file."
+        self._map.close()
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *tb):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def block(self, i: int) -> list[attrdict]:
+        """
+        Decode block @i. Returns a list of serialized entries with full
+        paths.
+        """
+        _first, pos, length, _count = self.blocks[i]
+        res = get_codec("std-msgpack").decode(self._map[pos : pos + length])
+        longer = PathLongener(())
+        for msg in res:
+            longer(msg)
+        return res
+
+    def __iter__(self) -> Iterator[attrdict]:
+        for i in range(len(self.blocks)):
+            yield from self.block(i)
+
+    def get(self, path: Path) -> attrdict:
+        """
+        Return the serialized entry at @path.
+
+        Only the block that contains it is decoded.
+        """
+        i = bisect_right(self._keys, path_key(path)) - 1
+        if i >= 0:
+            for msg in self.block(i):
+                if msg.path == path:
+                    return msg
+        raise KeyError(path)
@@ -7,9 +7,13 @@ from __future__ import annotations
 from ._impl import Broadcaster as Broadcaster
 from ._impl import BroadcastReader as BroadcastReader
 from ._impl import LostData as LostData
+from ._ring import RingBroadcaster as RingBroadcaster
+from ._ring import RingReader as RingReader
 
 __all__ = [
     "BroadcastReader",
     "Broadcaster",
     "LostData",
+    "RingBroadcaster",
+    "RingReader",
 ]
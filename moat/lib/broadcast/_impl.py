@@ -45,7 +45,7 @@ class LostData(Exception):
         self.n = n
 
 
-@define
+@define(eq=False)
 class BroadcastReader:  ## TYPE [TData]:
     """
     The read side of a broadcaster.
@@ -124,7 +124,7 @@ class BroadcastReader:  ## TYPE [TData]:
         self.close()
 
 
-@define
+@define(eq=False)
 class Broadcaster:  ## TYPE [TData]:
     """
     A simple broadcaster. Messages will be sent to all readers.
@@ -0,0 +1,234 @@
+"""
+Broadcasting via a shared ring buffer
+"""
+
+from __future__ import annotations
+
+from weakref import WeakSet
+
+from attrs import define, field
+
+from moat.util import NotGiven
+from moat.lib.micro import Event
+
+from ._impl import LostData
+
+from collections import deque
+from typing import TYPE_CHECKING, TypeVar, cast
+
+if TYPE_CHECKING:
+    from typing import Literal, Self
+
+TData = TypeVar("TData")
+
+__all__ = [
+    "RingBroadcaster",
+    "RingReader",
+]
+
+
+@define(eq=False)
+class RingReader:  ## TYPE [TData]:
+    """
+    The read side of a `RingBroadcaster`.
+
+    This reader doesn't have a queue of its own. It holds a position in
+    its parent's buffer instead. If the writer gets more than ``length``
+    messages ahead, the oldest are skipped and the iterator raises
+    `LostData`, exactly like `BroadcastReader`.
+
+    Call this object to inject a value, to this reader only. Injected
+    values are returned before any broadcast ones.
+    """
+
+    parent: RingBroadcaster = field()
+    length: int = field(default=1)
+    skip: bool = field(default=False)
+
+    loss: int = field(init=False, default=0)
+    _pos: int = field(init=False, default=0)
+    _own: deque = field(init=False, factory=deque, repr=False)
+    _closed: bool = field(init=False, default=False)
+
+    def __attrs_post_init__(self) -> None:
+        if self.length <= 0:
+            raise RuntimeError("Length must be at least one")
+        self._pos = self.parent._head  # noqa:SLF001
+
+    def __hash__(self):
+        return id(self)
+
+    def __aiter__(self) -> Self:
+        return self
+
+    def _catch_up(self) -> None:
+        lag = self.parent._head - self._pos  # noqa:SLF001
+        if lag > self.length:
+            self._pos += lag - self.length
+            self.loss += lag - self.length
+
+    async def __anext__(self) -> TData:
+        p = self.parent
+        while True:
+            if self._own:
+                return self._own.popleft()
+
+            self._catch_up()
+            if not self.skip and self.loss > 0:
+                n, self.loss = self.loss, 0
+                raise LostData(n)
+
+            if self._pos < p._head:  # noqa:SLF001
+                res = p._get(self._pos)  # noqa:SLF001
+                self._pos += 1
+                return res
+
+            if self._closed or p._rdr is None:  # noqa:SLF001
+                raise StopAsyncIteration
+            await p._wait()  # noqa:SLF001
+
+    def flush(self) -> None:
+        """
+        Skip all queued messages.
+
+        Useful for re-sync after you get a `LostData` error.
+        """
+        self._own.clear()
+        self._pos = self.parent._head  # noqa:SLF001
+        self.loss = 0
+
+    def __call__(self, value: TData) -> None:
+        """enqueue a value, to this reader only"""
+        self._own.append(value)
+        self.parent._wake()  # noqa:SLF001
+
+    def close(self) -> None:
+        "close this reader, detaching it from its parent"
+        self._closed = True
+        self._pos = self.parent._head  # noqa:SLF001
+        self.parent._closed_reader(self)  # noqa:SLF001 pylint: disable=protected-access
+
+    async def aclose(self) -> None:
+        "close this reader, detaching it from its parent"
+        self.close()
+
+
+@define(eq=False)
+class RingBroadcaster:  ## TYPE [TData]:
+    """
+    A broadcaster with the same interface as `Broadcaster`, for many
+    readers.
+
+    `Broadcaster` copies each message into every reader's queue. This
+    class appends each message to a single buffer; readers keep their
+    position in it. Sending thus takes constant time regardless of the
+    number of readers.
+
+    The buffer holds as many messages as the longest reader requires.
+    Values stay referenced until they're overwritten, not until the last
+    reader has seen them.
+    """
+
+    length: int = field(default=1)
+    send_last: bool = field(default=False)
+
+    value: TData | Literal[NotGiven] = field(init=False, default=NotGiven)
+
+    _rdr: WeakSet[RingReader] | None = field(init=False, default=None, repr=False)
+    _buf: list | None = field(init=False, default=None, repr=False)
+    _head: int = field(init=False, default=0)
+    _evt: Event | None = field(init=False, default=None, repr=False)
+
+    def open(self) -> Self:
+        """Open the broadcaster.
+
+        Consider using a context instead of this method.
+        """
+        if self._rdr is not None:
+            raise RuntimeError("already entered/opened")
+        self._rdr = WeakSet()
+        self._buf = [None] * self.length
+        return self
+
+    def __enter__(self) -> Self:
+        return self.open()
+
+    async def __aenter__(self) -> Self:
+        return self.open()
+
+    def __exit__(self, *tb) -> None:
+        self.close()
+
+    async def __aexit__(self, *tb) -> None:
+        self.close()
+
+    def _get(self, pos: int) -> TData:
+        return self._buf[pos % len(self._buf)]
+
+    def _grow(self, length: int) -> None:
+        buf = self._buf
+        if length <= len(buf):
+            return
+        nbuf = [None] * length
+        for pos in range(max(0, self._head - len(buf)), self._head):
+            nbuf[pos % length] = buf[pos % len(buf)]
+        self._buf = nbuf
+
+    async def _wait(self) -> None:
+        if self._evt is None:
+            self._evt = Event()
+        await self._evt.wait()
+
+    def _wake(self) -> None:
+        # Only allocate a new event when somebody is waiting.
+        if self._evt is not None:
+            self._evt.set()
+            self._evt = None
+
+    def _closed_reader(self, reader) -> None:
+        if self._rdr is not None:
+            self._rdr.discard(reader)
+        self._wake()
+
+    def __aiter__(self) -> RingReader[TData]:
+        """Create a reader with the predefined queue length"""
+        return self.reader(self.length)
+
+    def reader(
+        self, length: int, send_last: bool | None = None, skip: bool = False
+    ) -> RingReader[TData]:
+        """Create a reader with an explicit queue length.
+
+        Set `skip` to ignore overflows.
+        """
+        assert self._rdr is not None
+
+        if send_last is None:
+            send_last = self.send_last
+        self._grow(length)
+        r: RingReader[TData] = RingReader(self, length, skip)
+        self._rdr.add(r)
+        if send_last and self.value is not NotGiven:
+            r(cast("TData", self.value))
+        return r
+
+    def __call__(self, value: TData) -> None:
+        """Append a value for all readers"""
+        assert self._rdr is not None
+
+        self.value = value
+        self._buf[self._head % len(self._buf)] = value
+        self._head += 1
+        self._wake()
+
+    async def read(self) -> TData:
+        "gets the last value (waits until there is one)"
+        if self.value is NotGiven:
+            return await anext(aiter(self))
+        return self.value
+
+    def close(self):
+        "Close the broadcaster. No more writing."
+        if self._rdr is not None:
+            self._rdr = None
+            self._wake()
@@ -0,0 +1,179 @@
+"""
+Input buffer for the streaming decoders.
+"""
+
+from __future__ import annotations
+
+import struct
+
+from moat.util import OutOfData
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ._base import ByteType, VarByteType
+
+
+class ChunkBuffer:
+    """
+    A list of incoming chunks, read by the decoders.
+
+    Unlike a single ``bytearray``, appending data doesn't copy what's
+    already buffered, and reading only copies the bytes that are read.
+
+    A decoder reads an object; if the buffer runs out, `OutOfData` is
+    raised and the decoder calls `reset` to return to the start of the
+    object. Otherwise it calls `commit`, which releases the chunks that
+    have been consumed.
+
+    A failed read remembers how many bytes are missing. `ready` returns
+    `False` until at least that much has been fed, so that a large
+    object isn't re-parsed every time a few bytes arrive.
+    """
+
+    def __init__(self, data: ByteType | None = None):
+        self._chunks: list[bytes] = []
+        # read position
+        self._ci = 0
+        self._pos = 0
+        self._avail = 0
+        # committed position
+        self._mci = 0
+        self._mpos = 0
+        self._mavail = 0
+        # required length, starting at the committed position
+        self._want = 0
+
+        if data is not None:
+            self.feed(data)
+
+    def __len__(self):
+        "The number of unread bytes"
+        return self._avail
+
+    def feed(self, data: ByteType) -> None:
+        "Add a chunk."
+        if not data:
+            return
+        if not isinstance(data, bytes):
+            # the caller may re-use its buffer
+            data = bytes(data)
+        self._chunks.append(data)
+        self._avail += len(data)
+        self._mavail += len(data)
+
+    def ready(self) -> bool:
+        "Check whether it makes sense to try decoding."
+        return self._mavail >= self._want
+
+    def commit(self) -> None:
+        "Set the start position for `reset`. Drop consumed chunks."
+        if self._ci:
+            del self._chunks[: self._ci]
+            self._ci = 0
+        self._mci = 0
+        self._mpos = self._pos
+        self._mavail = self._avail
+        self._want = 0
+
+    def reset(self) -> None:
+        "Go back to the committed position."
+        self._ci = self._mci
+        self._pos = self._mpos
+        self._avail = self._mavail
+
+    def _fail(self, n: int):
+        self._want = self._mavail - self._avail + n
+        raise OutOfData(n - self._avail)
+
+    def _skip(self, n: int, c: bytes) -> None:
+        # advance by @n bytes within the current chunk @c
+        self._avail -= n
+        self._pos += n
+        if self._pos == len(c):
+            self._ci += 1
+            self._pos = 0
+
+    def byte(self) -> int:
+        "Read one byte."
+        if not self._avail:
+            self._fail(1)
+        c = self._chunks[self._ci]
+        res = c[self._pos]
+        self._skip(1, c)
+        return res
+
+    def read(self, n: int) -> bytes:
+        "Read @n bytes."
+        if n > self._avail:
+            self._fail(n)
+        if not n:
+            return b""
+        c = self._chunks[self._ci]
+        p = self._pos
+        if p + n <= len(c):
+            self._skip(n, c)
+            return c[p : p + n]
+
+        # spans chunks
+        res = []
+        while n:
+            c = self._chunks[self._ci]
+            p = self._pos
+            k = min(n, len(c) - p)
+            res.append(c[p : p + k])
+            self._skip(k, c)
+            n -= k
+        return b"".join(res)
+
+    def view(self, n: int) -> memoryview | bytes:
+        """
+        Read @n bytes, without copying them if possible.
+
+        The result is a memoryview into the buffered data unless it spans
+        chunks.
+        """
+        if n > self._avail:
+            self._fail(n)
+        if not n:
+            return b""
+        c = self._chunks[self._ci]
+        p = self._pos
+        if p + n > len(c):
+            return self.read(n)
+        self._skip(n, c)
+        return memoryview(c)[p : p + n]
+
+    def unpack(self, fmt: str, n: int) -> tuple:
+        "Read @n bytes and decode them using the `struct` format @fmt."
+        if n > self._avail:
+            self._fail(n)
+        c = self._chunks[self._ci]
+        p = self._pos
+        if p + n <= len(c):
+            self._skip(n, c)
+            return struct.unpack_from(fmt, c, p)
+        return struct.unpack(fmt, self.read(n))
+
+    def take(self, buf: VarByteType | None, n: int = 0) -> int:
+        """
+        Consume up to ``len(buf)`` bytes and copy them to @buf. If @buf
+        is `None`, skip up to @n bytes instead.
+
+        Returns the number of bytes consumed.
+        """
+        n = min(n if buf is None else len(buf), self._avail)
+        if n:
+            data = self.read(n)
+            if buf is not None:
+                buf[:n] = data
+        self.commit()
+        return n
+
+    def rest(self) -> bytes:
+        "Return the unread data without consuming them."
+        if not self._avail:
+            return b""
+        res = [self._chunks[self._ci][self._pos :]]
+        res.extend(self._chunks[self._ci + 1 :])
+        return b"".join(res)
@@ -11,6 +11,7 @@ from moat.util import OutOfData
 
 from ._base import Codec as _Codec
 from ._base import NoCodecError
+from ._buffer import ChunkBuffer
 
 # Typing
 from typing import cast, TYPE_CHECKING  # isort:skip
@@ -105,21 +106,27 @@ class ExtraData(ValueError):
 
 
 class Codec(_Codec):
-    "Basic CBOR codec"
+    """
+    Basic CBOR codec
 
-    _buffer: bytes | bytearray = b""
-    _buf_pos: int = 0
+    Byte strings at least @min_memview_len bytes long are decoded to
+    memoryviews into the input buffer, if possible.
+    """
 
     _buf_out: bytearray | None = None
 
-    def __init__(self, use_attrdict: bool = False, **kw):
+    def __init__(self, use_attrdict: bool = False, min_memview_len: int = -1, **kw):
         super().__init__(**kw)
         self.use_attrdict = use_attrdict
+        self.min_memview_len = min_memview_len
         self.__kw = kw
+        self._buf = ChunkBuffer()
 
     def copy(self) -> Codec:
         "copy me"
-        return Codec(use_attrdict=self.use_attrdict, **self.__kw)
+        return Codec(
+            use_attrdict=self.use_attrdict, min_memview_len=self.min_memview_len, **self.__kw
+        )
 
     def encode(self, obj: Any) -> ByteType:
         """
@@ -139,48 +146,25 @@ class Codec(_Codec):
         """
         Unpack @data, return the resulting object.
         """
-        if self._buffer:
-            raise RuntimeError("Codec is busy")
-
-        self._buffer = data  # pyright:ignore  # type mismatch
+        # don't disturb the stream decoder
+        sbuf, self._buf = self._buf, ChunkBuffer(data)
         try:
             res = self._dec_any()
-            # chop off the part we've read
-            if self._buf_pos != len(data):
+            if len(self._buf):
                 raise ExtraData
             return res
         finally:
-            self._buffer = b""  # always reset
-            self._buf_pos = 0
+            self._buf = sbuf
 
     def feed(self, data: ByteType) -> None:
         "Add additional input"
-        if self._buffer and self._buf_pos < len(self._buffer):
-            if self._buf_pos == 0:
-                self._buffer += data
-                return
-            data = self._buffer[self._buf_pos :] + data
-        elif isinstance(data, memoryview):
-            data = bytearray(data)
-        self._buffer = data
-        self._buf_pos = 0
+        self._buf.feed(data)
 
     def unfeed(self, buf: VarByteType) -> int:
         "take from the decoder's buffer"
-        if not self._buffer:
-            return 0
         if buf is None:
-            if isinstance(self._buffer, memoryview):
-                self._buffer = bytearray(self.buffer)
-            return 0
-        i = self._buf_pos
-        n = min(len(buf), len(self._buffer) - i)
-        if n <= 0:
             return 0
-        i_n = i + n
-        buf[:n] = self._buffer[i:i_n]
-        self._buf_pos = i_n
-        return n
+        return self._buf.take(buf)
 
     def _enc_int(self, val):
         "return bytes representing int val in CBOR"
@@ -305,25 +289,25 @@ class Codec(_Codec):
     # Decoder
 
     def _read_byte(self):
-        return self._read(1)[0]
+        return self._buf.byte()
 
     def __iter__(self):
         return self
 
     def __next__(self):
-        i = self._buf_pos
+        buf = self._buf
+        if not buf.ready():
+            raise StopIteration
         try:
-            return self._dec_any()
+            res = self._dec_any()
         except OutOfData:
-            self._buf_pos = i
+            buf.reset()
             raise StopIteration from None
         except BaseException:
-            self._buf_pos = i
+            buf.reset()
             raise
-        finally:
-            if len(self._buffer) == self._buf_pos:
-                self._buffer = b""
-                self._buf_pos = 0
+        buf.commit()
+        return res
 
     def _dec_tag_aux(self, tb):
         tag = tb & CBOR_TYPE_MASK
@@ -331,17 +315,13 @@ class Codec(_Codec):
         if tag_aux <= 23:
             aux = tag_aux
         elif tag_aux == CBOR_UINT8_FOLLOWS:
-            data = self._read(1)
-            aux = struct.unpack_from("!B", data, 0)[0]
+            aux = self._buf.byte()
         elif tag_aux == CBOR_UINT16_FOLLOWS:
-            data = self._read(2)
-            aux = struct.unpack_from("!H", data, 0)[0]
+            aux = self._buf.unpack("!H", 2)[0]
         elif tag_aux == CBOR_UINT32_FOLLOWS:
-            data = self._read(4)
-            aux = struct.unpack_from("!I", data, 0)[0]
+            aux = self._buf.unpack("!I", 4)[0]
         elif tag_aux == CBOR_UINT64_FOLLOWS:
-            data = self._read(8)
-            aux = struct.unpack_from("!Q", data, 0)[0]
+            aux = self._buf.unpack("!Q", 8)[0]
         else:
             if tag_aux != CBOR_VAR_FOLLOWS:
                 raise ValueError(f"bogus tag {tb:02x}")
@@ -350,12 +330,8 @@ class Codec(_Codec):
         return tag, aux
 
     def _read(self, n):
-        # (int) -> bytearray
-        if (nb := len(self._buffer) - self._buf_pos) < n:
-            raise OutOfData(n - nb)
-        i = self._buf_pos
-        self._buf_pos += n
-        return self._buffer[i : i + n]
+        # (int) -> bytes
+        return self._buf.read(n)
 
     def _dec_var_array(self):
         ob = []
@@ -397,17 +373,11 @@ class Codec(_Codec):
     def _dec_tagged(self, tb):
         # Some special cases of CBOR_7 best handled by special struct.unpack logic here
         if tb == CBOR_FLOAT16:
-            data = self._read(2)
-            pf = struct.unpack_from("!e", data, 0)
-            return pf[0]
+            return self._buf.unpack("!e", 2)[0]
         elif tb == CBOR_FLOAT32:
-            data = self._read(4)
-            pf = struct.unpack_from("!f", data, 0)
-            return pf[0]
+            return self._buf.unpack("!f", 4)[0]
         elif tb == CBOR_FLOAT64:
-            data = self._read(8)
-            pf = struct.unpack_from("!d", data, 0)
-            return pf[0]
+            return self._buf.unpack("!d", 8)[0]
 
         tag, aux = self._dec_tag_aux(tb)
 
@@ -450,8 +420,9 @@ class Codec(_Codec):
         # TODO: limit to some maximum number of chunks and some maximum total bytes
         if aux is not None:
             # simple case
-            ob = self._read(aux)
-            return ob
+            if btag == CBOR_BYTES and 0 <= self.min_memview_len <= aux:
+                return self._buf.view(aux)
+            return self._read(aux)
         # read chunks
         chunklist = []
         while True:
@@ -11,8 +11,17 @@ The decoder yields messages.
 You can also decode single messages.
 
 The decoder returns binary data as memoryviews if they're larger
-than the threshold (default -1: always copy). Extension objects always
-get a memoryview and must decode or copy it.
+than the threshold (default -1: always copy). Extension objects
+get a memoryview (unless their data span input chunks) and must decode
+or copy it.
+
+Incoming data are kept as a list of chunks. The decoder doesn't
+concatenate them; it only copies the bytes it returns.
+
+On CPython, the `msgpack` C extension is used if it is installed. Its
+output is equivalent (the Python encoder writes map entries in reverse
+order, otherwise it's identical). Pass ``fast=False`` to use the Python
+code anyway.
 """
 
 from __future__ import annotations
@@ -26,48 +35,132 @@ from moat.lib.micro import byte2utf8, const
 
 from ._base import Codec as _Codec
 from ._base import NoCodecError
+from ._buffer import ChunkBuffer
 
 from typing import TYPE_CHECKING, cast
 
+try:
+    import msgpack as _cmsgpack
+except ImportError:
+    _cmsgpack = None
+
 if TYPE_CHECKING:
     from ._base import ByteType, VarByteType
 
 __all__ = ["Codec", "ExtType"]
 
 
+# Settings for the C extension that match our Python code
+_C_PACK = dict(use_single_float=True, use_bin_type=True)
+_C_UNPACK = dict(raw=False, strict_map_key=False)
+
+
 class Codec(_Codec):
-    "Extensible msgpack codec"
+    """
+    Extensible msgpack codec
+
+    If @fast is `None` (the default), use the `msgpack` C extension
+    if it is available.
+
+    The Python decoder returns binary data at least @min_memview_len
+    bytes long as memoryviews.
+    """
 
-    def __init__(self, use_attrdict: bool = False, **kw):
+    def __init__(
+        self,
+        use_attrdict: bool = False,
+        fast: bool | None = None,
+        min_memview_len: int = -1,
+        **kw,
+    ):
         # TODO add keywords for msgpack enc/dec settings
         super().__init__(**kw)
         self.use_attrdict = use_attrdict
+        self.min_memview_len = min_memview_len
         self.__kw = kw
 
-        self.stream = Unpacker(
-            ext_hook=self._decode,  # pyright:ignore
-            use_attrdict=use_attrdict,
-        )
+        if fast is None:
+            fast = _cmsgpack is not None
+        elif fast and _cmsgpack is None:
+            raise ImportError("msgpack")
+        self.fast = fast
+
+        if fast:
+            self._packer = None
+            self.stream = _cmsgpack.Unpacker(
+                ext_hook=self._decode,
+                object_hook=attrdict if use_attrdict else None,
+                max_buffer_size=0,
+                read_size=4096,
+                **_C_UNPACK,
+            )
+        else:
+            self.stream = Unpacker(
+                ext_hook=self._decode,  # pyright:ignore
+                use_attrdict=use_attrdict,
+                min_memview_len=min_memview_len,
+            )
 
     def copy(self) -> Codec:
         "copy me"
-        return Codec(use_attrdict=self.use_attrdict, **self.__kw)
+        return Codec(
+            use_attrdict=self.use_attrdict,
+            fast=self.fast,
+            min_memview_len=self.min_memview_len,
+            **self.__kw,
+        )
 
     def encode(self, obj):
         "object > bytes"
-        return packb(obj, default=self._encode)
+        if not self.fast:
+            return packb(obj, default=self._encode)
+
+        # Extension encoders call us recursively, so a packer that's in
+        # use must not be shared.
+        pk = self._packer
+        if pk is None:
+            pk = _cmsgpack.Packer(default=self._c_encode, **_C_PACK)
+        self._packer = None
+        try:
+            return pk.pack(obj)
+        finally:
+            self._packer = pk
 
     def _encode(self, obj):
         k, d = self.ext.encode(self, obj)
         return ExtType(k, d)
 
+    def _c_encode(self, obj):
+        if isinstance(obj, ExtType):
+            k, d = obj.code, obj.data
+        else:
+            k, d = self.ext.encode(self, obj)
+        if not isinstance(d, bytes):
+            d = bytes(d)
+        return _cmsgpack.ExtType(k, d)
+
     def decode(self, data: ByteType):
         "bytes > object"
-        return unpackb(
-            data,
-            ext_hook=self._decode,
-            use_attrdict=self.use_attrdict,
-        )
+        if not self.fast:
+            return unpackb(
+                data,
+                ext_hook=self._decode,
+                use_attrdict=self.use_attrdict,
+                min_memview_len=self.min_memview_len,
+            )
+        try:
+            return _cmsgpack.unpackb(
+                data,
+                ext_hook=self._decode,
+                object_hook=attrdict if self.use_attrdict else None,
+                **_C_UNPACK,
+            )
+        except _cmsgpack.ExtraData as exc:
+            raise ExtraData(exc.unpacked, exc.extra) from None
+        except ValueError as exc:
+            if type(exc) is ValueError and "incomplete" in str(exc):
+                raise OutOfData("incomplete") from None
+            raise
 
     def _decode(self, key, data):
         try:
@@ -87,7 +180,12 @@ class Codec(_Codec):
 
     def unfeed(self, buf: VarByteType | None) -> int:
         "Take from the decoder's buffer."
-        return self.stream.unfeed(buf)
+        if not self.fast:
+            return self.stream.unfeed(buf)
+        data = self.stream.read_bytes(len(buf) if buf is not None else 999)
+        if buf is not None:
+            buf[: len(data)] = data
+        return len(data)
 
 
 # cloned from https://github.com/msgpack/msgpack-python
@@ -172,6 +270,9 @@ _MSGPACK_HEADERS = {
 class Unpacker:
     """
     Manager for buffered and streamed unpacking.
+
+    Binary data at least @min_memview_len bytes long are returned as
+    memoryviews into the input buffer, if possible.
     """
 
     def __init__(
@@ -180,76 +281,34 @@ class Unpacker:
         use_attrdict=False,
         min_memview_len=-1,
     ):
-        #: array of bytes fed.
-        self._buffer = bytearray()
-        #: Which position we currently reads
-        self._buf_pos = 0
+        self._buf = ChunkBuffer()
 
         self._ext_hook = ext_hook
         self._min_memview_len = min_memview_len
         self._use_attrdict = use_attrdict
 
     def feed(self, data):
-        "set the buffer"
-        if self._buffer and self._buf_pos < len(self._buffer):
-            if self._buf_pos == 0:
-                self._buffer += data
-                return
-            data = self._buffer[self._buf_pos :] + data
-        elif isinstance(data, memoryview):
-            data = bytearray(data)
-        self._buffer = data
-        self._buf_pos = 0
+        "add to the buffer"
+        self._buf.feed(data)
 
     def unfeed(self, buf: VarByteType | None) -> int:
         "take from the buffer"
-        if not self._buffer:
-            return 0
-        i = self._buf_pos
-        n = min(len(buf) if buf is not None else 999, len(self._buffer) - i)
-        if n == 0:
-            return 0
-        i_n = i + n
-        if buf is not None:
-            buf[:n] = self._buffer[i:i_n]
-        self._buf_pos = i_n
-        return n
+        return self._buf.take(buf, 999)
 
     def has_extradata(self):
         "are there extra data in the buffer?"
-        return self._buf_pos < len(self._buffer)
+        return len(self._buf) > 0
 
     def get_extradata(self):
         "return extra data, if any"
-        return self._buffer[self._buf_pos :]
-
-    def _read(self, n):
-        # (int) -> bytearray
-        i = self._buf_pos
-        i_n = i + n
-        if i_n > len(self._buffer):
-            raise OutOfData
-
-        ret = self._buffer[i:i_n]
-        self._buf_pos = i + len(ret)
-        return ret
-
-    def _reserve(self, n):
-        remain_bytes = len(self._buffer) - self._buf_pos - n
-
-        # Fast path: buffer has n bytes already
-        if remain_bytes >= 0:
-            return
-
-        raise OutOfData
+        return self._buf.rest()
 
     def _read_header(self):
         typ = _TYPE_IMMEDIATE
         n = 0
         obj = None
-        self._reserve(1)
-        b = self._buffer[self._buf_pos]
-        self._buf_pos += 1
+        buf = self._buf
+        b = buf.byte()
         if b & 0b10000000 == 0:  # x00-x7F
             obj = b
         elif b & 0b11100000 == 0b11100000:  # xE0-xFF
@@ -257,7 +316,7 @@ class Unpacker:
         elif b & 0b11100000 == 0b10100000:  # xA0-xBF
             n = b & 0b00011111
             typ = _TYPE_RAW
-            obj = self._read(n)
+            obj = buf.read(n)
         elif b & 0b11110000 == 0b10010000:  # x90-x9F
             n = b & 0b00001111
             typ = _TYPE_ARRAY
@@ -274,65 +333,52 @@ class Unpacker:
             obj = True
         elif b <= 0xC6:
             size, fmt, typ = _MSGPACK_HEADERS[b]
-            self._reserve(size)
             if len(fmt) > 0:
-                n = struct.unpack_from(fmt, self._buffer, self._buf_pos)[0]
+                n = buf.unpack(fmt, size)[0]
+            else:
+                n = buf.byte()
+            if self._min_memview_len >= 0 and n >= self._min_memview_len:
+                obj = buf.view(n)
             else:
-                n = self._buffer[self._buf_pos]
-            self._buf_pos += size
-            obj = self._read(n)
+                obj = buf.read(n)
         elif b <= 0xC9:
             size, fmt, typ = _MSGPACK_HEADERS[b]
-            self._reserve(size)
-            L, n = struct.unpack_from(fmt, self._buffer, self._buf_pos)
-            self._buf_pos += size
-            obj = self._read(L)
+            L, n = buf.unpack(fmt, size)
+            obj = buf.view(L)
         elif b <= 0xD3:
             size, fmt = _MSGPACK_HEADERS[b]
-            self._reserve(size)
             if len(fmt) > 0:
-                obj = struct.unpack_from(fmt, self._buffer, self._buf_pos)[0]
+                obj = buf.unpack(fmt, size)[0]
             else:
-                obj = self._buffer[self._buf_pos]
-            self._buf_pos += size
+                obj = buf.byte()
         elif b <= 0xD8:
             size, fmt, typ = _MSGPACK_HEADERS[b]
-            self._reserve(size + 1)
-            n, obj = struct.unpack_from(fmt, self._buffer, self._buf_pos)
-            self._buf_pos += size + 1
+            n, obj = buf.unpack(fmt, size + 1)
         elif b <= 0xDB:
             size, fmt, typ = _MSGPACK_HEADERS[b]
-            self._reserve(size)
             if len(fmt) > 0:
-                (n,) = struct.unpack_from(fmt, self._buffer, self._buf_pos)
+                (n,) = buf.unpack(fmt, size)
             else:
-                n = self._buffer[self._buf_pos]
-            self._buf_pos += size
-            obj = self._read(n)
-        elif b <= 0xDD:
-            size, fmt, typ = _MSGPACK_HEADERS[b]
-            self._reserve(size)
-            (n,) = struct.unpack_from(fmt, self._buffer, self._buf_pos)
-            self._buf_pos += size
+                n = buf.byte()
+            obj = buf.read(n)
         else:  # if b <= 0xDF:  # can't be anything else
             size, fmt, typ = _MSGPACK_HEADERS[b]
-            self._reserve(size)
-            (n,) = struct.unpack_from(fmt, self._buffer, self._buf_pos)
-            self._buf_pos += size
+            (n,) = buf.unpack(fmt, size)
         return typ, n, obj
 
     def unpack(self):
         "extract one (top-level) item from the buffer"
-        i = self._buf_pos
+        buf = self._buf
+        if not buf.ready():
+            raise OutOfData
         try:
             res = self._unpack()
         except BaseException:
-            self._buf_pos = i
+            buf.reset()
             raise
 
-        # Buffer management: chop off the part we've read
-        self._buffer = self._buffer[self._buf_pos :]
-        self._buf_pos = 0
+        # Buffer management: drop the part we've read
+        buf.commit()
         return res
 
     def _unpack(self):
@@ -360,8 +406,6 @@ class Unpacker:
         if typ == _TYPE_RAW:
             return byte2utf8(cast(bytes, obj))
         if typ == _TYPE_BIN:
-            if self._min_memview_len < 0 and len(cast(bytes, obj)) < self._min_memview_len:
-                obj = bytes(cast(bytes, obj))
             return obj
         if typ == _TYPE_EXT:
             return self._ext_hook(n, cast(bytes, obj))
@@ -586,7 +630,7 @@ def unpackb(packed, **kwargs):
     try:
         res = unpacker.unpack()
         if unpacker.has_extradata():
-            raise ExtraData
+            raise ExtraData(res, unpacker.get_extradata())
         return res
     except OutOfData:
         raise OutOfData("incomplete") from None
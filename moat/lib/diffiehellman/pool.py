@@ -0,0 +1,125 @@
+"""
+pool keeps pre-generated key pairs ready for use.
+
+Generating a public key is as expensive as generating the shared secret.
+A `KeyPool` does the former in the background, so that setting up a
+session only needs the latter.
+"""
+
+from __future__ import annotations
+
+import anyio
+
+from ._impl import DiffieHellman
+
+from collections import deque
+
+__all__ = ["KeyPool", "new_key"]
+
+
+def new_key(length: int) -> DiffieHellman:
+    """
+    Create a key pair for a key of @length bits, using the group size
+    MoaT has always used for that length.
+
+    This is CPU intensive. Run it in a thread.
+    """
+    k = DiffieHellman(key_length=length, group=(5 if length < 32 else 14))
+    k.generate_public_key()
+    return k
+
+
+class KeyPool:
+    """
+    A pool of single-use key pairs, per key length.
+
+    Call `get` to take a key pair. If none is ready, one is generated
+    on the spot. Lengths are added to the pool by `want`, or when
+    they're first requested unless `get` is told not to.
+
+    `run` refills the pool in the background, one key at a time, so
+    that it doesn't compete with connection setup for CPU.
+    """
+
+    def __init__(self, size: int = 10):
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self._keys: dict[int, deque[DiffieHellman]] = {}
+        self._evt: anyio.Event | None = None
+        self._full: anyio.Event | None = None
+
+    def _wake(self) -> None:
+        if self._evt is not None:
+            self._evt.set()
+
+    def want(self, length: int) -> None:
+        """
+        Keep keys of this length ready.
+        """
+        if length not in self._keys:
+            self._keys[length] = deque()
+            self._wake()
+
+    async def get(self, length: int, want: bool = True) -> DiffieHellman:
+        """
+        Return a key pair with its public key already generated.
+        Never returns the same key twice.
+
+        If @want is `False`, a length that's not in the pool yet is not
+        added to it.
+        """
+        try:
+            k = self._keys[length].popleft()
+        except KeyError:
+            if want:
+                self._keys[length] = deque()
+        except IndexError:
+            pass
+        else:
+            self.hits += 1
+            self._wake()
+            return k
+
+        self.misses += 1
+        self._wake()
+        return await anyio.to_thread.run_sync(new_key, length)
+
+    async def filled(self) -> None:
+        """
+        Wait until keys of all lengths are ready.
+        """
+        while any(len(q) < self.size for q in self._keys.values()):
+            if self._full is None:
+                self._full = anyio.Event()
+            await self._full.wait()
+
+    @property
+    def stats(self) -> dict:
+        "hit and miss counters, and the number of keys that are ready"
+        return dict(
+            hits=self.hits,
+            misses=self.misses,
+            ready={ln: len(q) for ln, q in self._keys.items()},
+        )
+
+    async def run(self, *, task_status=anyio.TASK_STATUS_IGNORED):
+        """
+        Refill the pool. Runs forever.
+        """
+        limiter = anyio.CapacityLimiter(1)
+        task_status.started()
+        while True:
+            short = [(len(q), ln) for ln, q in self._keys.items() if len(q) < self.size]
+            if not short:
+                if self._full is not None:
+                    self._full.set()
+                    self._full = None
+                self._evt = anyio.Event()
+                await self._evt.wait()
+                self._evt = None
+                continue
+
+            _, length = min(short)
+            k = await anyio.to_thread.run_sync(new_key, length, limiter=limiter)
+            self._keys[length].append(k)
@@ -0,0 +1,185 @@
+"""
+Topic indexes for the broker state machine.
+
+`SubscriptionIndex` maps patterns to their subscribers and finds the
+patterns matching a topic; `RetainedMessages` maps topics to retained
+messages and finds the topics matching a pattern. Both keep a trie of
+topic levels so that a lookup only visits candidates, and both follow
+the rules of `Pattern.matches`.
+
+In particular, a pattern's first wildcard doesn't match a level that
+starts with ``$``, even after a static prefix: ``foo/+`` doesn't match
+``foo/$bar``. A ``#`` that follows a static prefix does, though.
+"""
+
+from __future__ import annotations
+
+from ._types import _str2pat
+from .trie import TrieNode, trie_insert, trie_remove
+
+from collections.abc import MutableMapping
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ._types import MQTTPublishPacket, Pattern, Subscription
+
+    from collections.abc import Iterator
+
+__all__ = ["RetainedMessages", "SubscriptionIndex"]
+
+_WILD = ("+", "#")
+
+
+class SubscriptionIndex(MutableMapping):
+    """
+    A mapping of `Pattern` to ``{client_id: Subscription}``.
+
+    Patterns without wildcards are kept in a plain dict keyed by their
+    topic; the others are stored in a trie of topic levels.
+    """
+
+    def __init__(self) -> None:
+        self._data: dict[Pattern, dict[str, Subscription]] = {}
+        self._exact: dict[str, tuple[Pattern, dict[str, Subscription]]] = {}
+        self._root = TrieNode()
+
+    def __getitem__(self, pattern: Pattern) -> dict[str, Subscription]:
+        return self._data[pattern]
+
+    def __setitem__(self, pattern: Pattern | str, clients: dict[str, Subscription]) -> None:
+        pattern = _str2pat(pattern)
+        if pattern._prefix is None:  # noqa:SLF001
+            self._exact[pattern.pattern] = (pattern, clients)
+        else:
+            node = trie_insert(self._root, pattern.pattern.split("/"))
+            node.key = pattern
+            node.value = clients
+        self._data[pattern] = clients
+
+    def __delitem__(self, pattern: Pattern | str) -> None:
+        pattern = _str2pat(pattern)
+        del self._data[pattern]
+        if pattern.pattern in self._exact:
+            del self._exact[pattern.pattern]
+        else:
+            trie_remove(self._root, pattern.pattern.split("/"))
+
+    def __contains__(self, pattern: object) -> bool:
+        return pattern in self._data
+
+    def __iter__(self) -> Iterator[Pattern]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def match(self, topic: str) -> Iterator[tuple[Pattern, dict[str, Subscription]]]:
+        """
+        Iterate the ``(pattern, clients)`` pairs whose pattern matches this topic.
+        """
+        if (res := self._exact.get(topic)) is not None:
+            yield res
+
+        levels = topic.split("/")
+        n = len(levels)
+        # node, level, whether the path to the node contains a wildcard
+        todo = [(self._root, 0, False)]
+        while todo:
+            node, i, wild = todo.pop()
+            children = node.children
+            if i == n:
+                if node.key is not None:
+                    yield node.key, node.value
+                # 'foo/#' matches 'foo'
+                nx = children.get("#")
+                if nx is not None:
+                    yield nx.key, nx.value
+                continue
+            if not children:
+                continue
+            level = levels[i]
+            dollar = level[:1] == "$"
+            if i or not dollar:
+                nx = children.get("#")
+                if nx is not None:
+                    yield nx.key, nx.value
+            if wild or not dollar:
+                nx = children.get("+")
+                if nx is not None:
+                    todo.append((nx, i + 1, True))
+            if level not in _WILD:
+                nx = children.get(level)
+                if nx is not None:
+                    todo.append((nx, i + 1, wild))
+
+
+class RetainedMessages(MutableMapping):
+    """
+    A mapping of topic to the message retained on it.
+    """
+
+    def __init__(self) -> None:
+        self._data: dict[str, MQTTPublishPacket] = {}
+        self._root = TrieNode()
+
+    def __getitem__(self, topic: str) -> MQTTPublishPacket:
+        return self._data[topic]
+
+    def __setitem__(self, topic: str, packet: MQTTPublishPacket) -> None:
+        trie_insert(self._root, topic.split("/")).value = packet
+        self._data[topic] = packet
+
+    def __delitem__(self, topic: str) -> None:
+        del self._data[topic]
+        trie_remove(self._root, topic.split("/"))
+
+    def __contains__(self, topic: object) -> bool:
+        return topic in self._data
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def match(self, pattern: Pattern) -> Iterator[MQTTPublishPacket]:
+        """
+        Iterate the retained messages whose topic matches this pattern.
+
+        Siblings are visited in the order they were first retained.
+        """
+        if pattern._prefix is None:  # noqa:SLF001
+            if (res := self._data.get(pattern.pattern)) is not None:
+                yield res
+            return
+
+        levels = pattern.pattern.split("/")
+        n = len(levels)
+        # the first wildcard's level
+        first = n - len(pattern._parts)  # noqa:SLF001
+        todo = [(self._root, 0)]
+        while todo:
+            node, i = todo.pop()
+            if i == n:
+                if node.value is not None:
+                    yield node.value
+                continue
+            level = levels[i]
+            if level == "#":
+                # 'foo/#' matches 'foo' and everything below it
+                if i and node.value is not None:
+                    yield node.value
+                sub = [nx for k, nx in reversed(node.children.items()) if i or k[:1] != "$"]
+                while sub:
+                    nx = sub.pop()
+                    if nx.value is not None:
+                        yield nx.value
+                    sub.extend(reversed(nx.children.values()))
+            elif level == "+":
+                for k, nx in reversed(node.children.items()):
+                    if i != first or k[:1] != "$":
+                        todo.append((nx, i + 1))
+            else:
+                nx = node.children.get(level)
+                if nx is not None:
+                    todo.append((nx, i + 1))
@@ -1003,6 +1003,33 @@ class MQTTPublishPacket(MQTTPacket, PropertiesMixin):
         flags = int(self.retain) | self.qos << 1 | self.duplicate << 3
         self.encode_fixed_header(flags, internal_buffer, buffer)
 
+    def encode_shared(self) -> tuple[bytes, int | None]:
+        """
+        Encode this packet once, for sending to several clients.
+
+        :return: the encoded packet and the offset of its packet ID, or ``None`` if
+            there is none (QoS 0). Use `patch_packet_id` to send a copy with a
+            different packet ID.
+        """
+        buffer = bytearray()
+        self.encode(buffer)
+        if self.packet_id is None:
+            return bytes(buffer), None
+
+        # skip the fixed header's flags and variable-length size, then the topic
+        pos = 1
+        while buffer[pos] & 0x80:
+            pos += 1
+        return bytes(buffer), pos + 1 + 2 + len(self.topic.encode("utf-8"))
+
+    @staticmethod
+    def patch_packet_id(buffer: bytearray, start: int, offset: int, packet_id: int) -> None:
+        """
+        Replace the packet ID of a shared encoding that has been copied to
+        ``buffer[start:]``.
+        """
+        buffer[start + offset : start + offset + 2] = packet_id.to_bytes(2, "big")
+
 
 @define(kw_only=True)
 class MQTTPublishAckPacket(MQTTPacket, PropertiesMixin, ReasonCodeMixin):
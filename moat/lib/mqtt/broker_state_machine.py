@@ -5,6 +5,7 @@ from attrs import define, field
 
 from ._base_client_state_machine import BaseMQTTClientStateMachine, MQTTClientState
 from ._exceptions import MQTTProtocolError
+from ._index import RetainedMessages, SubscriptionIndex
 from ._types import (
     MQTTConnAckPacket,
     MQTTConnectPacket,
@@ -41,8 +42,8 @@ class MQTTBrokerStateMachine:
     client_state_machines: dict[str, MQTTBrokerClientStateMachine] = field(
         init=False, factory=dict
     )
-    shared_subscriptions: dict[Pattern, dict[str, Subscription]] = field(init=False, factory=dict)
-    retained_messages: dict[str, MQTTPublishPacket] = field(init=False, factory=dict)
+    shared_subscriptions: SubscriptionIndex = field(init=False, factory=SubscriptionIndex)
+    retained_messages: RetainedMessages = field(init=False, factory=RetainedMessages)
 
     def add_client_session(self, session: MQTTBrokerClientStateMachine) -> None:  # noqa: D102
         if session.client_id is None:
@@ -83,16 +84,15 @@ class MQTTBrokerStateMachine:
         ):
             return
 
-        for packet in self.retained_messages.values():
-            if subscription.matches(packet):
-                session.deliver_publish(
-                    topic=packet.topic,
-                    payload=packet.payload,
-                    retain=packet.retain,
-                    qos=min(packet.qos, subscription.max_qos),
-                    user_properties=packet.user_properties,
-                    subscription_id=subscription.subscription_id,
-                )
+        for packet in self.retained_messages.match(subscription.pattern):
+            session.deliver_publish(
+                topic=packet.topic,
+                payload=packet.payload,
+                retain=packet.retain,
+                qos=min(packet.qos, subscription.max_qos),
+                user_properties=packet.user_properties,
+                subscription_id=subscription.subscription_id,
+            )
 
     def unsubscribe_session_from(
         self, session: MQTTBrokerClientStateMachine, pattern: Pattern | str
@@ -158,25 +158,27 @@ class MQTTBrokerStateMachine:
 
         recipients: set[str] = set()
         drp = set()
-        for pattern, clients in self.shared_subscriptions.items():
+        # Encode the packet only once for each distinct set of parameters
+        encoded: dict[tuple, tuple[bytes, int | None]] = {}
+        for pattern, clients in self.shared_subscriptions.match(packet.topic):
             drop: set[str] = set()
-            if pattern.matches(packet):
-                for client_id, subscr in clients.items():
-                    client = self.client_state_machines.get(client_id)
-                    if client and (not subscr.no_local or source_client_id != client_id):
-                        try:
-                            client.deliver_publish(
-                                topic=packet.topic,
-                                payload=packet.payload,
-                                retain=packet.retain,
-                                qos=min(packet.qos, subscr.max_qos),
-                                user_properties=packet.user_properties,
-                                subscription_id=subscr.subscription_id,
-                            )
-                        except MQTTProtocolError:
-                            drop.add(client_id)
-                        else:
-                            recipients.add(client.client_id)
+            for client_id, subscr in clients.items():
+                client = self.client_state_machines.get(client_id)
+                if client and (not subscr.no_local or source_client_id != client_id):
+                    try:
+                        client.deliver_publish(
+                            topic=packet.topic,
+                            payload=packet.payload,
+                            retain=packet.retain,
+                            qos=min(packet.qos, subscr.max_qos),
+                            user_properties=packet.user_properties,
+                            subscription_id=subscr.subscription_id,
+                            encoded=encoded,
+                        )
+                    except MQTTProtocolError:
+                        drop.add(client_id)
+                    else:
+                        recipients.add(client.client_id)
 
             for client in drop:
                 del clients[client]
@@ -238,6 +240,7 @@ class MQTTBrokerClientStateMachine(BaseMQTTClientStateMachine):
         retain: bool = False,
         user_properties: dict[str, str] | None = None,
         subscription_id: Sequence[int] = (),
+        encoded: dict[tuple, tuple[bytes, int | None]] | None = None,
     ) -> int | None:
         """
         Deliver a ``PUBLISH`` message to this client if the current state allows it.
@@ -247,6 +250,8 @@ class MQTTBrokerClientStateMachine(BaseMQTTClientStateMachine):
         :param qos:
         :param retain: ``True`` to send the message to any future subscribers of the
             topic too
+        :param encoded: a cache of encoded packets, shared between all recipients
+            of the same message. Keyed by QoS, retain flag and subscription ID.
         :return: the packet ID if ``qos`` was higher than 0
         """
         self._out_require_state(MQTTClientState.CONNECTED)
@@ -261,7 +266,22 @@ class MQTTBrokerClientStateMachine(BaseMQTTClientStateMachine):
         )
         if subscription_id:
             packet.properties[PropertyType.SUBSCRIPTION_IDENTIFIER] = subscription_id
-        packet.encode(self._out_buffer)
+        if encoded is None:
+            packet.encode(self._out_buffer)
+        else:
+            key = (
+                qos,
+                retain,
+                tuple(subscription_id) if isinstance(subscription_id, list) else subscription_id,
+            )
+            try:
+                data, offset = encoded[key]
+            except KeyError:
+                data, offset = encoded[key] = packet.encode_shared()
+            start = len(self._out_buffer)
+            self._out_buffer += data
+            if offset is not None:
+                MQTTPublishPacket.patch_packet_id(self._out_buffer, start, offset, packet_id)
         if packet.packet_id is not None:
             self._add_pending_packet(packet, local=True)
 
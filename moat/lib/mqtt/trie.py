@@ -0,0 +1,64 @@
+"""
+A trie of topic levels, for indexing topics or topic filters.
+
+The trie itself is just its root `TrieNode`. `trie_insert` and
+`trie_remove` add and remove paths; lookups walk ``children`` directly,
+as the rules for wildcards differ between users.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+__all__ = ["TrieNode", "trie_insert", "trie_remove"]
+
+
+class TrieNode:
+    """
+    A node in a topic trie.
+
+    ``children`` maps the next level to its node. ``key`` and ``value``
+    are free for the trie's user; a node where both are `None` is empty.
+    """
+
+    __slots__ = ("children", "key", "value")
+
+    def __init__(self) -> None:
+        self.children: dict[str, TrieNode] = {}
+        self.key: Any = None
+        self.value: Any = None
+
+
+def trie_insert(root: TrieNode, levels: Sequence[str]) -> TrieNode:
+    """
+    Return the node for these levels, creating it if necessary.
+    """
+    node = root
+    for level in levels:
+        nx = node.children.get(level)
+        if nx is None:
+            node.children[level] = nx = TrieNode()
+        node = nx
+    return node
+
+
+def trie_remove(root: TrieNode, levels: Sequence[str]) -> None:
+    """
+    Clear the node for these levels, then remove it and its parents if
+    they're empty.
+
+    The node must exist.
+    """
+    # Walk down, remembering the path so that empty nodes can be pruned.
+    node = root
+    path = []
+    for level in levels:
+        path.append((node, level))
+        node = node.children[level]
+    node.key = node.value = None
+    while path and node.key is None and node.value is None and not node.children:
+        node, level = path.pop()
+        del node.children[level]
@@ -23,6 +23,7 @@ if _TC:
     from .base import MsgSender as MsgSender
     from .base import OptDict as OptDict
     from .base import SubMsgSender as SubMsgSender
+    from .base import dispatch_stats as dispatch_stats
     from .msg import Msg as Msg
     from .msg import MsgResult as MsgResult
     from .nest import CmdStream as CmdStream
@@ -46,6 +47,7 @@ _imports = {
     "MsgSender": "base",
     "OptDict": "base",
     "SubMsgSender": "base",
+    "dispatch_stats": "base",
     # From msg
     "Msg": "msg",
     "MsgResult": "msg",
@@ -118,6 +120,7 @@ __all__ = [  # noqa:RUF022
     "MsgSender",
     "OptDict",
     "SubMsgSender",
+    "dispatch_stats",
     # From msg (lazy via TYPE_CHECKING)
     "Msg",
     "MsgResult",
@@ -25,7 +25,15 @@ logger = logging.getLogger(__name__)
 __all__ = ["AioStream", "rpc_on_aiostream"]
 
 
-class AioStream(HandlerStream):  # noqa: D101
+class AioStream(HandlerStream):
+    """
+    A `HandlerStream` on top of an anyio byte stream.
+
+    If @batch is >1, up to that many queued messages are encoded into a
+    single buffer and written at once. @batch_ms is the time to wait
+    for more messages before writing a partial batch.
+    """
+
     __codec: Codec
 
     def __init__(
@@ -34,10 +42,14 @@ class AioStream(HandlerStream):  # noqa: D101
         stream,
         debug: str | None = None,
         codec: str | Codec | None = None,
+        batch: int = 1,
+        batch_ms: int = 0,
         **kw,
     ):
         self.__s = stream
         self.__debug = debug
+        self.__batch = batch
+        self.__batch_ms = batch_ms
 
         if codec is None:
             from moat.util.cbor import StdCBOR  # noqa: PLC0415
@@ -69,12 +81,21 @@ class AioStream(HandlerStream):  # noqa: D101
         conn = self.__s
         codec = self.__codec
         wr = conn.write if hasattr(conn, "write") else conn.send
+        batch = self.__batch
         while True:
             try:
-                msg = await self.msg_out()
+                if batch > 1:
+                    msgs = await self.msg_out_batch(batch, self.__batch_ms)
+                else:
+                    msg = await self.msg_out()
             except EOFError:
                 return
-            buf = codec.encode(msg)
+            if batch > 1:
+                buf = bytearray()
+                for msg in msgs:
+                    buf += codec.encode(msg)
+            else:
+                buf = codec.encode(msg)
             if self.__debug:
                 logger.debug("W%s %r", self.__debug, bytes(buf))
             await wr(buf)
@@ -88,12 +109,16 @@ async def rpc_on_aiostream(
     codec: Codec | str | None = None,
     debug: bool = False,
     logger=None,
+    batch: int = 1,
+    batch_ms: int = 0,
 ) -> MsgHandler:
     """
     Run a command handler on top of an anyio stream, using the given codec.
 
     @cmd is the handler for incoming messages. It may be `None`.
 
+    @batch and @batch_ms enable write coalescing, see `AioStream`.
+
     This is an async context manager that yields the command handler.
 
     The default codec is `moat.util.cbor.Codec`.
@@ -104,7 +129,15 @@ async def rpc_on_aiostream(
         async with (
             ungroup,
             stream,
-            AioStream(cmd, stream, codec=codec, debug=debug, logger=logger) as hs,
+            AioStream(
+                cmd,
+                stream,
+                codec=codec,
+                debug=debug,
+                logger=logger,
+                batch=batch,
+                batch_ms=batch_ms,
+            ) as hs,
         ):
             y = True
             yield hs
@@ -15,8 +15,26 @@ from .errors import NotReadyError, ShortCommandError
 
 from typing import TYPE_CHECKING
 
+try:
+    from time import perf_counter_ns as _ns
+except ImportError:  # MicroPython
+    from time import ticks_us
+
+    def _ns():
+        return ticks_us() * 1000
+
+
 _link_id = 0
 
+# class > (prefix, is_last, name, can_stream) > (kind, attribute name)
+_dispatch: dict[type, dict[tuple, tuple[int, str]]] = {}
+_K_CMD = 0
+_K_STREAM = 1
+_K_SUB = 2
+
+# command > [count, nanoseconds]
+_stats: dict[tuple, list[int]] | None = None
+
 if TYPE_CHECKING:
     from contextlib import AbstractContextManager
     from types import EllipsisType
@@ -29,7 +47,25 @@ if TYPE_CHECKING:
     Key = str | int | bool
     OptDict = Mapping[str, Any] | None
 
-__all__ = ["BaseMsgHandler", "MsgHandler", "MsgLink", "MsgSender"]
+__all__ = ["BaseMsgHandler", "MsgHandler", "MsgLink", "MsgSender", "dispatch_stats"]
+
+
+def dispatch_stats(enable: bool | None = None) -> dict[tuple, list[int]] | None:
+    """
+    Profiling support for `MsgHandler.handle`.
+
+    Returns a dict that maps each command to a ``[count, nanoseconds]``
+    list, i.e. how many cached lookups have been done for it (one per
+    level of a multi-level command) and how long they took in total,
+    or ``None`` if not enabled.
+
+    @enable=True clears the counters and starts collecting; @enable=False
+    stops.
+    """
+    global _stats
+    if enable is not None:
+        _stats = {} if enable else None
+    return _stats
 
 
 class MsgLink:
@@ -572,10 +608,12 @@ class MsgHandler(BaseMsgHandler):
             if hasattr(self, name):
                 raise RuntimeError(f"{name}: already known")
             setattr(self, name, service)
+            _dispatch.pop(type(self), None)
             try:
                 yield self
             finally:
                 delattr(self, name)
+                _dispatch.pop(type(self), None)
 
     async def handle(self, msg: Msg, rcmd: list, *prefix: list[str]):
         """
@@ -596,6 +634,66 @@ class MsgHandler(BaseMsgHandler):
 
         * If that doesn't exist, raise a `KeyError`.
 
+        The method found for a command is cached per class, so subsequent
+        messages don't need to search for it.
+        """
+        if rcmd and rcmd[0] != "doc_" and rcmd[0] != "rdy_":
+            if _stats is not None:
+                t = _ns()
+            key = (prefix, len(rcmd) == 1, rcmd[-1], msg.can_stream)
+            try:
+                kind, name = _dispatch[type(self)][key]
+            except KeyError:
+                kind, name = self._dispatch_find(key)
+            if name is not None and (cmd := getattr(self, name, None)) is not None:
+                if _stats is not None:
+                    st = _stats.setdefault(tuple(msg.cmd), [0, 0])
+                    st[0] += 1
+                    st[1] += _ns() - t
+                if kind == _K_CMD:
+                    return await msg.call_simple(cmd)
+                if kind == _K_STREAM:
+                    return await msg.call_stream(cmd)
+                rcmd.pop()
+                if hasattr(cmd, "handle"):
+                    cmd = cmd.handle
+                return await cmd(msg, rcmd)
+
+        return await self._handle_slow(msg, rcmd, *prefix)
+
+    def _dispatch_find(self, key: tuple) -> tuple[int | None, str | None]:
+        """
+        Find the attribute that handles a command, for `handle`, and
+        cache it.
+
+        This follows the same rules as `_handle_slow`.
+        """
+        prefix, last, name, can_stream = key
+        pref = "_" + "_".join(prefix) if prefix else ""
+        if last:
+            if not can_stream and getattr(self, f"cmd{pref}_{name}", None) is not None:
+                res = (_K_CMD, f"cmd{pref}_{name}")
+            elif getattr(self, f"stream{pref}_{name}", None) is not None:
+                res = (_K_STREAM, f"stream{pref}_{name}")
+            elif getattr(self, f"sub{pref}_{name}", None) is not None:
+                res = (_K_SUB, f"sub{pref}_{name}")
+            else:
+                return None, None
+        elif getattr(self, f"sub{pref}_{name}", None) is not None:
+            res = (_K_SUB, f"sub{pref}_{name}")
+        else:
+            return None, None
+
+        try:
+            cache = _dispatch[type(self)]
+        except KeyError:
+            cache = _dispatch[type(self)] = {}
+        cache[key] = res
+        return res
+
+    async def _handle_slow(self, msg: Msg, rcmd: list, *prefix: list[str]):
+        """
+        The uncached part of `handle`.
         """
         pref = "_" + "_".join(prefix) if prefix else ""
 
@@ -6,7 +6,7 @@ from __future__ import annotations
 
 from functools import partial
 
-from moat.util import Path, QueueFull, pop_kw, push_kw
+from moat.util import Path, QueueEmpty, QueueFull, pop_kw, push_kw
 from moat.lib.micro import (
     ACM,
     AC_exit,
@@ -14,12 +14,14 @@ from moat.lib.micro import (
     L,
     Queue,
     TaskGroup,
+    TimeoutError,  # noqa:A004
     log,
     log_exc,
     shield,
     sleep_ms,
     ticks_diff,
     ticks_ms,
+    wait_for_ms,
 )
 from moat.lib.rpc import (
     B_ERROR,
@@ -379,7 +381,39 @@ class HandlerStream(MsgHandler):
         await self._send_q.put((link, a, kw, flag))
 
     async def msg_out(self) -> list:  # noqa: D102
-        link, a, kw, flag = await self._send_q.get()
+        return self._msg_enc(await self._send_q.get())
+
+    async def msg_out_batch(self, n: int, delay_ms: int = 0) -> list[list]:
+        """
+        Like `msg_out`, but returns a list of up to @n messages: all that
+        are queued already, plus those that arrive within @delay_ms.
+
+        Use this to coalesce a burst of small messages into one write.
+        """
+        res = [await self.msg_out()]
+        if delay_ms:
+            t = ticks_ms()
+        while len(res) < n:
+            try:
+                item = self._send_q.get_nowait()
+            except QueueEmpty:
+                if not delay_ms:
+                    break
+                td = delay_ms - ticks_diff(ticks_ms(), t)
+                if td <= 0:
+                    break
+                try:
+                    item = await wait_for_ms(td, self._send_q.get)
+                except (TimeoutError, EOFError):
+                    break
+            except EOFError:
+                # the next call will raise it
+                break
+            res.append(self._msg_enc(item))
+        return res
+
+    def _msg_enc(self, item: tuple) -> list:
+        link, a, kw, flag = item
         i = i_f2wire(link.id, flag)
 
         res: list[Any] = [i]
@@ -87,6 +87,20 @@ class _CBORMsgBuf(StackedMsg):
                     await self.s.wr(self.pref)
             await self.s.wr(msg)
 
+    async def send_many(self, msgs: list[Any]) -> None:
+        "Send some messages with a single write."
+        buf = bytearray()
+        for msg in msgs:
+            if self.pref is not None:
+                buf += self.pref
+            try:
+                buf += self.codec.encode(msg)
+            except Exception:
+                log("MSG:\n%r", msg)
+                raise
+        async with self.w_lock:
+            await self.s.wr(buf)
+
     async def recv(self) -> Any:
         """
         Receive the next object.
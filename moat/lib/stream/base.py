@@ -170,6 +170,16 @@ class BaseMsg(BaseConn):
         """
         raise NotImplementedError(f"'send' in {self!r}")
 
+    async def send_many(self, ms: list[Any]) -> None:
+        """
+        Send some messages.
+
+        By default this calls `send` for each of them. Override this if
+        the messages can be combined into a single write.
+        """
+        for m in ms:
+            await self.send(m)
+
     async def recv(self) -> Any:
         """
         Receive a message.
@@ -267,6 +277,17 @@ class StackedMsg(StackedConn, BaseMsg):
         "Send. Transmits a structured message"
         return self.s.send(m)
 
+    def send_many(self, ms):  # async
+        """
+        Send some messages.
+
+        If `send` isn't overridden, this is forwarded to the lower layer,
+        which may combine them. Otherwise they're sent one by one.
+        """
+        if type(self).send is StackedMsg.send:
+            return self.s.send_many(ms)
+        return super().send_many(ms)
+
     def recv(self):  # async
         "Receive. Returns a message."
         return self.s.recv()
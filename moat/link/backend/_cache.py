@@ -0,0 +1,69 @@
+"""
+Bounded caches for decoding incoming messages.
+"""
+
+from __future__ import annotations
+
+from time import perf_counter_ns
+
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Hashable
+    from typing import Any
+
+__all__ = ["DecodeCache"]
+
+
+class DecodeCache:
+    """
+    A least-recently-used cache in front of a decoding function.
+
+    Calling the cache returns ``decode(key)``. Exceptions are not cached.
+    Cached values are shared, so they must not be modified.
+
+    A size of zero disables caching; the statistics are still collected.
+    """
+
+    def __init__(self, decode: Callable[[Hashable], Any], size: int):
+        self.decode = decode
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self.ns = 0
+        self._data: OrderedDict[Hashable, Any] = OrderedDict()
+
+    def __call__(self, key: Hashable) -> Any:
+        t = perf_counter_ns()
+        data = self._data
+        try:
+            val = data[key]
+        except KeyError:
+            val = self.decode(key)
+            self.misses += 1
+            if self.size:
+                data[key] = val
+                if len(data) > self.size:
+                    data.popitem(last=False)
+        else:
+            data.move_to_end(key)
+            self.hits += 1
+        self.ns += perf_counter_ns() - t
+        return val
+
+    def clear(self) -> None:
+        "Empty the cache."
+        self._data.clear()
+
+    @property
+    def stats(self) -> dict:
+        "hit rate and mean time per lookup"
+        n = self.hits + self.misses
+        return dict(
+            size=len(self._data),
+            hits=self.hits,
+            misses=self.misses,
+            rate=self.hits / n if n else None,
+            ns=self.ns / n if n else None,
+        )
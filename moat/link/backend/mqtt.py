@@ -17,6 +17,7 @@ from moat.util.path import PS, P, Path
 
 from . import Backend as _Backend
 from . import Message, RawMessage
+from ._cache import DecodeCache
 
 from typing import TYPE_CHECKING, overload
 
@@ -60,6 +61,10 @@ class Backend(_Backend):
         @meta: if set (the default), always attach metadata when sending.
         @will: topic+data+retain+qos+codec for on-death message
 
+        Incoming topics and metadata are decoded via LRU caches, sized by
+        the ``topic_cache`` and ``meta_cache`` config values. Their hit
+        rates are available via `decode_stats`.
+
         """
         super().__init__(cfg, name=name, id=id)
         self.cfg = cfg
@@ -69,6 +74,8 @@ class Backend(_Backend):
         kw = cfg.copy()
         sname = kw.pop("driver", "mqtt")
         self.trace = kw.pop("trace", False)
+        self.topic_cache = DecodeCache(PS, kw.pop("topic_cache", 10000))
+        self.meta_cache = DecodeCache(MsgMeta.parse, kw.pop("meta_cache", 1000))
         try:
             codec = kw.pop("codec")  # intentionally no default
         except KeyError:
@@ -95,6 +102,12 @@ class Backend(_Backend):
             )
         self.a, self.kw = a, kw
 
+    def decode_stats(self) -> dict:
+        """
+        Report hit rates and per-message times of the decode caches.
+        """
+        return dict(topic=self.topic_cache.stats, meta=self.meta_cache.stats)
+
     @asynccontextmanager
     async def connect(self):
         "connect to the server"
@@ -248,7 +261,7 @@ class _SubGet:
         while True:
             msg = await anext(self.sub)
             try:
-                top = PS(msg.topic)
+                top = back.topic_cache(msg.topic)
             except Exception as exc:
                 await back.send(
                     P(":R.error.link.mqtt.topic"),
@@ -263,7 +276,7 @@ class _SubGet:
                 oprop = prop  # remember for error
                 try:
                     if prop:
-                        prop = MsgMeta.decode(back.name, prop)
+                        prop = MsgMeta.from_parts(back.name, back.meta_cache(prop))
                     else:
                         prop = MsgMeta(name=back.name)
 
@@ -0,0 +1,147 @@
+"""
+A client-side read cache for MoaT-Link data.
+"""
+
+from __future__ import annotations
+
+import anyio
+import logging
+
+from moat.util import NotGiven, Path
+
+from .node import Node
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .client import LinkSender
+    from .meta import MsgMeta
+
+    from typing import Any
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["CacheOverflowError", "DataCache"]
+
+
+class CacheOverflowError(RuntimeError):
+    """The cached subtree has more entries than allowed."""
+
+
+class DataCache:
+    """
+    A local mirror of a MoaT-Link subtree, kept current by a watcher.
+
+    Use `LinkSender.d_cache` to create one. While it is active,
+    `LinkSender.d_get` answers requests for paths below @path from the
+    mirror instead of asking the server.
+
+    The mirror is only used when it's in sync with the server. It isn't
+    while the initial state is being fetched, or after the watcher
+    failed and is restarting. In that case `d_get` asks the server.
+    `get` keeps answering from the last mirror while the watcher
+    resyncs, and marks its result as stale.
+
+    Updates arrive via MQTT, so there is no read-your-writes guarantee:
+    a `d_get` directly after a `d_set` may return the old value.
+
+    If the subtree has more than @max_nodes entries with data, the
+    mirror is dropped and the cache stops. Requests then go to the
+    server again.
+    """
+
+    def __init__(self, link: LinkSender, path: Path, max_nodes: int = 10000, retry: float = 1):
+        self.link = link
+        self.path = path
+        self.max_nodes = max_nodes
+        self.retry = retry
+
+        self.node: Node | None = None
+        self.n_nodes = 0
+        self.synced = False
+        self.overflow = False
+        self.hits = 0
+        self.misses = 0
+        self._evt = anyio.Event()
+
+    def _node_cls(self) -> type[Node]:
+        cache = self
+
+        class _CacheNode(Node):
+            def set_(self, path, data, meta):
+                # count entries with data, not nodes: deleted entries
+                # stay in the tree as small tombstones
+                had = self._data is not NotGiven
+                super().set_(path, data, meta)
+                cache.n_nodes += (data is not NotGiven) - had
+                if cache.n_nodes > cache.max_nodes:
+                    cache.overflow = True
+                    raise CacheOverflowError(cache.path, cache.max_nodes)
+
+        return _CacheNode
+
+    async def run(self, *, task_status=anyio.TASK_STATUS_IGNORED):
+        """
+        Keep the mirror current. Restarts the watcher when it fails.
+        """
+        task_status.started(self)
+        while True:
+            try:
+                self.n_nodes = 0
+                async with self.link.d_watch(
+                    self.path, subtree=True, meta=True, cls=self._node_cls()
+                ) as w:
+                    self.node = await w.get_node()
+                    self.synced = True
+                    self._evt.set()
+                    await anyio.sleep_forever()
+            except Exception as exc:
+                self.synced = False
+                if self._evt.is_set():
+                    self._evt = anyio.Event()
+                if self.overflow:
+                    # the error may arrive wrapped in an exception group
+                    logger.warning(
+                        "Cache %s: more than %d entries, disabled", self.path, self.max_nodes
+                    )
+                    self.node = None
+                    self._evt.set()
+                    return
+                # keep the old mirror for `get` until the new one is ready
+                logger.warning("Cache %s: watch failed, resyncing", self.path, exc_info=exc)
+                await anyio.sleep(self.retry)
+
+    async def wait(self):
+        "Wait until the mirror is in sync, or has been dropped."
+        await self._evt.wait()
+
+    def covers(self, path: Path) -> bool:
+        "Check whether @path is within this cache."
+        n = len(self.path)
+        return len(path) >= n and tuple(path)[:n] == tuple(self.path)
+
+    def get(self, path: Path) -> tuple[Any, MsgMeta, bool]:
+        """
+        Look up @path, which must be covered by this cache.
+
+        Returns data, metadata, and a flag that's `True` if the mirror is
+        not currently in sync, i.e. the watcher is resyncing. Raises
+        `KeyError` if the entry doesn't exist or has been deleted, or if
+        there is no mirror.
+        """
+        node = self.node
+        if node is None:
+            raise KeyError(path)
+        res = node[Path.build(tuple(path)[len(self.path) :])]
+        return res.data, res.meta, not self.synced
+
+    @property
+    def stats(self) -> dict:
+        "cache state and hit counters"
+        return dict(
+            synced=self.synced,
+            overflow=self.overflow,
+            nodes=self.n_nodes,
+            hits=self.hits,
+            misses=self.misses,
+        )
@@ -56,6 +56,7 @@ if TYPE_CHECKING:
     from moat.link.node.codec import CodecNode
 
     from .backend import Message
+    from .cache import DataCache
     from .schema import Data
     from .schema import SchemaName as S
 
@@ -252,6 +253,7 @@ class LinkSender(MsgSender):
     def __init__(self, link: LinkCommon):
         self._link = link
         self.announced = self._link.announced
+        self._caches: list[DataCache] = []
 
     @property
     def root(self):
@@ -309,15 +311,58 @@ class LinkSender(MsgSender):
 
         Returns a data+metadata tuple if @meta is True, otherwise just the
         data.
+
+        If a synced `d_cache` covers @path, the server is not asked.
         """
         if len(path) and isinstance(path[0], Path):
             raise ValueError("Don't use a root-prefixed path here.")
 
+        for cache in self._caches:
+            if not cache.covers(path):
+                continue
+            if not cache.synced:
+                cache.misses += 1
+                break
+            cache.hits += 1
+            data, m, _ = cache.get(path)
+            if not meta:
+                return data
+            return data, m
+
         res = await self.d.get(path)
         if not meta:
             return res[0]
         return res[0], MsgMeta.restore(res[1:])
 
+    @asynccontextmanager
+    async def d_cache(self, path: Path, max_nodes: int = 10000, wait: bool = True):
+        """
+        Mirror the subtree at @path locally while this context is active.
+
+        `d_get` answers requests for this subtree from the mirror as
+        long as it is in sync. Use the cache's `DataCache.get` method if
+        you need to know whether data might be stale.
+
+        The mirror is dropped if the subtree has more than @max_nodes
+        entries.
+
+        If @wait is set (the default), the context is only entered after
+        the initial state has been loaded.
+        """
+        from .cache import DataCache  # noqa: PLC0415
+
+        cache = DataCache(self, path, max_nodes=max_nodes)
+        async with anyio.create_task_group() as tg:
+            await tg.start(cache.run)
+            self._caches.append(cache)
+            try:
+                if wait:
+                    await cache.wait()
+                yield cache
+            finally:
+                self._caches.remove(cache)
+                tg.cancel_scope.cancel()
+
     @overload
     async def d_set(
         self,
@@ -0,0 +1,48 @@
+# command line interface  # noqa: D100
+from __future__ import annotations
+
+import anyio
+
+import asyncclick as click
+
+
+@click.command(short_help="Compact the server's save files.")  # pylint: disable=undefined-variable
+@click.option(
+    "-o",
+    "--output",
+    type=click.Path(writable=True, allow_dash=False),
+    default=None,
+    help="File to write to. Default: replace the input.",
+)
+@click.argument(
+    "file", type=click.Path(readable=True, exists=True, allow_dash=False), required=False
+)
+@click.pass_obj
+async def cli(obj, file, output):
+    """
+    Merge a MoaT-Link save file with its predecessors.
+
+    The server alternates between full and incremental save files. This
+    command combines an incremental file and the chain of files it depends
+    on into a single full file, so that restarting doesn't need to replay
+    all of them.
+
+    FILE defaults to the newest file in the server's save directory.
+    That file should not be written to, so either stop the server or use
+    the second-newest file.
+    """
+    from moat.link.server.compact import compact  # noqa: PLC0415
+
+    if file is None:
+        dest = anyio.Path(obj.cfg.link.server.save.dir)
+        fs = []
+        async for p, _d, f in dest.walk():
+            fs.extend(p / ff for ff in f if ff.endswith(".moat"))
+        if not fs:
+            raise click.UsageError(f"No save files in {str(dest)!r}")
+        file = max(fs)
+
+    files = await compact(file, output)
+    print(f"{output or file}: merged {len(files)} files", file=obj.stdout)
+    for f in files:
+        print(f"  {f}", file=obj.stdout)
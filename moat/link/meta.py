@@ -6,6 +6,7 @@ from __future__ import annotations
 
 import time
 from base64 import b85decode, b85encode
+from copy import copy
 
 import ruyaml as yaml
 from attrs import define, field
@@ -238,7 +239,16 @@ class MsgMeta:
 
         Reverses the effect of `encode`.
         """
-        res = cls(NotGiven)
+        return cls.from_parts(name, cls.parse(data))
+
+    @staticmethod
+    def parse(data: str) -> tuple[Any, ...]:
+        """
+        Split and decode the elements of an encoded `MsgMeta`.
+
+        This is the expensive part of `decode`. The result can be cached:
+        `from_parts` doesn't modify it.
+        """
         ddec = []
 
         encoded = False
@@ -270,6 +280,20 @@ class MsgMeta:
             ddec.append(d)
             encoded = next_enc
 
+        return tuple(ddec)
+
+    @classmethod
+    def from_parts(cls, name: str, parts: tuple[Any, ...]) -> Self:
+        """
+        Build a `MsgMeta` object from the result of `parse`.
+
+        The result is a shallow copy: nested values are shared.
+        """
+        ddec = list(parts)
+        if ddec and isinstance(ddec[-1], dict):
+            ddec[-1] = copy(ddec[-1])
+
+        res = cls(NotGiven)
         res._unmap(ddec)
         res._clean(name)
         return res
@@ -4,6 +4,7 @@ This module contains the basic MoaT-Link data model.
 
 from __future__ import annotations
 
+from bisect import bisect_left, insort
 from logging import getLogger
 
 from attrs import define, field
@@ -35,6 +36,65 @@ def _keys_repr(x):
     return ",".join(str(k) for k in x)
 
 
+def _ts(x):
+    return x[0]
+
+
+class ChangeLog:
+    """
+    An index of (timestamp, path) pairs, sorted by timestamp.
+
+    Entries that have been superseded by a later change to the same path
+    are skipped when reading, and dropped when they start to outnumber the
+    current ones.
+    """
+
+    def __init__(self):
+        self._log: list[tuple[float, Path]] = []
+        self._current: dict[Path, float] = {}
+        self._stale = 0
+
+    def __len__(self):
+        return len(self._current)
+
+    def add(self, path: Path, timestamp: float):
+        "Record that @path has been changed at @timestamp."
+        prev = self._current.get(path)
+        if prev == timestamp:
+            return
+        self._current[path] = timestamp
+        if not self._log or self._log[-1][0] <= timestamp:
+            self._log.append((timestamp, path))
+        else:
+            insort(self._log, (timestamp, path), key=_ts)
+
+        if prev is not None:
+            self._stale += 1
+            if self._stale > len(self._current):
+                self._compact()
+
+    def _compact(self):
+        cur = self._current
+        self._log = [(ts, p) for ts, p in self._log if cur.get(p) == ts]
+        self._stale = 0
+
+    def discard(self, path: Path):
+        "Forget about @path."
+        if self._current.pop(path, None) is not None:
+            self._stale += 1
+
+    def since(self, timestamp: float) -> Iterator[tuple[float, Path]]:
+        """
+        Iterate the paths that have changed at or after @timestamp, oldest first.
+        """
+        cur = self._current
+        log = self._log
+        for i in range(bisect_left(log, timestamp, key=_ts), len(log)):
+            ts, p = log[i]
+            if cur.get(p) == ts:
+                yield ts, p
+
+
 @define
 class Node:
     """Represents one MoaT-Link item."""
@@ -43,6 +103,27 @@ class Node:
     _meta: MsgMeta | None = field(init=False, default=None)
 
     _sub: dict[Key, Node] = field(init=False, factory=dict, repr=_keys_repr)  # sub-entries
+    _changes: ChangeLog | None = field(init=False, default=None, repr=False)
+
+    def track_changes(self):
+        """
+        Maintain an index of changes to this subtree, so that
+        ``walk(timestamp=…)`` doesn't need to scan all of it.
+
+        Only changes that go through this node's `set` and `load` are
+        indexed, so don't modify the subtree via its sub-nodes afterwards.
+        """
+        if self._changes is not None:
+            return
+        self._changes = ChangeLog()
+
+        def _scan(s, p):
+            if s._meta is not None:  # noqa:SLF001
+                self._changes.add(p, s._meta.timestamp)  # noqa:SLF001
+            for k, v in s._sub.items():  # noqa:SLF001
+                _scan(v, p / k)
+
+        _scan(self, Path())
 
     def set(self, item: Path, data: Any, meta: MsgMeta, force: bool = False) -> bool | None:
         """Save new data below this node.
@@ -60,6 +141,12 @@ class Node:
             if not force and s._data == data:  # noqa:SLF001
                 return None
         s.set_(item, data, meta)
+        if self._changes is not None:
+            if item is Ellipsis:
+                item = Path()
+            elif not isinstance(item, Path):
+                item = Path(item)
+            self._changes.add(item, meta.timestamp)
         return True
 
     def set_(self, path: Path, data: Any, meta: MsgMeta):
@@ -160,6 +247,8 @@ class Node:
             if force or n.meta is None or n.meta.timestamp < m.timestamp:
                 n._data = d  # noqa: SLF001
                 n._meta = m  # noqa: SLF001
+                if self._changes is not None:
+                    self._changes.add(p, m.timestamp)
 
     @property
     def meta(self) -> MsgMeta | None:
@@ -279,6 +368,7 @@ class Node:
         timestamp: float = 0,
         depth_first: bool = False,
         force: bool = False,
+        prefix: Path = Path(),
     ):
         """
         Calls coroutine ``proc(node,Subpath)`` on this node and all its children.
@@ -289,7 +379,30 @@ class Node:
         the subtree is skipped.
 
         if @force is set, also visit empty nodes.
+
+        If @prefix is set, walk the subtree at that path instead. Paths
+        passed to @proc are relative to it.
+
+        If this node tracks changes (see `track_changes`) and @timestamp is
+        set, only nodes changed since then are visited, oldest first.
         """
+        if self._changes is not None and timestamp > 0 and not force:
+            await self._walk_changes(proc, prefix, timestamp, min_depth, max_depth)
+            return
+        if len(prefix):
+            try:
+                s = self.get(prefix, create=False)
+            except KeyError:
+                return
+            await s.walk(
+                proc,
+                max_depth=max_depth,
+                min_depth=min_depth,
+                timestamp=timestamp,
+                depth_first=depth_first,
+                force=force,
+            )
+            return
 
         async def _walk(s, p):
             if depth_first and (max_depth is None or max_depth > len(p)):
@@ -308,6 +421,31 @@ class Node:
 
         await _walk(self, Path())
 
+    async def _walk_changes(self, proc, prefix, timestamp, min_depth, max_depth):
+        # `walk` for nodes that track their changes.
+        np = len(prefix)
+        skip = set()
+        for _, p in list(self._changes.since(timestamp)):
+            if np and p[:np] != prefix:
+                continue
+            sp = p[np:]
+            if min_depth is not None and len(sp) < min_depth:
+                continue
+            if max_depth is not None and len(sp) > max_depth:
+                continue
+            if skip and any(sp[:i] in skip for i in range(len(sp))):
+                continue
+            try:
+                s = self.get(p, create=False)
+            except KeyError:
+                # the node has been removed
+                self._changes.discard(p)
+                continue
+            if s.meta is None or s.meta.timestamp < timestamp:
+                continue
+            if await proc(sp, s) is False:
+                skip.add(sp)
+
     def search(self, path: Path) -> Node:
         """
         Find the destination node of a path, including wildcards.
@@ -12,7 +12,7 @@ import random
 import signal
 import time
 from anyio.abc import SocketAttribute
-from contextlib import asynccontextmanager, nullcontext
+from contextlib import asynccontextmanager, nullcontext, suppress
 from datetime import UTC, datetime
 from functools import partial
 from platform import uname
@@ -40,9 +40,10 @@ from moat.util import (
     id2str,
     to_attrdict,
 )
-from moat.lib.broadcast import Broadcaster, BroadcastReader
+from moat.lib.broadcast import Broadcaster, BroadcastReader, RingBroadcaster
 from moat.lib.codec.cbor import CBOR_TAG_CBOR_LEADER, Tag
 from moat.lib.mqtt import QoS
+from moat.lib.priomap import TimerMap
 from moat.lib.rpc import MsgHandler, MsgSender, rpc_on_aiostream
 from moat.link.auth import AnonAuth
 from moat.link.backend import Backend, get_backend
@@ -131,6 +132,21 @@ def tag_check(tags: Sequence[Tag]) -> bool:
     return True
 
 
+def tag_prev(tags: Sequence[Tag]) -> str | None:
+    """
+    Return the name of the file that precedes the one with these tags
+    """
+    if not tags:
+        return None
+    # extract the first tag's value
+    tt = tags[0]
+    while isinstance(tt, Tag):
+        tt = tt.value
+    if isinstance(tt, Sequence):
+        tt = tt[1]
+    return tt.get("prev", None)
+
+
 def _get_my_ip(ip6: bool = False):
     """
     Find my IP address
@@ -402,17 +418,13 @@ class ServerClient(LinkCommon):
             d, sp = ps.short(p)
             await msg.send(d, sp, nd, *n.meta.dump())
 
-        try:
-            d = self.server.data.get(msg[0], create=False)
-        except KeyError:
-            async with msg.stream_out():
-                return
-
         ts = msg.get(1, 0, nulled=True)
         xmin = msg.get(2, 0, nulled=True)
         xmax = msg.get(3, 9999999, nulled=True)
         async with msg.stream_out():
-            await d.walk(_writer, timestamp=ts, min_depth=xmin, max_depth=xmax)
+            await self.server.data.walk(
+                _writer, timestamp=ts, min_depth=xmin, max_depth=xmax, prefix=msg[0]
+            )
 
     doc_d_set = dict(
         _d="set value", _0="Path", _1="Any", _99="MsgMeta:optional", t="Time of last change"
@@ -680,7 +692,7 @@ class Server(MsgHandler):
     cfg: attrdict
 
     service_monitor: Broadcaster[Message]
-    write_monitor: Broadcaster[Tag | tuple[Path, Any, MsgMeta]]
+    write_monitor: RingBroadcaster[Tag | tuple[Path, Any, MsgMeta]]
 
     known_ids: set[str]
     logger: logging.Logger
@@ -719,6 +731,7 @@ class Server(MsgHandler):
         save: anyio.Path | FSPath | str | None = None,
     ):
         self.data = Node()
+        self.data.track_changes()
         self.rdata = Node()
         self.name = name
         self.cfg = to_attrdict(cfg)
@@ -736,6 +749,7 @@ class Server(MsgHandler):
         self._server_link = {}
         self._server_link_add = anyio.Event()
         self._downed = {}
+        self._tombstones = TimerMap()
 
         # connected clients
         self._clients: dict[str, ServerClient] = dict()
@@ -790,10 +804,21 @@ class Server(MsgHandler):
         if len(path) and path[0] == "run":
             return False
         if res := self.data.set(path, data, meta):
+            self._note_deletion(path, data, meta)
             if not local:
                 self.write_monitor((path, data, meta))
         return res
 
+    def _note_deletion(self, path: Path, data: Any, meta: MsgMeta):
+        """
+        Remember when a deleted node may be removed from the tree.
+        """
+        if data is NotGiven:
+            self._tombstones[path] = meta.timestamp + self.cfg.timeout.delete - time.time()
+        else:
+            with suppress(KeyError):
+                del self._tombstones[path]
+
     async def _mon_run(self, topic: Path, msg: Message) -> bool:
         """
         Messages to run.* are skipped by the main monitor backend.
@@ -971,7 +996,7 @@ class Server(MsgHandler):
     async def set_error(
         self,
         path: Path,
-        err: str | BaseException | None | NotGiven,
+        err: str | BaseException | NotGiven | None,
         kw: dict[str, Any],
         meta: MsgMeta,
     ):
@@ -1017,7 +1042,8 @@ class Server(MsgHandler):
 
         # this shortcuts maybe_update
         # forcing is required because we just modified the dict in-place
-        if dt.set(..., dd, meta, force=True):
+        if self.data.set(p, dd, meta, force=True):
+            self._note_deletion(p, dd, meta)
             self.write_monitor((p, dd, meta))
 
     async def _save(
@@ -1052,7 +1078,7 @@ class Server(MsgHandler):
             await writer(hdr)
 
         # await writer({"info": msg})
-        await self.data.get(prefix).walk(saver, timestamp=kw.get("timestamp", 0))
+        await self.data.walk(saver, timestamp=kw.get("timestamp", 0), prefix=prefix)
 
         if ftr:
             if ftr is True:
@@ -1186,6 +1212,7 @@ class Server(MsgHandler):
             finally:
                 self._writing.remove(spath)
                 self._writing_done.set()
+                self._writing_done = anyio.Event()
 
     @staticmethod
     async def _save_stream(rdr, mw, shorter, ign):
@@ -1228,41 +1255,46 @@ class Server(MsgHandler):
 
     async def _flush_deleted(self, *, task_status=anyio.TASK_STATUS_IGNORED):
         """
-        Background task to remove deleted nodes from the tree
+        Background task to remove deleted nodes from the tree.
+
+        Deletions are recorded in a timer map; this task only looks at
+        the nodes whose deletion has expired. It pauses after processing
+        ``cfg.server.gc.budget`` of them.
         """
         task_status.started()
-        await anyio.sleep(self.cfg.timeout.delete / 10)
-        t = time.time()
+        gc = self.cfg.server.gc
+        n = 0
+        async for path in self._tombstones:
+            self._drop_deleted(path)
+            n += 1
+            if n >= gc.budget:
+                await anyio.sleep(gc.pause)
+                n = 0
 
-        async def _walk(d: Node) -> bool:
-            # return True if we need to keep this
-
-            has_any = False
-            await anyio.sleep(0.1)
-
-            # Drop the Meta entry if the deletion was long enough ago
-            if (
-                d._data is NotGiven  # noqa:SLF001
-                and d.meta is not None
-                and t - d.meta.timestamp > self.cfg.timeout.delete
-            ):
-                del d.meta
-            drop = set()
-            for k, v in d.items():
-                if await _walk(v):
-                    has_any = True
-                else:
-                    drop.add(k)
-            for k in drop:
-                del d[k]
-            if has_any or d._data is not NotGiven:  # noqa:SLF001
-                return True
-            return d.meta is not None
-
-        while True:
-            await _walk(self.data)
+    def _drop_deleted(self, path: Path):
+        """
+        Remove a deleted node, plus any parents that are now empty.
+        """
+        nodes = [self.data]
+        try:
+            for k in path:
+                nodes.append(nodes[-1].get(k, create=False))
+        except KeyError:
+            return
+        d = nodes.pop()
+        if d.data_ is not NotGiven or d.meta is None:
+            return
+        if time.time() - d.meta.timestamp < self.cfg.timeout.delete:
+            # re-deleted without going through _note_deletion
+            self._tombstones[path] = d.meta.timestamp + self.cfg.timeout.delete - time.time()
+            return
+        del d.meta
 
-            await anyio.sleep(self.cfg.timeout.delete / 20)
+        for k in reversed(path):
+            if d.keys() or d.data_ is not NotGiven or d.meta is not None:
+                break
+            d = nodes.pop()
+            del d[k]
 
     async def _save_task(self, *, task_status=anyio.TASK_STATUS_IGNORED):
         """
@@ -1272,18 +1304,41 @@ class Server(MsgHandler):
         dest = anyio.Path(save.dir)
         rewrite = 0
         kw = {}
+        prev_full = True
         while True:
+            full = rewrite == 0
             now = datetime.now(UTC)
             fn = dest / now.strftime(save.name)
             await fn.parent.mkdir(exist_ok=True, parents=True)
-            await self.run_saver(path=fn, save_state=rewrite == 0, **kw)
+            await self.run_saver(path=fn, save_state=full, **kw)
 
             task_status.started()
             task_status = anyio.TASK_STATUS_IGNORED
 
+            if save.compact and not prev_full:
+                # kw["prev"] is the now-finished previous file
+                self._tg.start_soon(self._compact_saved, kw["prev"])
+
             await anyio.sleep(save.interval)
             rewrite = (rewrite or save.rewrite) - 1
             kw["prev"] = str(fn)
+            prev_full = full
+
+    async def _compact_saved(self, fn: str):
+        """
+        Background task to merge the save file @fn with its predecessors,
+        so that restarting doesn't need to replay the whole chain.
+        """
+        from .compact import compact  # noqa: PLC0415
+
+        while fn in self._writing:
+            await self._writing_done.wait()
+        try:
+            files = await compact(fn)
+        except Exception as exc:
+            self.logger.warning("Compacting %r failed", fn, exc_info=exc)
+        else:
+            self.logger.info("Compacted %r: %d files", fn, len(files))
 
     async def run_saver(self, path: PathType | None, save_state: bool = True, **kw):
         """
@@ -1347,7 +1402,7 @@ class Server(MsgHandler):
 
         async with (
             EventSetter(self._stopped),
-            Broadcaster(send_last=True, length=1000) as self.write_monitor,
+            RingBroadcaster(send_last=True, length=1000) as self.write_monitor,
             get_backend(self.cfg, name=self.name, will=will_data) as self.backend,
             anyio.create_task_group() as _tg,
         ):
@@ -1827,13 +1882,7 @@ class Server(MsgHandler):
             if not upd or not tags:
                 continue
             if not tag_check(tags):
-                # extract the first tag's value
-                tt = tags[0]
-                while isinstance(tt, Tag):
-                    tt = tt.value
-                if isinstance(tt, Sequence):
-                    tt = tt[1]
-                fn = tt.get("prev", None)
+                fn = tag_prev(tags)
                 if fn is not None:
                     fn = anyio.Path(fn)
                 continue
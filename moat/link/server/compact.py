@@ -0,0 +1,120 @@
+"""
+Compaction of MoaT-Link save files.
+
+The server alternates between full and incremental save files. An
+incremental file's header refers to its predecessor, so restarting
+requires replaying the chain back to the last complete file.
+
+`compact` merges such a chain into a single full file. Entries are
+combined last-writer-wins, by their `MsgMeta.timestamp`; deletions
+are kept as long as they carry metadata.
+"""
+
+from __future__ import annotations
+
+import anyio
+from datetime import UTC, datetime
+
+from moat.util import MsgReader, MsgWriter, NotGiven, PathLongener, PathShortener
+from moat.lib.codec.cbor import CBOR_TAG_CBOR_LEADER, Tag
+from moat.link.meta import MsgMeta
+from moat.link.node import Node
+from moat.util.cbor import CBOR_TAG_MOAT_FILE_ID, gen_start, gen_stop
+
+from ._server import tag_check, tag_prev
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ._server import PathType
+
+__all__ = ["compact", "load_chain"]
+
+
+async def _load_into(fn: anyio.Path, node: Node) -> list[Tag]:
+    """
+    Load the records in @fn into @node. Returns the file's tags.
+    """
+    tags = []
+    pl = PathLongener()
+    async with MsgReader(fn, codec="std-cbor") as rdr:
+        async for msg in rdr:
+            if isinstance(msg, Tag) and msg.tag == CBOR_TAG_CBOR_LEADER:
+                msg = msg.value  # noqa:PLW2901
+            if isinstance(msg, Tag):
+                tags.append(msg)
+                continue
+            if not tags or tags[0].tag != CBOR_TAG_MOAT_FILE_ID:
+                raise ValueError(f"Untagged file: {str(fn)!r}")
+
+            d, p, data, *mt = msg
+            node.set(pl.long(d, p), data, MsgMeta.restore(mt), force=True)
+    return tags
+
+
+async def load_chain(fn: PathType, node: Node) -> list[anyio.Path]:
+    """
+    Load the save file @fn, and its predecessors up to and including the
+    last complete file, into @node.
+
+    Returns the files that have been read, newest first.
+
+    Raises `ValueError` if the chain doesn't end with a complete file.
+    """
+    fn = anyio.Path(fn)
+    files = []
+    while True:
+        if fn in files:
+            raise ValueError(f"Loop in save file chain: {str(fn)!r}")
+        tags = await _load_into(fn, node)
+        files.append(fn)
+        if tag_check(tags):
+            return files
+        fn = tag_prev(tags)
+        if fn is None:
+            raise ValueError(f"Save file chain is incomplete: {str(files[-1])!r}")
+        fn = anyio.Path(fn)
+
+
+async def compact(fn: PathType, dest: PathType | None = None) -> list[anyio.Path]:
+    """
+    Merge the save file @fn and its predecessors into a single full file.
+
+    The result is written to @dest, which defaults to replacing @fn.
+    The new file is written under a temporary name and then renamed, so
+    a concurrent reader sees either the old or the new content.
+
+    Returns the list of files that have been merged, newest first.
+    """
+    fn = anyio.Path(fn)
+    dest = fn if dest is None else anyio.Path(dest)
+
+    node = Node()
+    files = await load_chain(fn, node)
+
+    tmp = dest.with_name(dest.name + ".tmp")
+    shorter = PathShortener([])
+
+    async with MsgWriter(path=tmp, codec="std-cbor") as mw:
+
+        async def saver(path, data) -> None:
+            if data.data_ is NotGiven and data.meta is None:
+                return
+            d, p = shorter.short(path)
+            await mw([d, p, data.data_, *data.meta.dump()])
+
+        mstr = f"MoaT-Link full {dest.name!r}"
+        await mw(
+            gen_start(
+                mstr,
+                mode="full",
+                name=str(dest),
+                time=datetime.now(UTC),
+                compacted=[str(f) for f in files],
+            )
+        )
+        await node.walk(saver)
+        await mw(gen_stop(mode="compact", time=datetime.now(UTC)))
+
+    await tmp.rename(dest)
+    return files
@@ -8,7 +8,7 @@ import errno
 import os
 
 from moat.lib.codec.errors import FileExistsError, FileNotFoundError  # noqa:A004
-from moat.lib.micro import to_thread
+from moat.lib.micro import Lock, to_thread
 from moat.micro.cmd.base import LockBaseCmd
 
 from typing import TYPE_CHECKING
@@ -47,6 +47,16 @@ def _efix(f, p, *a):
         raise
 
 
+def _rd(fh, o, n):
+    fh.seek(o)
+    return fh.read(n)
+
+
+def _wr(fh, o, d):
+    fh.seek(o)
+    return fh.write(d)
+
+
 class Cmd(LockBaseCmd):
     """
     File system access.
@@ -60,6 +70,9 @@ class Cmd(LockBaseCmd):
     def __init__(self, cfg: attrdict):
         super().__init__(cfg)
         self._fd_cache = dict()
+        # Clients may send several reads or writes at once. Seeking and
+        # accessing a file must not interleave with another request.
+        self._io_lock = Lock()
         try:
             self._pre = cfg["root"]
         except KeyError:
@@ -125,9 +138,8 @@ class Cmd(LockBaseCmd):
 
     async def cmd_rd(self, f: int, o: int = 0, n: int = 64):
         "read @n bytes from @f at offset @o"
-        fh = self._fd(f)
-        fh.seek(o)
-        return await to_thread(fh.read, n)
+        async with self._io_lock:
+            return await to_thread(_rd, self._fd(f), o, n)
 
     doc_wr = dict(_d="write file", _0="int:fileid", _1="int:offset", d="bytes:data")
 
@@ -135,9 +147,8 @@ class Cmd(LockBaseCmd):
         "write @d to @f at offset @o"
         if d is None:
             raise ValueError("No Data")
-        fh = self._fd(f)
-        fh.seek(o)
-        return await to_thread(fh.write, d)
+        async with self._io_lock:
+            return await to_thread(_wr, self._fd(f), o, d)
 
     doc_cl = dict(_d="close file", _0="int:fileid")
 
@@ -0,0 +1 @@
+../../../../../../lib/codec/_buffer.py
\ No newline at end of file
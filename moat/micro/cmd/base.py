@@ -320,6 +320,8 @@ class BaseCmd(Base):
 
 
 BaseCmd.handle = MsgHandler.handle
+BaseCmd._handle_slow = MsgHandler._handle_slow  # noqa:SLF001
+BaseCmd._dispatch_find = MsgHandler._dispatch_find  # noqa:SLF001
 BaseCmd.find_handler = MsgHandler.find_handler
 
 
@@ -28,8 +28,10 @@ class MsgStream(HandlerStream):
 
     """
 
-    def __init__(self, handler: MsgSender, stream: BaseCmdMsg):
+    def __init__(self, handler: MsgSender, stream: BaseCmdMsg, batch: int = 1, batch_ms: int = 0):
         self.__stream = stream
+        self.__batch = batch
+        self.__batch_ms = batch_ms
         super().__init__(handler)
 
     async def read_stream(self):
@@ -42,9 +44,12 @@ class MsgStream(HandlerStream):
     async def write_stream(self):
         "Background stream writer. Started from the HandlerStream context manager."
         str = self.__stream  # noqa: A001
+        batch = self.__batch
         while True:
-            msg = await self.msg_out()
-            await str.send(msg)
+            if batch > 1:
+                await str.send_many(await self.msg_out_batch(batch, self.__batch_ms))
+            else:
+                await str.send(await self.msg_out())
 
 
 class BaseCmdMsg(BaseCmd):
@@ -61,6 +66,15 @@ class BaseCmdMsg(BaseCmd):
     that directly read or write the underlying stream (of whatever type).
 
     This class cannot wrap a pre-existing stream, by design.
+
+    Config:
+        batch (int):
+            if >1, send up to this many queued messages with one write.
+            Messages are only combined by a CBOR buffer layer, optionally
+            below stacked layers that don't modify them; otherwise
+            they're still sent one by one.
+        batch_ms (int):
+            time to wait for more messages before sending a partial batch.
     """
 
     tg: TaskGroup = None
@@ -84,7 +98,12 @@ class BaseCmdMsg(BaseCmd):
         """
         try:
             self.s = await self.stream()
-            async with MsgStream(self.root, self.s) as st:
+            async with MsgStream(
+                self.root,
+                self.s,
+                batch=self.cfg.get("batch", 1),
+                batch_ms=self.cfg.get("batch_ms", 0),
+            ) as st:
                 self.__stream = st
                 if L:
                     self.set_ready()
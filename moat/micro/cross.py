@@ -0,0 +1,149 @@
+"""
+Compile Python files with ``mpy-cross``, with a persistent cache.
+
+"""
+
+# CPython only
+
+from __future__ import annotations
+
+import anyio
+import hashlib
+import logging
+import os
+
+from moat.util.exec import CalledProcessError, run
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["MpyCross"]
+
+
+def _cache_dir() -> anyio.Path:
+    d = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return anyio.Path(d) / "moat" / "mpy-cross"
+
+
+def src_path(src) -> str:
+    """
+    The source path that's compiled into the .mpy file, i.e. @src's path
+    relative to ``_embed/lib``.
+    """
+    p = str(src)
+    if (pi := p.find("/_embed/lib/")) > 0:
+        p = p[pi + 12 :]
+    return p
+
+
+class MpyCross:
+    """
+    Runs ``mpy-cross`` and caches the results.
+
+    The cache is keyed by the source's content, the compiler's version,
+    the path that's compiled into the result, and the compiler flags. It's
+    stored in @cache_dir, by default ``~/.cache/moat/mpy-cross``.
+
+    At most @limit compilers run concurrently.
+    """
+
+    def __init__(
+        self,
+        cross: str,
+        flags: tuple[str, ...] = (),
+        cache_dir: anyio.Path | None = None,
+        limit: int | None = None,
+    ):
+        self.cross = str(cross)
+        self.flags = tuple(flags)
+        self.cache_dir = anyio.Path(cache_dir) if cache_dir is not None else _cache_dir()
+        self.limit = limit or os.cpu_count() or 1
+
+        self.runs = 0
+        self.hits = 0
+        self._version = None
+        self._limiter = None
+
+    async def version(self) -> str:
+        "The compiler's version string."
+        if self._version is None:
+            self._version = await run(self.cross, "--version", capture=True)
+        return self._version
+
+    async def _key(self, data: bytes, spath: str) -> str:
+        h = hashlib.sha256()
+        for v in (await self.version(), spath, *self.flags):
+            h.update(v.encode("utf-8"))
+            h.update(b"\0")
+        h.update(data)
+        return h.hexdigest()
+
+    async def compile(self, src: anyio.Path) -> bytes:
+        """
+        Return the compiled version of @src.
+
+        Raises `CalledProcessError` if the compiler fails.
+        """
+        spath = src_path(src)
+        key = await self._key(await src.read_bytes(), spath)
+        cf = self.cache_dir / key[:2] / key
+        try:
+            res = await cf.read_bytes()
+        except FileNotFoundError:
+            pass
+        else:
+            self.hits += 1
+            return res
+
+        if self._limiter is None:
+            self._limiter = anyio.CapacityLimiter(self.limit)
+        async with self._limiter:
+            self.runs += 1
+            res = await run(
+                self.cross, *self.flags, str(src), "-s", spath, "-o", "/dev/stdout", capture="raw"
+            )
+
+        await cf.parent.mkdir(parents=True, exist_ok=True)
+        tf = cf.with_name(f"{key}.{os.getpid()}.tmp")
+        await tf.write_bytes(res)
+        await tf.rename(cf)
+        return res
+
+    async def prepare(
+        self, src: anyio.Path, check: Callable[[anyio.Path], Awaitable[bool]] | None = None
+    ):
+        """
+        Compile all Python files in @src that aren't cached yet, in
+        parallel.
+
+        @check is the filter that `copytree` uses. Errors are ignored
+        here; `copytree` reports them when it compiles the file again.
+        """
+        todo = []
+
+        async def walk(p, top=False):
+            if await p.is_file():
+                if p.suffix == ".py":
+                    todo.append(p)
+                return
+            if not top and (p.name == "__pycache__" or p.name.startswith(".")):
+                return
+            async for s in p.iterdir():
+                if check is not None and not await check(s):
+                    continue
+                await walk(s)
+
+        async def comp(p):
+            try:
+                await self.compile(p)
+            except CalledProcessError:
+                pass
+
+        await walk(src, top=True)
+        async with anyio.create_task_group() as tg:
+            for p in todo:
+                tg.start_soon(comp, p)
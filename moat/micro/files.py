@@ -21,7 +21,11 @@ from pathlib import Path
 
 from moat.util import attrdict
 from moat.lib.codec.errors import RemoteError
-from moat.util.exec import CalledProcessError, run
+from moat.util.exec import CalledProcessError
+
+from .cross import MpyCross
+
+from collections import deque
 
 logger = logging.getLogger(__name__)
 
@@ -469,6 +473,43 @@ class MoatDevPath(MoatPath):
         return hash_value
 
 
+class _Window:
+    """
+    Bookkeeping for a windowed transfer of the range @start…@end.
+
+    Requests are handed out in order. A request that the remote only
+    handles partially shrinks the chunk size to what it did handle, and
+    the rest is queued for re-sending ahead of everything else.
+    """
+
+    def __init__(self, chunk: int, start: int = 0, end: int = 0):
+        self.chunk = chunk
+        self.next = start
+        self.end = end
+        self.todo = deque()
+
+    def take(self) -> tuple[int, int] | None:
+        "offset and length of the next request, or `None` if done"
+        if self.todo:
+            return self.todo.popleft()
+        if self.next >= self.end:
+            return None
+        off = self.next
+        n = min(self.chunk, self.end - off)
+        self.next += n
+        return off, n
+
+    def short(self, off: int, n: int, got: int):
+        "The request for @n bytes at @off only handled @got of them."
+        self.chunk = min(self.chunk, got)
+        self.todo.appendleft((off + got, n - got))
+
+    def eof(self, off: int):
+        "The file ends at @off."
+        self.end = min(self.end, off)
+        self.todo = deque(j for j in self.todo if j[0] < self.end)
+
+
 class MoatFSPath(MoatPath):
     """
     This object represents a file or directory (existing or not) on the
@@ -478,8 +519,16 @@ class MoatFSPath(MoatPath):
 
     To actually modify the target, `connect_repl()` must have
     been called.
+
+    File transfers send one chunk and wait for the reply, by default.
+    With ``window`` > 1, that many requests are kept in flight instead.
+    Each of these is retried up to `xfer_retries` times if it doesn't
+    complete within `xfer_timeout` seconds.
     """
 
+    xfer_timeout: float = 10
+    xfer_retries: int = 2
+
     # methods that access files
 
     async def _req(self, cmd, *a, **kw):
@@ -490,6 +539,53 @@ class MoatFSPath(MoatPath):
             return res[0]
         return res.args
 
+    async def _req_retry(self, cmd, *a, **kw):
+        # Only used for reads and writes at explicit offsets, so a
+        # duplicate request doesn't hurt.
+        for n in range(self.xfer_retries, -1, -1):
+            try:
+                with anyio.fail_after(self.xfer_timeout):
+                    return await self._req(cmd, *a, **kw)
+            except TimeoutError:
+                if not n:
+                    raise
+                logger.warning("Timeout: %s %s %r, retrying", self, cmd, a)
+
+    async def _rd_win(self, fd: int, w: _Window, window: int) -> bytes:
+        # Read the range described by @w.
+        parts = {}
+
+        async def worker():
+            while (job := w.take()) is not None:
+                off, n = job
+                d = await self._req_retry("rd", fd, off, n=n)
+                if not d:
+                    w.eof(off)
+                    continue
+                parts[off] = d
+                if len(d) < n:
+                    w.short(off, n, len(d))
+
+        async with anyio.create_task_group() as tg:
+            for _ in range(window):
+                tg.start_soon(worker)
+        return b"".join(d for off, d in sorted(parts.items()) if off < w.end)
+
+    async def _wr_win(self, fd: int, data, w: _Window, window: int):
+        # Write the range described by @w.
+        async def worker():
+            while (job := w.take()) is not None:
+                off, n = job
+                k = await self._req_retry("wr", fd, off, d=data[off : off + n])
+                if not k:
+                    raise EOFError
+                if k < n:
+                    w.short(off, n, k)
+
+        async with anyio.create_task_group() as tg:
+            for _ in range(window):
+                tg.start_soon(worker)
+
     # >>> os.stat_result((1,2,3,4,5,6,7,8,9,10))
     # os.stat_result(st_mode=1, st_ino=2, st_dev=3, st_nlink=4,
     #                st_uid=5, st_gid=6, st_size=7, st_atime=8, st_mtime=9, st_ctime=10)
@@ -587,15 +683,32 @@ class MoatFSPath(MoatPath):
         self._stat_cache = None
         return res
 
-    async def read_as_stream(self, chunk=128):
+    async def read_as_stream(self, chunk=128, window=1):
         """
         :returns: async Iterator
         :rtype: Iterator of bytes
 
         Iterate over blocks (`bytes`) of a remote file.
+
+        If @window is > 1, blocks are fetched in parallel, up to the
+        file's size when the transfer starts.
         """
         fd = await self._req("open", self.as_posix(), m="r")
         try:
+            if window > 1:
+                self._stat_cache = None
+                size = (await self.stat()).st_size
+                w = _Window(chunk)
+                while w.next < size:
+                    # Don't yield within a taskgroup.
+                    w.end = end = min(w.next + w.chunk * window * 4, size)
+                    d = await self._rd_win(fd, w, window)
+                    if d:
+                        yield d
+                    if w.end < end:
+                        break
+                return
+
             off = 0
             while True:
                 d = await self._req("rd", fd, off, n=chunk)
@@ -606,7 +719,7 @@ class MoatFSPath(MoatPath):
         finally:
             await self._req("cl", fd)
 
-    async def read_bytes(self, chunk=128) -> bytes:
+    async def read_bytes(self, chunk=128, window=1) -> bytes:
         """
         :returns: file contents
         :rtype: bytes
@@ -614,21 +727,27 @@ class MoatFSPath(MoatPath):
         Return the contents of a remote file as byte string.
         """
         res = []
-        async for r in self.read_as_stream(chunk=chunk):
+        async for r in self.read_as_stream(chunk=chunk, window=window):
             res.append(r)
         return b"".join(res)
 
-    async def write_bytes(self, data, chunk=128) -> int:
+    async def write_bytes(self, data, chunk=128, window=1) -> int:
         """
         :param bytes contents: Data
 
         Write contents (expected to be bytes) to a file on the target.
+
+        If @window is > 1, blocks are sent in parallel.
         """
         self._stat_cache = None
         if not isinstance(data, (bytes, bytearray, memoryview)):
             raise TypeError(f"contents must be a buffer, got {type(data)} instead")
         fd = await self._req("open", self.as_posix(), m="w")
         try:
+            if window > 1:
+                await self._wr_win(fd, data, _Window(chunk, 0, len(data)), window)
+                return
+
             off = 0
             while off < len(data):
                 n = await self._req("wr", fd, off, d=data[off : off + chunk])
@@ -729,8 +848,12 @@ async def copytree(
     default) does a standard sync-and-update, `None` ignores it.
 
     If @wdst is set, new files get written there; they will be deleted from @dst.
+
+    @cross is the path to ``mpy-cross``, or a `MpyCross` instance. If
+    it's a path, all Python files in @src are compiled up front.
     """
     n = 0
+    cross = await _get_cross(cross, src, check)
     if wdst is None:
         wdst = dst
     if await src.is_file():
@@ -759,10 +882,7 @@ async def copytree(
 
             if cross:
                 try:
-                    p = str(src)
-                    if (pi := p.find("/_embed/lib/")) > 0:
-                        p = p[pi + 12 :]
-                    data = await run(cross, str(src), "-s", p, "-o", "/dev/stdout", capture="raw")
+                    data = await cross.compile(src)
                 except CalledProcessError as exc:
                     print(exc.stderr.decode("utf-8"), file=sys.stderr)
                     # copy this file unmodified
@@ -826,6 +946,18 @@ async def copytree(
         return n
 
 
+async def _get_cross(cross, src, check=None) -> MpyCross | None:
+    """
+    Wrap the path of ``mpy-cross`` in a `MpyCross` object, and compile
+    @src with it.
+    """
+    if not cross or isinstance(cross, MpyCross):
+        return cross
+    cross = MpyCross(cross)
+    await cross.prepare(src, check)
+    return cross
+
+
 async def copy_over(src, dst, cross=None, wdst: anyio.Path | None = None):
     """
     Transfer a file tree from @src to @dst.
@@ -833,6 +965,10 @@ async def copy_over(src, dst, cross=None, wdst: anyio.Path | None = None):
     This procedure verifies that the data arrived OK.
     """
     tn = 0
+    if cross and not isinstance(cross, MpyCross):
+        cross = MpyCross(cross)
+    if cross:
+        await cross.prepare(src)
     if await src.is_file():
         if await dst.is_dir():
             dst /= src.name
@@ -85,8 +85,9 @@ async def monitor(ctx, timeout, timeout1, **params):
 @monitor.command
 @add_serial_cfg
 @click.option("-r", "--retry", type=int, help="Delay between restarts in case of errors")
+@click.option("-c", "--cache", type=float, default=0, help="Re-use read responses (seconds)")
 @click.pass_obj
-async def to(obj, retry, **params):
+async def to(obj, retry, cache, **params):
     """
     This subcommand describes the ModBus interface of the client(s).
 
@@ -133,7 +134,7 @@ async def to(obj, retry, **params):
             async with (
                 ModbusClient() as g_a,
                 g_a.serial(**obj.A) as A,
-                Server(client=A, **params) as B,
+                Server(client=A, cache=cache, **params) as B,
                 # anyio.create_task_group() as tg,
             ):
                 await B.watch(obj.timeout, obj.timeout1)
@@ -22,6 +22,7 @@ from pymodbus.pdu import DecodePDU, ExceptionResponse
 from moat.util import CtxObj, Queue, ValueEvent
 from moat.util.exc import ungroup
 
+from .sched import PollScheduler
 from .types import MAX_REQ_LEN, BaseValue, DataBlock, TypeCodec
 
 from typing import Any
@@ -115,7 +116,7 @@ class ModbusClient(CtxObj):
                 ...
         """
         kw = {}
-        for k in ("max_rd_len", "max_wr_len"):
+        for k in ("max_rd_len", "max_wr_len", "max_rd_gap", "sched"):
             if k in cfg:
                 kw[k] = cfg[k]
 
@@ -150,7 +151,7 @@ class _HostCommon:
     def _trace(*_x):
         return None  # overridden
 
-    def __init__(self, gate, timeout, cap):
+    def __init__(self, gate, timeout, cap, sched=False):
         self.gate = gate
         self.units = {}
         self._wqueue = Queue(100)
@@ -164,6 +165,7 @@ class _HostCommon:
 
         self.cap = anyio.CapacityLimiter(cap)
         self.timeout = timeout
+        self.scheduler = PollScheduler(self) if sched else None
 
     def unit(self, unit):
         """
@@ -200,6 +202,8 @@ class _HostCommon:
                 self._tg = tg
                 self._read_scope = tg.cancel_scope
                 await tg.start(self._reader)
+                if self.scheduler is not None:
+                    await tg.start(self.scheduler.run)
 
                 yield self
                 tg.cancel_scope.cancel()
@@ -262,6 +266,9 @@ class Host(_HostCommon, CtxObj):
     """This is a single host which moat-modbus talks to.
     It has a number of modbus units (attribute 'units').
 
+    If @sched is set, periodic slot reads are serialized by a
+    `PollScheduler` instead of running independently.
+
     Do not instantiate directly; instead, use
 
         >>> async with client.host("foo.example" [, port=20502] ) as host:
@@ -280,19 +287,22 @@ class Host(_HostCommon, CtxObj):
         debug=False,
         max_rd_len=MAX_REQ_LEN,
         max_wr_len=MAX_REQ_LEN,
+        max_rd_gap=0,
+        sched=False,
     ):
         self.addr = addr
         self.port = port
 
         self.max_rd_len = max_rd_len
         self.max_wr_len = max_wr_len
+        self.max_rd_gap = max_rd_gap
 
         log = logging.getLogger(f"modbus.{addr}")
         self._trace = log.info if debug else log.debug
 
         self.framer = FramerSocket(DecodePDU(False))
 
-        super().__init__(gate, timeout, cap)
+        super().__init__(gate, timeout, cap, sched)
 
     def __repr__(self):
         return f"<ModbusHost:{self.addr}:{self.port}>"
@@ -441,6 +451,10 @@ class SerialHost(_HostCommon, CtxObj):
         >>> async with client.serial("/dev/ttyUSB0",
                 baudrate=9600, parity="E", stopbits=1) as host:
             ...
+
+    If @sched is set, periodic slot reads are serialized by a
+    `PollScheduler` instead of running independently. This is useful
+    because the line can only carry one request at a time anyway.
     """
 
     _tg = None
@@ -455,6 +469,8 @@ class SerialHost(_HostCommon, CtxObj):
         monitor=None,
         max_rd_len=MAX_REQ_LEN,
         max_wr_len=MAX_REQ_LEN,
+        max_rd_gap=0,
+        sched=False,
         **ser,
     ):
         self.port = port
@@ -462,12 +478,13 @@ class SerialHost(_HostCommon, CtxObj):
         self.framer = FramerRTU(DecodePDU(False))
         self.max_rd_len = max_rd_len
         self.max_wr_len = max_wr_len
+        self.max_rd_gap = max_rd_gap
 
         log = logging.getLogger(f"modbus.{Path(port).name}")
         self._trace = log.info if debug else log.debug
         self._monitor = monitor
 
-        super().__init__(gate, timeout, 1)
+        super().__init__(gate, timeout, 1, sched)
 
     def __repr__(self):
         return f"<ModbusHost:{self.port}:{self.ser.get('baudrate', 0)}>"
@@ -878,9 +895,16 @@ class Slot(CtxObj):
     async def read_task(self):
         """A background task for reading Modbus register values.
         We read every .`read_delay` seconds.
+
+        If the host has a scheduler, it does the actual work.
         """
         await self.run_lock.wait()
 
+        sched = self.unit.host.scheduler
+        if sched is not None:
+            await sched.poll(self)
+            return
+
         try:
             await self.read()
         except Exception as exc:  # pylint:disable=broad-except
@@ -966,6 +990,7 @@ class ValueList(DataBlock):
         super().__init__(
             max_rd_len=slot.unit.host.max_rd_len,
             max_wr_len=slot.unit.host.max_wr_len,
+            max_rd_gap=slot.unit.host.max_rd_gap,
         )
         self.slot = slot
         assert hasattr(kind, "encoder_m")
@@ -984,7 +1009,7 @@ class ValueList(DataBlock):
         if res is None:
             res = {}
         async with anyio.create_task_group() as tg:
-            for start, length in self.ranges(max_len=self.max_rd_len):
+            for start, length in self.ranges(max_len=self.max_rd_len, max_gap=self.max_rd_gap):
                 tg.start_soon(partial(self.readBlock, start, length, res=res))
         return res
 
@@ -0,0 +1,189 @@
+"""
+Bus-wide scheduling of periodic slot reads.
+
+Without a scheduler, every `Slot` runs its own timer loop. On a shared
+line (i.e. a `SerialHost`) their requests then contend for the bus, and
+slots overshoot their ``read_delay`` more or less at random.
+
+A `PollScheduler` serializes all periodic reads of a host. It always
+polls the slot whose deadline is earliest, measures how long each poll
+takes, and records the achieved vs. the requested poll rate.
+"""
+
+from __future__ import annotations
+
+import anyio
+import heapq
+import logging
+from itertools import count
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .client import Slot
+
+_logger = logging.getLogger(__name__)
+
+__all__ = ["PollScheduler"]
+
+# weight of a new measurement for the running averages
+EWMA = 0.2
+
+
+class _Poll:
+    """
+    Scheduling state of a single slot.
+    """
+
+    def __init__(self, slot: Slot, due: float):
+        self.slot = slot
+        self.period = slot.read_delay
+        self.align = slot.read_align
+        self.due = due
+
+        self.cost = None  # seconds per poll
+        self.interval = None  # seconds between polls
+        self.last = None  # start of the last poll
+        self.n = 0
+        self.late = 0
+        self.backoff = 0
+        self.dead = False
+
+    def done(self, t_start: float, t_end: float):
+        """Update statistics and the next deadline after a poll."""
+        dt = t_end - t_start
+        self.cost = dt if self.cost is None else self.cost + (dt - self.cost) * EWMA
+        if self.last is not None:
+            iv = t_start - self.last
+            if self.interval is None:
+                self.interval = iv
+            else:
+                self.interval += (iv - self.interval) * EWMA
+        self.last = t_start
+        self.n += 1
+
+        due = self.due + self.period
+        if self.align:
+            due -= due % self.period
+        if due < t_end:
+            # We're behind. Don't try to catch up by polling in a tight
+            # loop; queue this slot for "as soon as possible" instead so
+            # that all late slots get their turn.
+            self.late += 1
+            _logger.info(
+                "Delay for %s: %.1f > %.1f",
+                self.slot,
+                t_end - self.due + self.period,
+                self.period,
+            )
+            due = t_end
+        self.due = due + self.backoff
+
+    @property
+    def stats(self) -> dict:
+        "requested vs. achieved rates"
+        return dict(
+            period=self.period,
+            interval=self.interval,
+            rate=1 / self.interval if self.interval else None,
+            cost=self.cost,
+            polls=self.n,
+            late=self.late,
+        )
+
+
+class PollScheduler:
+    """
+    Serializes the periodic reads of all slots on a host, earliest
+    deadline first.
+
+    Slots register themselves when their read task starts; see
+    `Slot.read_task`. The scheduler's `run` task is started by the host.
+    """
+
+    def __init__(self, host):
+        self.host = host
+        self._heap = []
+        self._polls = {}
+        self._seq = count()
+        self._changed = anyio.Event()
+        self._overload = False
+
+    def _push(self, p: _Poll):
+        heapq.heappush(self._heap, (p.due, next(self._seq), p))
+        self._changed.set()
+
+    async def poll(self, slot: Slot):
+        """
+        Poll this slot periodically, until cancelled.
+        """
+        if slot in self._polls:
+            raise RuntimeError(f"Slot {slot} already scheduled")
+        self._polls[slot] = p = _Poll(slot, anyio.current_time())
+        self._push(p)
+        try:
+            await anyio.sleep_forever()
+        finally:
+            p.dead = True
+            del self._polls[slot]
+
+    @property
+    def load(self) -> float:
+        """
+        The fraction of bus time the current set of slots requires.
+
+        If this exceeds 1, not every slot can be polled at its requested
+        rate.
+        """
+        return sum(p.cost / p.period for p in self._polls.values() if p.cost is not None)
+
+    def stats(self) -> dict[str, dict]:
+        """
+        Report each slot's requested and achieved poll rates, the
+        measured cost of polling it, and how often it's been late.
+        """
+        return {str(p.slot): p.stats for p in self._polls.values()}
+
+    async def run(self, *, task_status=anyio.TASK_STATUS_IGNORED):
+        """
+        The task that does the actual polling.
+        """
+        task_status.started()
+        while True:
+            if not self._heap:
+                self._changed = anyio.Event()
+                await self._changed.wait()
+                continue
+
+            due, _, p = self._heap[0]
+            if p.dead:
+                heapq.heappop(self._heap)
+                continue
+
+            t = anyio.current_time()
+            if due > t:
+                # a newly added slot may be due earlier
+                self._changed = anyio.Event()
+                with anyio.move_on_after(due - t):
+                    await self._changed.wait()
+                continue
+
+            heapq.heappop(self._heap)
+            await self._poll(p, t)
+            if not p.dead:
+                self._push(p)
+
+    async def _poll(self, p: _Poll, t: float):
+        try:
+            await p.slot.read()
+        except Exception as exc:  # pylint:disable=broad-except
+            _logger.warning("Error %s: %r", p.slot, exc)
+            p.backoff = 1 + p.backoff * 1.2
+        else:
+            p.backoff = 0
+        p.done(t, anyio.current_time())
+
+        load = self.load
+        if load > 1 and not self._overload:
+            _logger.warning("Bus %s overloaded: %.0f%%", self.host, load * 100)
+        self._overload = load > 1
@@ -290,21 +290,109 @@ def create_server(cfg):
         raise ValueError("neither serial nor TCP config found")
 
 
+#: Function codes of requests that only read data
+READ_CODES = frozenset((1, 2, 3, 4))
+
+
+class _Pending:
+    """A read request that's currently forwarded"""
+
+    def __init__(self):
+        self.done = anyio.Event()
+        self.resp = None
+        self.exc = None
+
+    async def get(self):
+        await self.done.wait()
+        if self.exc is not None:
+            raise self.exc
+        return self.resp
+
+
 class RelayServer:
     """
     A mix-in class to teach a server to forward all requests to a client
+
+    Concurrent identical read requests share a single upstream
+    transaction. If @cache is set, successful read responses are
+    re-used for that many seconds.
+
+    Any other request (i.e. a write) invalidates the unit's cached data.
+    Reads that arrive after it don't share a transaction that started
+    before it.
+
+    With a TCP server (i.e. ``class Relay(RelayServer, ModbusServer)``)
+    each client connection forwards its requests concurrently.
     """
 
     single = True
 
-    def __init__(self, client, *a, **k):
+    def __init__(self, client, *a, cache: float = 0, **k):
         self._client = client
+        self._cache_age = cache
+        self._cache = {}
+        self._pending = {}
+        self._wgen = {}
         super().__init__(*a, **k)
 
+    def _cache_drop(self, unit):
+        self._wgen[unit] = self._wgen.get(unit, 0) + 1
+        for key in [k for k in self._cache if k[0] == unit]:
+            del self._cache[key]
+        for key in [k for k in self._pending if k[0] == unit]:
+            del self._pending[key]
+
+    async def _forward(self, request):
+        unit = request.dev_id
+        if request.function_code not in READ_CODES:
+            self._cache_drop(unit)
+            return await self._client.execute(request)
+
+        key = (unit, request.function_code, request.address, request.count)
+        if self._cache_age:
+            try:
+                t, resp = self._cache[key]
+            except KeyError:
+                pass
+            else:
+                if anyio.current_time() - t <= self._cache_age:
+                    return resp
+                del self._cache[key]
+
+        try:
+            pend = self._pending[key]
+        except KeyError:
+            pass
+        else:
+            return await pend.get()
+
+        self._pending[key] = pend = _Pending()
+        gen = self._wgen.get(unit, 0)
+        try:
+            pend.resp = resp = await self._client.execute(request)
+        except Exception as exc:
+            pend.exc = exc
+            raise
+        except BaseException:
+            pend.exc = anyio.ClosedResourceError("Forwarding was cancelled")
+            raise
+        else:
+            if self._cache_age and not resp.isError() and gen == self._wgen.get(unit, 0):
+                self._cache[key] = (anyio.current_time(), resp)
+            return resp
+        finally:
+            if self._pending.get(key) is pend:
+                del self._pending[key]
+            pend.done.set()
+
+    async def process_request(self, request):
+        "Forward a request. Used by `ModbusServer`."
+        return await self._forward(request)
+
     async def _process(self, request):
         request = self.mon_request(request)
         tid = request.transaction_id
-        resp = await self._client.execute(request)
+        resp = await self._forward(request)
 
         resp.transaction_id = tid
         resp = self.mon_response(resp) or resp
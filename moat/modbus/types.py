@@ -492,10 +492,11 @@ class DataBlock(dict, BaseModbusDataBlock):
     succeeds.
     """
 
-    def __init__(self, max_rd_len=MAX_REQ_LEN, max_wr_len=MAX_REQ_LEN):
+    def __init__(self, max_rd_len=MAX_REQ_LEN, max_wr_len=MAX_REQ_LEN, max_rd_gap=0):
         super().__init__()
         self.max_rd_len = max_rd_len
         self.max_wr_len = max_wr_len
+        self.max_rd_gap = max_rd_gap
         self.changed = anyio.Event()
 
     def __bool__(self):
@@ -540,10 +541,17 @@ class DataBlock(dict, BaseModbusDataBlock):
         "does nothing. Compatibility with pymodbus 3.8"
         return True
 
-    def ranges(self, changed=False, max_len=MAX_REQ_LEN):
+    def ranges(self, changed=False, max_len=MAX_REQ_LEN, max_gap=0):
         """Iterate over to-be-retrieved/sent range(s).
 
         If @changed is set, skip unmodified items.
+
+        Ranges may include up to @max_gap unused registers between two
+        values, but never an `InaccessibleValue`. Use this for reading
+        only: a write would clobber the registers in between.
+
+        Each range is extended as far as possible, which results in the
+        smallest number of requests.
         """
         start, cur = None, None
         for offset, val in sorted(self.items()):
@@ -556,8 +564,8 @@ class DataBlock(dict, BaseModbusDataBlock):
             elif start is None:
                 start = offset
                 cur = start + val.len
-            elif cur == offset and (cur + val.len - start) <= max_len:
-                cur += val.len
+            elif cur <= offset <= cur + max_gap and (offset + val.len - start) <= max_len:
+                cur = offset + val.len
             else:
                 yield (start, cur - start)
                 start = offset
@@ -28,7 +28,8 @@ from .mqtt.constants import QOS_0
 from .mqtt.protocol.broker_handler import BrokerProtocolHandler
 from .plugins.manager import BaseContext, PluginManager
 from .session import EVENT_BROKER_MESSAGE_RECEIVED  # noqa: F401
-from .utils import Future, format_client_message, gen_client_id, match_topic
+from .topic_tree import RetainedTree, SubscriptionTree
+from .utils import Future, format_client_message, gen_client_id
 
 from typing import TYPE_CHECKING
 
@@ -229,13 +230,13 @@ class Broker:
         self._servers = dict()
         self._init_states()
         self._sessions = dict()
-        self._subscriptions = dict()
+        self._subscriptions = SubscriptionTree()
 
         self._broadcast_queue_s, self._broadcast_queue_r = anyio.create_memory_object_stream(100)
         self._tg = tg
         self._do_retain = self.config.get("retain", True)
         if self._do_retain:
-            self._retained_messages = dict()
+            self._retained_messages = RetainedTree()
 
         # Init plugins manager
         context = BrokerContext(self, self.config)
@@ -306,9 +307,9 @@ class Broker:
         """
         try:
             self._sessions = dict()
-            self._subscriptions = dict()
+            self._subscriptions = SubscriptionTree()
             if self._do_retain:
-                self._retained_messages = dict()
+                self._retained_messages = RetainedTree()
             self.transitions.start()
             self.logger.debug("Broker starting")
         except (MachineError, ValueError) as exc:
@@ -447,9 +448,9 @@ class Broker:
             await s[0].stop()
 
         self._sessions = dict()
-        self._subscriptions = dict()
+        self._subscriptions = SubscriptionTree()
         if self._do_retain:
-            self._retained_messages = dict()
+            self._retained_messages = RetainedTree()
         try:
             self.transitions.shutdown()
         except MachineError as exc:
@@ -807,14 +808,13 @@ class Broker:
         qos = subscription[1]
         if "max-qos" in self.config and qos > self.config["max-qos"]:
             qos = self.config["max-qos"]
-        if a_filter not in self._subscriptions:
-            self._subscriptions[a_filter] = []
+        subscriptions = self._subscriptions.setdefault(a_filter)
         already_subscribed = next(
-            (s for (s, qos) in self._subscriptions[a_filter] if s.client_id == session.client_id),
+            (s for (s, qos) in subscriptions if s.client_id == session.client_id),
             None,
         )
         if not already_subscribed:
-            self._subscriptions[a_filter].append((session, qos))
+            subscriptions.append((session, qos))
         else:
             if self.logger.isEnabledFor(logging.DEBUG):
                 self.logger.debug(
@@ -876,15 +876,14 @@ class Broker:
                     topic = topic.split("/")
 
                 targets = {}
-                for k_filter, subscriptions in self._subscriptions.items():
-                    if match_topic(topic, k_filter):
-                        for target_session, qos in subscriptions:
-                            qos = max(  # noqa:PLW2901
-                                qos,
-                                broadcast.get("qos", QOS_0),
-                                targets.get(target_session, QOS_0),
-                            )
-                            targets[target_session] = qos
+                for subscriptions in self._subscriptions.match(topic):
+                    for target_session, qos in subscriptions:
+                        qos = max(  # noqa:PLW2901
+                            qos,
+                            broadcast.get("qos", QOS_0),
+                            targets.get(target_session, QOS_0),
+                        )
+                        targets[target_session] = qos
 
                 for target_session, qos in targets.items():
                     if target_session.transitions.state == "connected":
@@ -968,19 +967,15 @@ class Broker:
         sub = subscription[0].split("/")
         handler = self._get_handler(session)
         async with anyio.create_task_group() as tg:
-            for d_topic in self._retained_messages:
-                topic = d_topic.split("/")
-                # self.logger.debug("matching : %s %s", d_topic, subscription[0])
-                if match_topic(topic, sub):
-                    self.logger.debug("%s and %s match", d_topic, subscription[0])
-                    retained = self._retained_messages[d_topic]
-                    tg.start_soon(
-                        handler.mqtt_publish,
-                        retained.topic,
-                        retained.data,
-                        subscription[1],
-                        True,
-                    )
+            for retained in self._retained_messages.match(sub):
+                self.logger.debug("%s and %s match", retained.topic, subscription[0])
+                tg.start_soon(
+                    handler.mqtt_publish,
+                    retained.topic,
+                    retained.data,
+                    subscription[1],
+                    True,
+                )
         if self.logger.isEnabledFor(logging.DEBUG):
             self.logger.debug(
                 "End broadcasting messages retained due to subscription on '%s' from %s",
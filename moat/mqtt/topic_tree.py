@@ -0,0 +1,178 @@
+"""
+Level-indexed topic trees for the MoaT-MQTT broker.
+
+Matching a topic against a flat dict of subscription filters costs one
+`match_topic` call per filter. The classes in this module index filters
+by topic level instead, so that the cost of a lookup depends on the depth
+of the topic (and the number of wildcards along the way) instead of the
+total number of subscriptions.
+
+The semantics are those of `moat.mqtt.utils.match_topic`, including its
+treatment of topics starting with ``$``.
+"""
+
+from __future__ import annotations
+
+from moat.lib.mqtt.trie import TrieNode, trie_insert, trie_remove
+
+from collections.abc import Mapping, MutableMapping
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator, Sequence
+
+__all__ = ["RetainedTree", "SubscriptionTree"]
+
+_WILD = ("+", "#")
+
+
+class SubscriptionTree(Mapping):
+    """
+    A mapping of pre-split subscription filters to lists of
+    ``(session, qos)`` tuples, with a trie on the side.
+
+    The list for a filter is shared between the mapping and the trie, so
+    modifying it in place (as ``Broker._del_subscription`` does) is
+    visible to `match` immediately. Adding or removing whole filters must
+    go through `setdefault` and ``del``.
+    """
+
+    def __init__(self):
+        self._filters: dict[tuple[str, ...], list] = {}
+        self._root = TrieNode()
+
+    def __getitem__(self, a_filter):
+        return self._filters[a_filter]
+
+    def __iter__(self):
+        return iter(self._filters)
+
+    def __len__(self):
+        return len(self._filters)
+
+    def __contains__(self, a_filter):
+        return a_filter in self._filters
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} {self._filters!r}>"
+
+    def setdefault(self, a_filter: tuple[str, ...]) -> list:
+        """
+        Return the subscription list for this filter, creating an empty
+        one if it doesn't exist.
+        """
+        try:
+            return self._filters[a_filter]
+        except KeyError:
+            pass
+        node = trie_insert(self._root, a_filter)
+        node.value = subs = []
+        self._filters[a_filter] = subs
+        return subs
+
+    def __delitem__(self, a_filter):
+        del self._filters[a_filter]
+        trie_remove(self._root, a_filter)
+
+    def match(self, topic: Sequence[str]) -> Iterator[list]:
+        """
+        Iterate the subscription lists of all filters that match this
+        (pre-split) topic.
+
+        Each list is yielded at most once. Empty lists are skipped.
+        """
+        if isinstance(topic, str):
+            raise TypeError("Topic needs to be pre-split")
+        n = len(topic)
+        todo = [(self._root, 0)]
+        while todo:
+            node, i = todo.pop()
+            if i == n:
+                if node.value:
+                    yield node.value
+                continue
+            children = node.children
+            if not children:
+                continue
+            level = topic[i]
+            if i or level[:1] != "$":
+                nx = children.get("#")
+                if nx is not None and nx.value:
+                    yield nx.value
+                nx = children.get("+")
+                if nx is not None:
+                    todo.append((nx, i + 1))
+            if level not in _WILD:
+                nx = children.get(level)
+                if nx is not None:
+                    todo.append((nx, i + 1))
+
+
+class RetainedTree(MutableMapping):
+    """
+    A mapping of topic strings to retained messages, with a trie on the
+    side so that `match` only visits topics a filter can match.
+    """
+
+    def __init__(self):
+        self._topics: dict[str, object] = {}
+        self._root = TrieNode()
+
+    def __getitem__(self, topic):
+        return self._topics[topic]
+
+    def __setitem__(self, topic, msg):
+        if msg is None:
+            raise ValueError("Use 'del' to remove a retained message")
+        trie_insert(self._root, topic.split("/")).value = msg
+        self._topics[topic] = msg
+
+    def __delitem__(self, topic):
+        del self._topics[topic]
+        trie_remove(self._root, topic.split("/"))
+
+    def __iter__(self):
+        return iter(self._topics)
+
+    def __len__(self):
+        return len(self._topics)
+
+    def __contains__(self, topic):
+        return topic in self._topics
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} {self._topics!r}>"
+
+    def match(self, a_filter: Sequence[str]) -> Iterator:
+        """
+        Iterate the retained messages whose topic matches this
+        (pre-split) subscription filter.
+        """
+        if isinstance(a_filter, str):
+            raise TypeError("Subscription need to be pre-split")
+        n = len(a_filter)
+        todo = [(self._root, 0)]
+        while todo:
+            node, i = todo.pop()
+            if i == n:
+                if node.value is not None:
+                    yield node.value
+                continue
+            level = a_filter[i]
+            if level == "#":
+                # matches one or more levels, i.e. the whole subtree
+                # below this node but not the node itself
+                sub = [nx for k, nx in node.children.items() if i or k[:1] != "$"]
+                while sub:
+                    nx = sub.pop()
+                    if nx.value is not None:
+                        yield nx.value
+                    sub.extend(nx.children.values())
+            elif level == "+":
+                for k, nx in node.children.items():
+                    if i or k[:1] != "$":
+                        todo.append((nx, i + 1))
+            else:
+                nx = node.children.get(level)
+                if nx is not None:
+                    todo.append((nx, i + 1))
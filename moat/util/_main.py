@@ -395,3 +395,55 @@ async def cfg_(obj, path, yaml, empty):
                 else:
                     print(v, file=obj.stdout)
         delim = True
+
+
+@cli.command("bench")
+@click.option("-k", "--match", type=str, help="Only run benchmarks whose name contains this")
+@click.option(
+    "-n",
+    "--size",
+    "sizes",
+    type=int,
+    multiple=True,
+    help="Number of items to test with (can be repeated)",
+)
+@click.option("-r", "--rounds", type=int, default=3, help="Repeat, take the fastest")
+@click.option("-o", "--output", type=click.File("w"), help="Write results to this JSON file")
+@click.option(
+    "-c",
+    "--compare",
+    type=click.File("r"),
+    help="Compare against this JSON file, exit 1 if slower",
+)
+@click.option("-t", "--threshold", type=float, default=0.1, help="Allowed slowdown, 0.1=10%")
+@click.option("-l", "--list", "list_", is_flag=True, help="List the benchmarks")
+async def bench_(match, sizes, rounds, output, compare, threshold, list_):
+    """
+    Run MoaT's micro-benchmarks.
+
+    The default sizes are 1000, 10000 and 100000 items. Use "-o" to save
+    the results, then "-c" on a later commit to check for regressions.
+    """
+    import json  # noqa: PLC0415
+
+    from . import bench  # noqa: PLC0415
+
+    if list_:
+        for b in bench.get_benchmarks(match):
+            print(b.name)
+        return
+
+    def report(r):
+        print(f"{r.name:<24} {r.size:>8} {r.best:10.4f}s {r.per_item * 1e6:10.3f}µs/item")
+
+    res = bench.save(await bench.run(match, sizes or bench.SIZES, rounds, report=report))
+    if output is not None:
+        json.dump(res, output, indent=1)
+        output.write("\n")
+    if compare is not None:
+        bad = False
+        for name, size, ratio in bench.compare(json.load(compare), res, threshold):
+            print(f"SLOWER: {name} {size}: {ratio:.2f}x", file=sys.stderr)
+            bad = True
+        if bad:
+            sys.exit(1)
@@ -28,8 +28,8 @@ ExtType = _msgpack.ExtType
 class StdMsgpack(Codec):
     "A MsgPack codec with our extensions"
 
-    def __init__(self):
-        super().__init__(ext=std_ext, use_attrdict=True)
+    def __init__(self, **kw):
+        super().__init__(ext=std_ext, use_attrdict=True, **kw)
 
 
 Codec = StdMsgpack
@@ -0,0 +1,188 @@
+"""
+Micro-benchmarks for MoaT's data handling.
+
+A benchmark is a function that accepts the number of items to work
+on, prepares its test data, and returns a (sync or async) callable
+that does the actual work. Only that callable is timed.
+
+Run them with ``moat util bench``, which writes the results as JSON so
+that they can be compared across commits (``--compare``).
+"""
+
+from __future__ import annotations
+
+import inspect
+import platform
+import subprocess
+import time
+from importlib import import_module
+
+from attrs import define, field
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Iterator, Sequence
+    from typing import Any
+
+    Setup = Callable[[int], Callable[[], Any] | Callable[[], Awaitable[Any]]]
+
+__all__ = ["Bench", "Result", "benchmark", "compare", "gen_paths", "get_benchmarks", "run", "save"]
+
+#: The modules that contain the benchmarks, relative to this package.
+MODULES = ("codec", "path", "link", "kv", "rpc", "bus")
+
+#: Default item counts.
+SIZES = (10**3, 10**4, 10**5)
+
+_benchmarks: dict[str, Bench] = {}
+
+
+@define
+class Bench:
+    "A registered benchmark."
+
+    name: str
+    setup: Setup
+
+
+@define
+class Result:
+    "The timing of one benchmark at one size."
+
+    name: str
+    size: int
+    times: list[float] = field(factory=list)
+
+    @property
+    def best(self) -> float:
+        "the fastest run"
+        return min(self.times)
+
+    @property
+    def per_item(self) -> float:
+        "the fastest run's time per item, in seconds"
+        return self.best / self.size
+
+    def dump(self) -> dict:
+        "serialize for JSON"
+        return dict(
+            name=self.name,
+            size=self.size,
+            times=self.times,
+            best=self.best,
+            per_item=self.per_item,
+        )
+
+
+def benchmark(name: str) -> Callable[[Setup], Setup]:
+    """
+    Decorator to register a benchmark.
+    """
+
+    def _reg(setup: Setup) -> Setup:
+        if name in _benchmarks:
+            raise ValueError(f"Benchmark {name!r} exists")
+        _benchmarks[name] = Bench(name, setup)
+        return setup
+
+    return _reg
+
+
+def gen_paths(n: int) -> list[tuple]:
+    """
+    Return @n distinct, sorted path tuples with some shared prefixes
+    and a mix of string and integer elements.
+    """
+    return sorted((f"a{i % 7}", f"b{i // 7 % 100}", i // 700 % 50, f"item{i}") for i in range(n))
+
+
+def get_benchmarks(match: str | None = None) -> Iterator[Bench]:
+    """
+    Return the known benchmarks, optionally filtered by a name
+    substring.
+    """
+    for mod in MODULES:
+        import_module(f"{__name__}.{mod}")
+    for name in sorted(_benchmarks):
+        if match is None or match in name:
+            yield _benchmarks[name]
+
+
+async def _run_one(bench: Bench, size: int, rounds: int) -> Result:
+    res = Result(bench.name, size)
+    for _ in range(rounds):
+        proc = bench.setup(size)
+        if inspect.iscoroutinefunction(proc):
+            t = time.perf_counter()
+            await proc()
+        else:
+            t = time.perf_counter()
+            proc()
+        res.times.append(time.perf_counter() - t)
+    return res
+
+
+async def run(
+    match: str | None = None,
+    sizes: Sequence[int] = SIZES,
+    rounds: int = 3,
+    report: Callable[[Result], Any] | None = None,
+) -> list[Result]:
+    """
+    Run the benchmarks whose names contain @match, at each of these
+    @sizes, taking the best of @rounds runs.
+
+    @report is called with each result as soon as it's available.
+    """
+    res = []
+    for bench in get_benchmarks(match):
+        for size in sizes:
+            r = await _run_one(bench, size, rounds)
+            if report is not None:
+                report(r)
+            res.append(r)
+    return res
+
+
+def _commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],  # noqa:S607
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def save(results: Sequence[Result]) -> dict:
+    """
+    Return a JSON-able record of these results, including the current
+    commit and Python version.
+    """
+    return dict(
+        commit=_commit(),
+        time=time.time(),
+        python=platform.python_implementation() + " " + platform.python_version(),
+        results=[r.dump() for r in results],
+    )
+
+
+def compare(old: dict, new: dict, threshold: float = 0.1) -> Iterator[tuple[str, int, float]]:
+    """
+    Compare two records as returned by `save`.
+
+    Yields ``(name, size, ratio)`` for each benchmark that is more than
+    @threshold slower in @new.
+    """
+    prev = {(r["name"], r["size"]): r["best"] for r in old["results"]}
+    for r in new["results"]:
+        try:
+            t = prev[r["name"], r["size"]]
+        except KeyError:
+            continue
+        ratio = r["best"] / t
+        if ratio > 1 + threshold:
+            yield r["name"], r["size"], ratio
@@ -0,0 +1,59 @@
+"""
+MoaT bus checksum benchmarks.
+
+Each run checksums @n frames of 8 to 300 bytes.
+"""
+
+from __future__ import annotations
+
+import random
+
+from moat.bus.crc import CRC16
+
+from . import benchmark
+
+
+def _frames(n):
+    rnd = random.Random(n)
+    return [rnd.randbytes(rnd.randint(8, 300)) for _ in range(n)]
+
+
+@benchmark("bus.crc16.byte")
+def _byte(n):
+    frames = _frames(n)
+
+    def run():
+        for f in frames:
+            crc = CRC16()
+            for b in f:
+                crc.update(b)
+            crc.finish()
+
+    return run
+
+
+@benchmark("bus.crc16.buf")
+def _buf(n):
+    frames = _frames(n)
+
+    def run():
+        for f in frames:
+            crc = CRC16()
+            crc.update_buf(f)
+            crc.finish()
+
+    return run
+
+
+@benchmark("bus.crc16.buf2")
+def _buf2(n):
+    frames = _frames(n)
+    CRC16().update_buf2(b"")  # build the table
+
+    def run():
+        for f in frames:
+            crc = CRC16()
+            crc.update_buf2(f)
+            crc.finish()
+
+    return run
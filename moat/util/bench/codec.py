@@ -0,0 +1,52 @@
+"""
+Codec benchmarks.
+"""
+
+from __future__ import annotations
+
+from moat.lib.codec import get_codec
+
+from . import benchmark, gen_paths
+
+# chunk size for stream decoding, as used by MsgReader
+CHUNK = 4096
+
+
+def _data(n):
+    return [
+        dict(path=p, value=dict(i=i, f=i / 3, s=f"v{i}", b=b"\x01" * (i % 50)), tock=i)
+        for i, p in enumerate(gen_paths(n))
+    ]
+
+
+def _reg(name, codec, **kw):
+    @benchmark(f"codec.{name}.encode")
+    def _enc(n):
+        c = get_codec(codec, **kw)
+        data = _data(n)
+
+        def run():
+            enc = c.encode
+            for d in data:
+                enc(d)
+
+        return run
+
+    @benchmark(f"codec.{name}.decode")
+    def _dec(n):
+        c = get_codec(codec, **kw)
+        buf = b"".join(c.encode(d) for d in _data(n))
+
+        def run():
+            dec = get_codec(codec, **kw)
+            for i in range(0, len(buf), CHUNK):
+                dec.feed(buf[i : i + CHUNK])
+                for _ in dec:
+                    pass
+
+        return run
+
+
+_reg("msgpack", "std-msgpack")
+_reg("msgpack-py", "msgpack", fast=False)
+_reg("cbor", "std-cbor")
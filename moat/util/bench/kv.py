@@ -0,0 +1,88 @@
+"""
+Benchmarks for the MoaT-KV data model.
+"""
+
+from __future__ import annotations
+
+import io
+
+from moat.util import PathShortener
+from moat.kv.model import Entry
+from moat.lib.codec import get_codec
+from moat.lib.config import CFG, CfgStore
+
+from . import benchmark, gen_paths
+
+
+def _tree(paths):
+    root = Entry("root", None)
+    for i, p in enumerate(paths):
+        root.follow(p)._data = i  # noqa:SLF001
+    return root
+
+
+@benchmark("kv.entry.follow")
+def _follow(n):
+    paths = gen_paths(n)
+
+    def run():
+        root = Entry("root", None)
+        for p in paths:
+            root.follow(p)
+
+    return run
+
+
+@benchmark("kv.entry.walk")
+def _walk(n):
+    root = _tree(gen_paths(n))
+
+    async def proc(entry):
+        pass
+
+    async def run():
+        await root.walk(proc)
+
+    return run
+
+
+class _Stream:
+    # an in-memory file, for MsgReader
+    def __init__(self, data):
+        self.f = io.BytesIO(data)
+
+    async def read(self, n):
+        return self.f.read(n)
+
+
+def _save_file(n):
+    # a save file as written by Server.save
+    codec = get_codec("std-msgpack")
+    shorter = PathShortener([])
+    res = [codec.encode(dict(nodes={"bench": n}, known={}, tock=n + 1))]
+    for i, p in enumerate(gen_paths(n)):
+        msg = dict(path=p, value=i, tock=i + 1, chain=dict(node="bench", tick=i + 1, prev=None))
+        shorter(msg)
+        res.append(codec.encode(msg))
+    return b"".join(res)
+
+
+def _reg_load(name, bulk):
+    @benchmark(name)
+    def _load(n):
+        from moat.kv.server import Server  # noqa: PLC0415
+
+        CfgStore.with_("moat.kv")
+        cfg = CfgStore()
+        data = _save_file(n)
+
+        async def run():
+            with CFG.with_config(cfg):
+                s = Server("bench_load")
+                await s.load(stream=_Stream(data), local=True, bulk=bulk)
+
+        return run
+
+
+_reg_load("kv.server.load", True)
+_reg_load("kv.server.load-single", False)
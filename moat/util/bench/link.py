@@ -0,0 +1,103 @@
+"""
+Benchmarks for the MoaT-Link data model.
+
+The ``link.mqtt.decode`` benchmarks replay incoming MQTT messages;
+use ``--size 1000000`` for a realistic load.
+"""
+
+from __future__ import annotations
+
+import random
+
+from moat.util import Path
+from moat.link.backend._cache import DecodeCache
+from moat.link.meta import MsgMeta
+from moat.link.node import Node
+from moat.util.path import PS
+
+from . import benchmark, gen_paths
+
+
+def _node(paths):
+    n = Node()
+    for i, p in enumerate(paths):
+        n.set(p, i, MsgMeta(origin="bench", timestamp=1000 + i))
+    return n
+
+
+@benchmark("link.node.set")
+def _set(n):
+    paths = [Path.build(p) for p in gen_paths(n)]
+    metas = [MsgMeta(origin="bench", timestamp=1000 + i) for i in range(n)]
+
+    def run():
+        node = Node()
+        for i, p in enumerate(paths):
+            node.set(p, i, metas[i])
+
+    return run
+
+
+@benchmark("link.node.dump")
+def _dump(n):
+    node = _node(Path.build(p) for p in gen_paths(n))
+
+    def run():
+        for _ in node.dump():
+            pass
+
+    return run
+
+
+@benchmark("link.node.load")
+def _load(n):
+    dump = list(_node(Path.build(p) for p in gen_paths(n)).dump())
+
+    def run():
+        ld = Node().load()
+        ld.send(None)
+        for d in dump:
+            ld.send(d)
+        ld.close()
+
+    return run
+
+
+def _replay(n):
+    # @n messages over (at most) 5000 topics, skewed towards a few hot
+    # ones; every message is seen by two subscriptions
+    rnd = random.Random(n)
+    topics = [Path.build(p).slashed2 for p in gen_paths(min(n, 5000))]
+    msgs = []
+    for i in range(n // 2):
+        top = topics[min(int(rnd.expovariate(10 / len(topics))), len(topics) - 1)]
+        meta = MsgMeta(origin=f"src{i % 20}", timestamp=1000 + i).encode()
+        msgs.append((top, meta))
+        msgs.append((top, meta))
+    return msgs
+
+
+@benchmark("link.mqtt.decode.plain")
+def _decode_plain(n):
+    msgs = _replay(n)
+
+    def run():
+        for top, meta in msgs:
+            PS(top)
+            MsgMeta.decode("bench", meta)
+
+    return run
+
+
+@benchmark("link.mqtt.decode.cached")
+def _decode_cached(n):
+    msgs = _replay(n)
+
+    def run():
+        topics = DecodeCache(PS, 10000)
+        metas = DecodeCache(MsgMeta.parse, 1000)
+        for top, meta in msgs:
+            topics(top)
+            MsgMeta.from_parts("bench", metas(meta))
+
+    return run
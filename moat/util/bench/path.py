@@ -0,0 +1,57 @@
+"""
+Path benchmarks.
+"""
+
+from __future__ import annotations
+
+from moat.util import Path, PathLongener, PathShortener
+
+from . import benchmark, gen_paths
+
+
+@benchmark("path.from_str")
+def _from_str(n):
+    strs = [str(Path.build(p)) for p in gen_paths(n)]
+
+    def run():
+        fs = Path.from_str
+        for s in strs:
+            fs(s)
+
+    return run
+
+
+@benchmark("path.str")
+def _str(n):
+    paths = [Path.build(p) for p in gen_paths(n)]
+
+    def run():
+        for p in paths:
+            str(p)
+
+    return run
+
+
+@benchmark("path.shorten")
+def _shorten(n):
+    paths = [Path.build(p) for p in gen_paths(n)]
+
+    def run():
+        short = PathShortener().short
+        for p in paths:
+            short(p)
+
+    return run
+
+
+@benchmark("path.longen")
+def _longen(n):
+    ps = PathShortener()
+    short = [ps.short(Path.build(p)) for p in gen_paths(n)]
+
+    def run():
+        long = PathLongener().long
+        for d, p in short:
+            long(d, p)
+
+    return run
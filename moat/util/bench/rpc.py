@@ -0,0 +1,63 @@
+"""
+RPC streaming benchmarks, with and without write coalescing.
+
+Each run streams @n small items across a local TCP or Unix socket.
+"""
+
+from __future__ import annotations
+
+import anyio
+import os
+import tempfile
+from anyio.abc import SocketAttribute
+
+from moat.lib.rpc import MsgHandler, MsgSender, rpc_on_aiostream
+
+from . import benchmark
+
+#: batch sizes to compare
+BATCHES = (1, 32)
+
+
+class _Items(MsgHandler):
+    async def stream_items(self, msg):
+        async with msg.stream_out() as st:
+            for i in range(msg[0]):
+                await st.send(i)
+            await msg.result(None)
+
+
+async def _connect(kind: str, tmp: str):
+    if kind == "tcp":
+        lst = await anyio.create_tcp_listener(local_host="127.0.0.1")
+        lst = lst.listeners[0]
+        port = lst.extra(SocketAttribute.local_port)
+        conn = await anyio.connect_tcp("127.0.0.1", port)
+    else:
+        path = os.path.join(tmp, "sock")
+        lst = await anyio.create_unix_listener(path)
+        conn = await anyio.connect_unix(path)
+    async with lst:
+        return await lst.accept(), conn
+
+
+def _reg(kind: str, batch: int):
+    @benchmark(f"rpc.{kind}.batch{batch}")
+    def _stream(n):
+        async def run():
+            with tempfile.TemporaryDirectory() as tmp:
+                srv, cli = await _connect(kind, tmp)
+                async with (
+                    rpc_on_aiostream(_Items(), srv, batch=batch) as _srv,
+                    rpc_on_aiostream(None, cli) as hdl,
+                    MsgSender(hdl).cmd("items", n).stream_in() as st,
+                ):
+                    async for _ in st:
+                        pass
+
+        return run
+
+
+for _kind in ("tcp", "unix"):
+    for _batch in BATCHES:
+        _reg(_kind, _batch)
@@ -271,6 +271,32 @@ async def test_02_cmd(autojump_clock):  # pylint: disable=unused-argument  # noq
         pass  # server end
 
 
+@pytest.mark.trio
+async def test_02_watch_shared(autojump_clock):  # pylint: disable=unused-argument  # noqa: ARG001
+    """Check that watchers share the serialization of an update."""
+    async with stdtest(args={"init": 123}, tocks=50) as st:
+        assert st is not None
+        async with st.client() as c:
+            r = await c._request("get_state", debug=True)  # noqa: SLF001
+            hits, misses = r.debug.watch_ser.hits, r.debug.watch_ser.misses
+
+            async def watch(path, *, task_status=trio.TASK_STATUS_IGNORED):
+                async with c.watch(path) as w:
+                    task_status.started()
+                    async for r in w:
+                        if r.get("value") == "hello":
+                            return
+
+            async with trio.open_nursery() as tg:
+                for p in ("foo", "foo", "foo.bar", "foo.bar"):
+                    await tg.start(watch, P(p))
+                await c.set(P("foo.bar"), value="hello")
+
+            r = await c._request("get_state", debug=True)  # noqa: SLF001
+            assert r.debug.watch_ser.misses - misses == 1
+            assert r.debug.watch_ser.hits - hits == 3
+
+
 @pytest.mark.trio
 async def test_03_three(autojump_clock):  # pylint: disable=unused-argument  # noqa: ARG001, D103
     async with stdtest(test_1={"init": 125}, n=2, tocks=30) as st:
@@ -21,3 +21,8 @@ async def test_51_dh(autojump_clock):  # pylint: disable=unused-argument  # noqa
             dh = await c.dh_secret(length=10)
             assert dh == c._dh_key  # noqa: SLF001
             assert dh == sc._dh_key  # noqa: SLF001
+
+            # the server's key pool only keeps configured lengths ready
+            r = await c._request("get_state", debug=True)  # noqa: SLF001
+            assert r.debug.dh_pool.misses == 1
+            assert 10 not in r.debug.dh_pool.ready
@@ -7,9 +7,12 @@ import pytest
 import trio
 from asyncscope import scope
 
-from moat.util import P, PathLongener
+from moat.util import NotGiven, P, Path, PathLongener, get_codec
 from moat.kv.client import ServerError
 from moat.kv.mock.mqtt import stdtest
+from moat.kv.model import Entry
+from moat.kv.server import Server
+from moat.kv.snapshot import Snapshot, is_snapshot, path_key, write_snapshot
 from moat.src.test import raises
 
 logger = logging.getLogger(__name__)
@@ -135,6 +138,123 @@ async def test_21_load_save(autojump_clock, tmpdir):
     logger.debug("OK")
 
 
+@pytest.mark.trio
+async def test_22_snapshot(autojump_clock, tmpdir):  # noqa: D103
+    autojump_clock  # noqa: B018
+    snap = str(tmpdir.join("snap"))
+    log = str(tmpdir.join("log"))
+
+    async with stdtest(args={"init": 234}, tocks=30) as st:
+        (s,) = st.s
+        async with st.client() as c:
+            await c.set(P("foo"), value="hello")
+            await c.set(P("foo.bar"), value="baz")
+            await s.save(snap, snapshot=True)
+            await c.set(P("foo.bar"), value="quux")
+            await c.set(P("foo.baz"), value=42)
+            await s.save(log)
+
+    assert is_snapshot(snap)
+    assert not is_snapshot(log)
+    with Snapshot(snap) as sn:
+        assert len(sn) == 3
+        assert sn.get(P("foo.bar")).value == "baz"
+        assert [m.path for m in sn] == [P(":"), P("foo"), P("foo.bar")]
+
+    async with stdtest(run=False, tocks=40) as st:
+        (s,) = st.s
+        await s.load(snap, local=True)
+        await s.load(log, local=True)
+
+        evt = anyio.Event()
+        await st.run_0(ready_evt=evt)
+        await evt.wait()
+
+        async with st.client() as c:
+            assert (await c.get(P(":"))).value == 234
+            assert (await c.get(P("foo"))).value == "hello"
+            assert (await c.get(P("foo.bar"))).value == "quux"
+            assert (await c.get(P("foo.baz"))).value == 42
+
+
+@pytest.mark.trio
+async def test_23_snapshot_blocks(tmpdir):  # noqa: D103
+    path = str(tmpdir.join("snap"))
+    root = Entry("root", None, tock=1)
+    keys = [("a", 1), ("a", "x"), ("b",), (None, "y"), (3, 4, 5)] + [("c", i) for i in range(50)]
+    for i, k in enumerate(keys):
+        root.follow(k)._data = i  # noqa: SLF001
+    await write_snapshot(root, {"tock": 5}, path=path, block_size=7)
+
+    with Snapshot(path) as sn:
+        assert sn.info == {"tock": 5}
+        assert len(sn.blocks) == 8
+        assert len(sn) == len(keys) - 1  # no (None,…) without "full"
+        res = list(sn)
+        assert [m.path for m in res] == sorted((m.path for m in res), key=path_key)
+        for i, k in enumerate(keys):
+            if k[0] is None:
+                with pytest.raises(KeyError):
+                    sn.get(Path.build(k))
+            else:
+                assert sn.get(Path.build(k)).value == i
+        with pytest.raises(KeyError):
+            sn.get(P("c.99"))
+        with pytest.raises(KeyError):
+            sn.get(P("0"))
+
+
+@pytest.mark.trio
+async def test_24_bulk(autojump_clock, tmpdir):  # noqa: D103
+    autojump_clock  # noqa: B018
+    path = str(tmpdir.join("foo"))
+
+    async with stdtest(args={"init": 234}, tocks=200) as st:
+        (s,) = st.s
+        async with st.client() as c:
+            for i in range(20):
+                await c.set(P("foo") / i, value=i)
+            await c.set(P("foo.3"), value="three")
+            await c.set(P("foo.bar.baz"), value="quux")
+            await c.delete(P("foo.5"))
+        await s.save(path)
+
+        # "save" skips deleted entries, but logs contain tombstones
+        tomb = s.root.follow(P("foo.5"), create=False).serialize(nchain=-1)
+        assert "value" not in tomb
+        with open(path, "ab") as f:  # noqa: ASYNC230
+            f.write(get_codec("std-msgpack").encode(tomb))
+
+    async def dump(s):
+        res = []
+
+        async def saver(entry):
+            if entry.data is not NotGiven:
+                res.append(entry.serialize(nchain=-1))
+
+        await s.root.walk(saver, full=True)
+        return res
+
+    async with stdtest(run=False, tocks=200) as st:
+        (s,) = st.s
+        await s.load(path, local=True)
+        s2 = Server("test_0")
+        await s2.load(path, local=True, bulk=False)
+
+        d = await dump(s)
+        paths = {m.path for m in d}
+        assert P("foo.3") in paths
+        assert P("foo.5") not in paths
+        assert P("foo.bar.baz") in paths
+        assert d == await dump(s2)
+
+        r = await s.get_state(nodes=True, known=True, deleted=True)
+        r2 = await s2.get_state(nodes=True, known=True, deleted=True)
+        assert r["deleted"]
+        for k in ("nodes", "known", "deleted"):
+            assert r[k] == r2[k]
+
+
 @pytest.mark.trio
 async def test_02_cmd(autojump_clock):  # pylint: disable=unused-argument  # noqa: ARG001, D103
     async with stdtest(args={"init": 123}, tocks=50) as st:
@@ -8,7 +8,7 @@ from __future__ import annotations
 import anyio
 import pytest
 
-from moat.lib.broadcast import Broadcaster, LostData
+from moat.lib.broadcast import Broadcaster, LostData, RingBroadcaster
 
 from typing import TYPE_CHECKING  # isort:skip
 
@@ -16,8 +16,14 @@ if TYPE_CHECKING:
     from moat.lib.broadcast import BroadcastReader
 
 
+@pytest.fixture(params=[Broadcaster, RingBroadcaster], ids=["queue", "ring"])
+def bcast(request):
+    "run each test with both implementations"
+    return request.param
+
+
 @pytest.mark.anyio
-async def test_example():
+async def test_example(bcast):
     r1 = []
     r2 = []
 
@@ -27,7 +33,7 @@ async def test_example():
         async for msg in bcr:
             res.append(msg)
 
-    async with anyio.create_task_group() as tg, Broadcaster() as bc:
+    async with anyio.create_task_group() as tg, bcast() as bc:
         await tg.start(rdr, bc, r1)
         await tg.start(rdr, bc, r2)
         for x in range(5):
@@ -40,7 +46,7 @@ async def test_example():
 
 
 @pytest.mark.anyio
-async def test_basic():
+async def test_basic(bcast):
     seen = [0, 0, 0]
 
     async def a(b, n):
@@ -56,7 +62,7 @@ async def test_basic():
             else:
                 seen[n] |= x
 
-    bq = Broadcaster(1)
+    bq = bcast(1)
     async with anyio.create_task_group() as tg, bq:
         tg.start_soon(a, aiter(bq), 0)
         await anyio.sleep(0.2)  # longer than 0.1, for reproducibility
@@ -71,3 +77,42 @@ async def test_basic():
         bq(4)
         # no delay here
     assert seen == [7, 20, 4]
+
+
+@pytest.mark.anyio
+async def test_lag(bcast):
+    async with bcast(3) as bc:
+        r1 = bc.reader(2)
+        r2 = aiter(bc)
+        r3 = bc.reader(10, skip=True)
+        for x in range(5):
+            bc(x)
+
+        with pytest.raises(LostData) as exc:
+            await anext(r1)
+        assert exc.value.n == 3
+        assert [await anext(r1) for _ in range(2)] == [3, 4]
+
+        with pytest.raises(LostData) as exc:
+            await anext(r2)
+        assert exc.value.n == 2
+        assert [await anext(r2) for _ in range(3)] == [2, 3, 4]
+
+        assert [await anext(r3) for _ in range(5)] == [0, 1, 2, 3, 4]
+
+        r1.flush()
+        r1("x")
+        bc(5)
+        assert await anext(r1) == "x"
+        assert await anext(r1) == 5
+
+        r4 = bc.reader(1, send_last=True)
+        assert await anext(r4) == 5
+        r4.close()
+        with pytest.raises(StopAsyncIteration):
+            await anext(r4)
+
+    # readers drain the remaining data, then stop
+    assert await anext(r2) == 5
+    with pytest.raises(StopAsyncIteration):
+        await anext(r2)
@@ -0,0 +1,43 @@
+"""
+test_pool tests the KeyPool class.
+"""
+
+from __future__ import annotations
+
+import anyio
+import pytest
+
+from moat.lib.diffiehellman.pool import KeyPool, new_key
+
+
+@pytest.mark.anyio
+async def test_pool():  # noqa: D103
+    pool = KeyPool(size=3)
+
+    k = await pool.get(256)
+    assert pool.stats == dict(hits=0, misses=1, ready={256: 0})
+
+    async with anyio.create_task_group() as tg:
+        await tg.start(pool.run)
+        with anyio.fail_after(10):
+            await pool.filled()
+
+        keys = [await pool.get(256) for _ in range(3)]
+        assert pool.hits == 3
+        assert len({kk.public_key for kk in [k, *keys]}) == 4
+
+        # the keys work
+        other = new_key(256)
+        for kk in keys:
+            assert kk.generate_shared_secret(other.public_key) == other.generate_shared_secret(
+                kk.public_key
+            )
+
+        with anyio.fail_after(10):
+            await pool.filled()
+        assert pool.stats["ready"] == {256: 3}
+
+        # unknown lengths are not pooled on request
+        await pool.get(128, want=False)
+        assert pool.stats["ready"] == {256: 3}
+        tg.cancel_scope.cancel()
@@ -0,0 +1,92 @@
+from __future__ import annotations  # noqa: D100
+
+import pytest
+
+from moat.lib.mqtt._index import RetainedMessages, SubscriptionIndex
+from moat.lib.mqtt._types import MQTTPublishPacket, Pattern
+
+PATTERNS = [
+    "#",
+    "+",
+    "foo",
+    "foo/#",
+    "foo/+",
+    "foo/bar",
+    "foo/+/baz",
+    "foo/bar/#",
+    "+/bar/baz",
+    "+/+/+",
+    "$SYS/#",
+    "$SYS/+/bar",
+    "/foo",
+    "foo/+/#",
+    "+/#",
+]
+TOPICS = [
+    "foo",
+    "foo/bar",
+    "foo/bar/baz",
+    "foo/x/baz",
+    "x/bar/baz",
+    "foo/bar/baz/quux",
+    "$SYS/foo/bar",
+    "$SYS",
+    "/foo",
+    "bar",
+    "foo/$x",
+    "foo/$x/baz",
+    "$x",
+]
+
+
+def _expected_topics(pattern):
+    pat = Pattern(pattern)
+    return {t for t in TOPICS if pat.matches(MQTTPublishPacket(topic=t, payload=""))}
+
+
+@pytest.mark.parametrize("topic", TOPICS)
+def test_subscription_index(topic: str) -> None:  # noqa: D103
+    idx = SubscriptionIndex()
+    for p in PATTERNS:
+        idx[Pattern(p)] = {p: None}
+    publish = MQTTPublishPacket(topic=topic, payload="")
+    expected = {p for p in PATTERNS if Pattern(p).matches(publish)}
+    found = [pat.pattern for pat, _ in idx.match(topic)]
+    assert len(found) == len(set(found))
+    assert set(found) == expected
+
+
+def test_subscription_index_delete() -> None:  # noqa: D103
+    idx = SubscriptionIndex()
+    for p in PATTERNS:
+        idx.setdefault(Pattern(p), {})[p] = None
+    for p in PATTERNS:
+        del idx[p]
+        assert p not in idx
+        for t in TOPICS:
+            assert p not in {pat.pattern for pat, _ in idx.match(t)}
+    assert not idx
+    assert not idx._root.children  # noqa:SLF001
+
+
+@pytest.mark.parametrize("pattern", PATTERNS)
+def test_retained_messages(pattern: str) -> None:  # noqa: D103
+    ret = RetainedMessages()
+    for t in TOPICS:
+        ret[t] = MQTTPublishPacket(topic=t, payload="")
+    found = [p.topic for p in ret.match(Pattern(pattern))]
+    assert len(found) == len(set(found))
+    assert set(found) == _expected_topics(pattern)
+
+
+def test_retained_messages_delete() -> None:  # noqa: D103
+    ret = RetainedMessages()
+    for t in TOPICS:
+        ret[t] = MQTTPublishPacket(topic=t, payload="")
+    ret.pop("foo/bar")
+    assert "foo/bar" not in {p.topic for p in ret.match(Pattern("foo/#"))}
+    assert "foo/bar/baz" in {p.topic for p in ret.match(Pattern("foo/#"))}
+    for t in TOPICS:
+        ret.pop(t, None)
+    assert not ret
+    assert not ret._root.children  # noqa:SLF001
@@ -303,3 +303,45 @@ def test_client_retain(retain: bool | None) -> None:
     packet.encode(buffer)
     client.feed_bytes(buffer)
     assert client.cap_retain == (retain is not False)
+
+
+def test_broker_publish_encodes_once(
+    client_session_pairs: list[tuple[MQTTClientStateMachine, MQTTBrokerClientStateMachine]],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that a PUBLISH to several subscribers is only encoded once."""
+    broker = MQTTBrokerStateMachine()
+    for _client, client_session in client_session_pairs:
+        broker.add_client_session(client_session)
+        broker.subscribe_session_to(
+            client_session, Subscription(Pattern("test/#"), max_qos=QoS.AT_LEAST_ONCE)
+        )
+    client2, client_session2 = client_session_pairs[1]
+    broker.subscribe_session_to(client_session2, Subscription(Pattern("other")))
+
+    # advance client 2's packet ID
+    broker.publish("client-1", MQTTPublishPacket(topic="other", payload="x", qos=1, packet_id=1))
+    client2.feed_bytes(client_session2.get_outbound_data())
+
+    n_encode = 0
+    encode = MQTTPublishPacket.encode
+
+    def counting_encode(self, buffer):
+        nonlocal n_encode
+        n_encode += 1
+        encode(self, buffer)
+
+    monkeypatch.setattr(MQTTPublishPacket, "encode", counting_encode)
+    publish = MQTTPublishPacket(topic="test/topic", payload="payload", qos=2, packet_id=5)
+    assert broker.publish("client-1", publish) == {"client-1", "client-2"}
+    assert n_encode == 1
+
+    for (client, client_session), packet_id in zip(client_session_pairs, (1, 2), strict=True):
+        packets = client.feed_bytes(client_session.get_outbound_data())
+        assert len(packets) == 1
+        packet = packets[0]
+        assert isinstance(packet, MQTTPublishPacket)
+        assert packet.topic == "test/topic"
+        assert packet.payload == "payload"
+        assert packet.qos == QoS.AT_LEAST_ONCE
+        assert packet.packet_id == packet_id
@@ -45,10 +45,11 @@ async def _wrap_sock(s: socket) -> anyio.abc.ByteStream:
 
 
 class StreamGate(CtxObj):  # noqa: D101
-    def __init__(self, h: MsgHandler, so: socket, s: str):
+    def __init__(self, h: MsgHandler, so: socket, s: str, batch: int = 1):
         self.s = s
         self.so = so
         self.h = h
+        self.batch = batch
 
     @asynccontextmanager
     async def _ctx(self):
@@ -56,7 +57,7 @@ class StreamGate(CtxObj):  # noqa: D101
 
         async with (
             await _wrap_sock(self.so) as sock,
-            rpc_on_aiostream(self.h, sock, debug=self.s) as out,
+            rpc_on_aiostream(self.h, sock, debug=self.s, batch=self.batch) as out,
         ):
             yield out
             # await anyio.sleep(0.1)
@@ -70,13 +71,13 @@ class StreamGate(CtxObj):  # noqa: D101
 
 
 @asynccontextmanager
-async def scaffold(ha, hb, key="", use_socket=False):  # noqa: D103
+async def scaffold(ha, hb, key="", use_socket=False, batch=1):  # noqa: D103
     if use_socket:
         import socket  # noqa: PLC0415
 
         sa, sb = socket.socketpair()
-        a = StreamGate(ha, sa, key + ">")
-        b = StreamGate(hb, sb, key + "<")
+        a = StreamGate(ha, sa, key + ">", batch=batch)
+        b = StreamGate(hb, sb, key + "<", batch=batch)
     else:
         a = StreamLoop(ha, key + ">")
         b = StreamLoop(hb, key + "<")
@@ -7,7 +7,7 @@ from tests.moat_lib_rpc.scaffold import scaffold
 
 from moat.util import P
 from moat.lib.micro import log
-from moat.lib.rpc import MsgHandler, MsgSender
+from moat.lib.rpc import MsgHandler, MsgSender, dispatch_stats
 
 
 @pytest.mark.anyio
@@ -54,6 +54,46 @@ async def test_basic_handle(a_s, a_r, k_s, k_r):  # noqa: D103
     assert res.kw == k_r
 
 
+@pytest.mark.anyio
+async def test_dispatch_cache():  # noqa: D103
+    class Sub(MsgHandler):
+        async def cmd_z(self, x):
+            return x + 1
+
+    class EP(MsgHandler):
+        async def cmd_a(self):
+            return "a"
+
+        def sub_x(self, msg, rcmd):
+            return self.handle(msg, rcmd, "x")
+
+        async def cmd_x_y(self):
+            return "xy"
+
+    ep = EP()
+    ms = MsgSender(ep)
+    dispatch_stats(True)
+    try:
+        for _ in range(3):
+            assert list((await ms.cmd("a")).args) == ["a"]
+            assert list((await ms.cmd(P("x.y"))).args) == ["xy"]
+        with pytest.raises(KeyError):
+            await ms.cmd(P("s.z"), 1)
+
+        with ep.delegate(P("s"), Sub()):
+            assert list((await ms.cmd(P("s.z"), 1)).args) == [2]
+        with pytest.raises(KeyError):
+            await ms.cmd(P("s.z"), 1)
+
+        st = dispatch_stats()
+        assert st[("a",)][0] == 3
+        assert st[("x", "y")][0] == 6  # two levels
+        assert st[("s", "z")][0] == 2
+    finally:
+        dispatch_stats(False)
+    assert dispatch_stats() is None
+
+
 @pytest.mark.anyio
 async def test_basic_error():
     "check error handling"
@@ -239,6 +279,22 @@ async def test_stream_in(use_socket):  # noqa: D103
         print("DONE")
 
 
+@pytest.mark.anyio
+async def test_stream_batch():  # noqa: D103
+    class EP(MsgHandler):
+        async def stream_Test(self, msg):
+            async with msg.stream_out() as st:
+                for i in range(msg[0]):
+                    await st.send(i)
+                await msg.result("done")
+
+    async with scaffold(EP(), None, use_socket=True, batch=8) as (_a, b):
+        async with b.cmd("Test", 100).stream_in() as st:
+            r = [m[0] async for m in st]
+        assert r == list(range(100))
+        assert tuple(st.args) == ("done",)
+
+
 @pytest.mark.anyio
 @pytest.mark.parametrize("use_socket", [False, True])
 async def test_stream_out(use_socket):  # noqa: D103
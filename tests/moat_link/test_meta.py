@@ -8,6 +8,7 @@ from base64 import b85encode
 
 from moat.lib.codec import get_codec
 from moat.lib.proxy import unwrap_obj, wrap_obj
+from moat.link.backend._cache import DecodeCache
 from moat.link.meta import MsgMeta
 
 
@@ -87,3 +88,28 @@ def test_proxy():
     assert pr[0] == "_MM"
     n = unwrap_obj(pr)
     assert n == nn
+
+
+def test_cached():
+    "Decoding via a cache returns independent objects"
+    codec = get_codec("cbor")
+
+    ts = b85encode(codec.encode(1234567890.5)).decode("utf-8")
+    kw = b85encode(codec.encode({"yes": True})).decode("utf-8")
+    md = f"owch\\{ts}\\{kw}"
+    cache = DecodeCache(MsgMeta.parse, 2)
+    n1 = MsgMeta.from_parts("duh", cache(md))
+    n2 = MsgMeta.from_parts("duh", cache(md))
+    assert n1 == n2 == MsgMeta.decode("duh", md)
+    assert n1.timestamp == 1234567890.5
+    n1["yes"] = False
+    n1.origin = "ouch"
+    assert n2.kw["yes"] is True
+    assert n2.origin == "owch"
+
+    cache("a")
+    cache("b")
+    assert cache.stats["size"] == 2
+    assert (cache.hits, cache.misses) == (1, 3)
+    cache(md)
+    assert cache.misses == 4
@@ -79,3 +79,58 @@ def test_basic():
     assert n.set(P("c.e.t"), 20, MsgMeta(origin="B"))
     for a, b in zip_longest(n._dump_x(), n.dump()):  # noqa: SLF001
         assert a == b, (a, b)
+
+
+@pytest.mark.anyio
+async def test_walk_changes():
+    """
+    Walking a change-tracking node by timestamp visits the same nodes
+    as a full scan.
+    """
+    n = Node()
+    ref = Node()
+    for i, p in enumerate(("a.b", "a.b.c", "a.d", "b.c", "b", "a.b.e.f")):
+        for x in (n, ref):
+            x.set(P(p), i, MsgMeta(origin="A", timestamp=10 + i))
+    n.track_changes()
+    assert len(n._changes) == 6  # noqa:SLF001
+
+    for x in (n, ref):
+        x.set(P("a.d"), 99, MsgMeta(origin="B", timestamp=20))
+        x.set(P("c"), 98, MsgMeta(origin="B", timestamp=12.5))
+
+    async def collect(x, **kw):
+        res = []
+
+        async def proc(p, s):
+            res.append((p, s.data))
+
+        await x.walk(proc, **kw)
+        return res
+
+    for kw in (
+        dict(timestamp=12),
+        dict(timestamp=12, prefix=P("a")),
+        dict(timestamp=12, prefix=P("a"), min_depth=2),
+        dict(timestamp=11, max_depth=1),
+        dict(timestamp=12, prefix=P("x")),
+    ):
+        assert sorted(await collect(n, **kw)) == sorted(await collect(ref, **kw)), kw
+    assert await collect(n, timestamp=12) == [
+        (P("c"), 98),
+        (P("b.c"), 3),
+        (P("b"), 4),
+        (P("a.b.e.f"), 5),
+        (P("a.d"), 99),
+    ]
+
+    skipped = []
+
+    async def proc(p, _s):
+        skipped.append(p)
+        return False
+
+    n.set(P("a.b.e"), 97, MsgMeta(origin="B", timestamp=21))
+    n.set(P("a.b.e.f"), 96, MsgMeta(origin="B", timestamp=22))
+    await n.walk(proc, timestamp=21)
+    assert skipped == [P("a.b.e")]
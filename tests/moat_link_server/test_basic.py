@@ -274,3 +274,31 @@ async def test_asdict(cfg):  # noqa: D103
             with anyio.fail_after(0.2):
                 await a.wait_
             assert a.b.y == 3
+
+
+@pytest.mark.anyio
+async def test_flush_deleted(cfg):
+    "Deleted nodes are removed when their timer runs out."
+    from moat.link.server import Server  # noqa: PLC0415
+
+    cfg = cfg.link
+    cfg.timeout.delete = 100
+    s = Server(cfg, "S_gc")
+    t = time.time()
+
+    s.maybe_update(P("a.b.c"), 1, MsgMeta(origin="X", timestamp=t - 300), local=True)
+    s.maybe_update(P("a.b.d"), 2, MsgMeta(origin="X", timestamp=t - 300), local=True)
+    s.maybe_update(P("a.b.c"), NotGiven, MsgMeta(origin="X", timestamp=t - 200), local=True)
+    s.maybe_update(P("a.b.d"), NotGiven, MsgMeta(origin="X", timestamp=t - 99.7), local=True)
+    s.maybe_update(P("x.y"), NotGiven, MsgMeta(origin="X", timestamp=t - 200), local=True)
+    s.maybe_update(P("x.y"), 3, MsgMeta(origin="X", timestamp=t - 150), local=True)
+    assert len(s._tombstones) == 2  # noqa:SLF001
+
+    async with anyio.create_task_group() as tg:
+        await tg.start(s._flush_deleted)  # noqa:SLF001
+        await anyio.sleep(0.1)
+        assert list(s.data.get(P("a.b"), create=False).keys()) == ["d"]
+        await anyio.sleep(0.5)
+        assert list(s.data.keys()) == ["x"]
+        assert s.data[P("x.y")].data == 3
+        tg.cancel_scope.cancel()
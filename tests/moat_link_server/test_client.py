@@ -2,9 +2,11 @@ from __future__ import annotations  # noqa: D100
 
 import anyio
 import pytest
+from contextlib import asynccontextmanager
 
 from moat.util import NotGiven, P, Path
 from moat.link._test import Scaffold
+from moat.link.cache import DataCache
 from moat.link.exceptions import OutOfDateError
 from moat.link.meta import MsgMeta
 
@@ -224,3 +226,170 @@ async def test_set_time(cfg):
         await c.d_set(P("test.here"), "Yep3", t=True)
         res = await c.d.get(P("test.here"))
         assert res[0] == "Yep3"
+
+
+async def _wait_for(c, path, value):
+    "Poll the cache until @path has @value"
+    with anyio.fail_after(1):
+        while True:
+            try:
+                if await c.d_get(path) == value:
+                    return
+            except KeyError:
+                if value is NotGiven:
+                    return
+            await anyio.sleep(0.01)
+
+
+@pytest.mark.anyio
+async def test_cache(cfg):
+    "Check that a cache follows updates and deletions"
+    async with (
+        Scaffold(cfg, use_servers=True) as sf,
+        sf.server_(init={"Hello": "there!", "test": 123}),
+        sf.client_() as c,
+    ):
+        await c.d_set(P("test.here"), "HiLo")
+        await c.d_set(P("test.here.too"), "Ugh")
+        await c.i_sync()
+
+        async with c.d_cache(P("test")) as cache:
+            assert cache.synced
+            s = cache.stats
+            assert await c.d_get(P("test.here.too")) == "Ugh"
+            res, meta = await c.d_get(P("test.here"), meta=True)
+            assert res == "HiLo"
+            assert isinstance(meta, MsgMeta)
+            assert cache.stats["hits"] == s["hits"] + 2
+
+            _, _, stale = cache.get(P("test.here"))
+            assert not stale
+
+            await c.d_set(P("test.here"), "Yes")
+            await _wait_for(c, P("test.here"), "Yes")
+
+            await c.d_set(P("test.here.too"), NotGiven)
+            await _wait_for(c, P("test.here.too"), NotGiven)
+            with pytest.raises(KeyError):
+                await c.d_get(P("test.here.too"))
+
+            await c.d_set(P("test.here.too"), "Again")
+            await _wait_for(c, P("test.here.too"), "Again")
+            await c.d.delete(P("test.here.too"))
+            await _wait_for(c, P("test.here.too"), NotGiven)
+
+            # not covered by the cache
+            hits = cache.hits
+            assert await c.d_get(P("Hello")) == "there!"
+            assert cache.hits == hits
+
+        # no longer cached
+        assert await c.d_get(P("test.here")) == "Yes"
+        assert cache.hits == hits
+
+
+@pytest.mark.anyio
+async def test_cache_limit(cfg):
+    "Check that a cache that's too large is dropped"
+    async with (
+        Scaffold(cfg, use_servers=True) as sf,
+        sf.server_(init={"Hello": "there!", "test": 123}),
+        sf.client_() as c,
+    ):
+        for i in range(10):
+            await c.d_set(P("test.here") / i, i)
+        await c.i_sync()
+
+        with anyio.fail_after(1):
+            async with c.d_cache(P("test"), max_nodes=5) as cache:
+                assert cache.overflow
+                assert not cache.synced
+                assert await c.d_get(P("test.here") / 3) == 3
+                assert cache.hits == 0
+
+
+@pytest.mark.anyio
+async def test_cache_churn(cfg):
+    "Check that deleted entries don't count towards the cache's limit"
+    async with (
+        Scaffold(cfg, use_servers=True) as sf,
+        sf.server_(init={"Hello": "there!", "test": 123}),
+        sf.client_() as c,
+    ):
+        await c.d_set(P("test.here"), "HiLo")
+        await c.i_sync()
+
+        async with c.d_cache(P("test"), max_nodes=5) as cache:
+            for i in range(10):
+                await c.d_set(P("test.here") / i, i)
+                await _wait_for(c, P("test.here") / i, i)
+                await c.d_set(P("test.here") / i, NotGiven)
+                await _wait_for(c, P("test.here") / i, NotGiven)
+            assert cache.synced
+            assert not cache.overflow
+            assert cache.stats["nodes"] == 2
+
+
+class _FakeWatch:
+    def __init__(self, node):
+        self.node = node
+
+    async def get_node(self):
+        return self.node
+
+
+class _FakeLink:
+    "A link whose watcher fails on request. Restarted watchers wait for @resume."
+
+    def __init__(self):
+        self.resume = anyio.Event()
+        self.restarted = anyio.Event()
+        self.fail = None
+        self.n = 0
+
+    async def _fail(self, evt):
+        await evt.wait()
+        raise RuntimeError("watch failed")
+
+    @asynccontextmanager
+    async def d_watch(self, path, subtree, meta, cls):  # noqa: ARG002
+        self.n += 1
+        node = cls()
+        node.set(P("a"), self.n, MsgMeta(origin="test"))
+        if self.n > 1:
+            self.restarted.set()
+            await self.resume.wait()
+        self.fail = anyio.Event()
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(self._fail, self.fail)
+            yield _FakeWatch(node)
+
+
+@pytest.mark.anyio
+async def test_cache_resync():
+    "Check that the old mirror's data are returned as stale while resyncing"
+    link = _FakeLink()
+    cache = DataCache(link, P("test"), retry=0)
+    async with anyio.create_task_group() as tg:
+        await tg.start(cache.run)
+        await cache.wait()
+        data, meta, stale = cache.get(P("test.a"))
+        assert data == 1
+        assert isinstance(meta, MsgMeta)
+        assert not stale
+
+        link.fail.set()
+        with anyio.fail_after(1):
+            await link.restarted.wait()
+        assert not cache.synced
+        data, _, stale = cache.get(P("test.a"))
+        assert data == 1
+        assert stale
+
+        link.resume.set()
+        with anyio.fail_after(1):
+            await cache.wait()
+        data, _, stale = cache.get(P("test.a"))
+        assert data == 2
+        assert not stale
+        tg.cancel_scope.cancel()
@@ -0,0 +1,104 @@
+from __future__ import annotations  # noqa: D100
+
+import anyio
+import pytest
+
+from moat.util import MsgReader, MsgWriter, NotGiven, P, PathShortener, attrdict
+from moat.lib.codec.cbor import CBOR_TAG_CBOR_LEADER, Tag
+from moat.link.meta import MsgMeta
+from moat.link.node import Node
+from moat.link.server._server import Server, tag_check
+from moat.link.server.compact import compact, load_chain
+from moat.util.cbor import gen_start, gen_stop
+
+
+async def _write(fn, mode, recs, **kw):
+    shorter = PathShortener([])
+    async with MsgWriter(path=fn, codec="std-cbor") as mw:
+        await mw(gen_start(f"MoaT-Link {mode}", mode=mode, name=str(fn), **kw))
+        for p, d, ts in recs:
+            dd, pp = shorter.short(P(p))
+            await mw([dd, pp, d, *MsgMeta(origin="test", timestamp=ts).dump()])
+        await mw(gen_stop(mode="next"))
+
+
+@pytest.mark.anyio
+async def test_compact(tmp_path):  # noqa: D103
+    f1 = tmp_path / "1.moat"
+    f2 = tmp_path / "2.moat"
+    f3 = tmp_path / "3.moat"
+    await _write(f1, "full", [("a", 1, 10), ("a.b", 2, 10), ("c", 3, 10)])
+    await _write(f2, "incr", [("a.b", 22, 20), ("c", NotGiven, 20)], prev=str(f1))
+    # the older value must not win, even though it's in a newer file
+    await _write(f3, "incr", [("a", 11, 5), ("d", 4, 30)], prev=str(f2))
+
+    n = Node()
+    files = await load_chain(f3, n)
+    assert [str(f) for f in files] == [str(f3), str(f2), str(f1)]
+
+    out = tmp_path / "out.moat"
+    files = await compact(f3, out)
+    assert len(files) == 3
+
+    tags = []
+    async with MsgReader(out, codec="std-cbor") as rdr:
+        async for msg in rdr:
+            if isinstance(msg, Tag):
+                if msg.tag == CBOR_TAG_CBOR_LEADER:
+                    msg = msg.value
+                tags.append(msg)
+    assert tag_check(tags)
+
+    m = Node()
+    files = await load_chain(out, m)
+    assert [str(f) for f in files] == [str(out)]
+    assert m.get(P("a")).data == 1
+    assert m.get(P("a.b")).data == 22
+    assert m.get(P("d")).data == 4
+    assert m.get(P("c")).data_ is NotGiven
+    assert m.get(P("c")).meta.timestamp == 20
+
+
+@pytest.mark.anyio
+async def test_compact_incomplete(tmp_path):  # noqa: D103
+    f2 = tmp_path / "2.moat"
+    await _write(f2, "incr", [("a", 1, 10)], prev=str(tmp_path / "1.moat"))
+    with pytest.raises(FileNotFoundError):
+        await compact(f2)
+
+    await _write(f2, "incr", [("a", 1, 10)])
+    with pytest.raises(ValueError, match="incomplete"):
+        await compact(f2)
+
+
+class _Saver:
+    _save_task = Server._save_task  # noqa: SLF001
+
+    def __init__(self, tg, cfg):
+        self._tg = tg
+        self.cfg = cfg
+        self.saved = []
+        self.compacted = []
+
+    async def run_saver(self, path, save_state=True, **kw):  # noqa: ARG002
+        self.saved.append((str(path), save_state))
+        if len(self.saved) == 8:
+            self._tg.cancel_scope.cancel()
+
+    async def _compact_saved(self, fn):
+        self.compacted.append(fn)
+
+
+@pytest.mark.anyio
+async def test_compact_schedule(tmp_path):
+    "Each incremental file is compacted once the next one has started"
+    save = attrdict(
+        dir=str(tmp_path), name="%H%M%S%f.moat", interval=0.01, rewrite=3, compact=True
+    )
+    async with anyio.create_task_group() as tg:
+        sv = _Saver(tg, attrdict(server=attrdict(save=save)))
+        await tg.start(sv._save_task)  # noqa: SLF001
+
+    assert [full for _, full in sv.saved] == [True, False, False] * 2 + [True, False]
+    files = [fn for fn, _ in sv.saved]
+    assert sv.compacted == [files[i] for i in (1, 2, 4, 5)]
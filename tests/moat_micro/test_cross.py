@@ -0,0 +1,72 @@
+"""
+Test the mpy-cross cache
+"""
+
+from __future__ import annotations
+
+import anyio
+import pytest
+
+from moat.micro.cross import MpyCross
+from moat.micro.files import copy_over
+
+pytestmark = pytest.mark.anyio
+
+FAKE = """\
+#!/bin/sh
+if [ "$1" = "--version" ] ; then echo "fake mpy-cross 1.0" ; exit 0 ; fi
+echo run >> {log}
+for a ; do case "$a" in *.py) f="$a" ;; esac ; done
+echo "compiled"
+cat "$f"
+"""
+
+
+async def _runs(log):
+    try:
+        return len((await log.read_text()).splitlines())
+    except FileNotFoundError:
+        return 0
+
+
+async def test_cross_cache(tmp_path):
+    "A second sync of an unchanged tree doesn't run the compiler"
+    tmp = anyio.Path(tmp_path)
+    log = tmp / "runs"
+    cross = tmp / "mpy-cross"
+    await cross.write_text(FAKE.format(log=log))
+    await cross.chmod(0o755)
+
+    src = tmp / "src"
+    await (src / "sub").mkdir(parents=True)
+    for i in range(5):
+        await (src / f"m{i}.py").write_text(f"x = {i}\n")
+        await (src / "sub" / f"s{i}.py").write_text(f"y = {i}\n")
+    await (src / "data.state").write_text("nope\n")
+
+    dst = tmp / "dst"
+    await dst.mkdir()
+    cache = tmp / "cache"
+
+    c = MpyCross(cross, cache_dir=cache, limit=3)
+    assert await copy_over(src, dst, cross=c) == 11
+    assert await _runs(log) == 10
+    assert c.runs == 10
+    assert (await (dst / "sub" / "s3.mpy").read_text()).startswith("compiled\n")
+
+    # second sync, with a new cache object
+    c = MpyCross(cross, cache_dir=cache)
+    assert await copy_over(src, dst, cross=c) == 0
+    assert await _runs(log) == 10
+    assert c.runs == 0
+    assert c.hits >= 10
+
+    # a changed file, or changed flags, get recompiled
+    await (src / "m1.py").write_text("x = 42\n")
+    c = MpyCross(cross, cache_dir=cache)
+    assert await copy_over(src, dst, cross=c) == 1
+    assert c.runs == 1
+
+    c = MpyCross(cross, flags=("-march=armv7m",), cache_dir=cache)
+    await c.prepare(src)
+    assert c.runs == 10
@@ -0,0 +1,153 @@
+"""
+Test windowed file transfers
+"""
+
+from __future__ import annotations
+
+import anyio
+import pytest
+import random
+import time
+
+from moat.util import P
+from moat.micro._test import mpy_stack
+from moat.micro.files import MoatFSPath
+
+pytestmark = pytest.mark.anyio
+
+# pylint:disable=R0801 # Similar lines in 2 files
+
+CFG = """
+apps:
+  r: _test.MpyCmd
+r:
+  mplex: true
+  cfg:
+    apps:
+      r: stdio.StdIO
+      f: fs.Cmd
+    f:
+      root: "/tmp/nonexisting"
+    r:
+      link: &link
+        frame: 0x85
+        console: false
+      log:
+        txt: "S"
+  link: *link
+"""
+
+
+class _Res:
+    def __init__(self, val):
+        self.args = [val]
+        self.kw = {}
+
+    def __len__(self):
+        return 1
+
+    def __getitem__(self, i):
+        return self.args[i]
+
+
+class _FakeFS:
+    """
+    A remote file system with one file, a small buffer and random
+    latency.
+
+    Requests don't share any state, so this can't catch interference
+    between concurrent requests; `test_window_fs` uses the real thing.
+    """
+
+    def __init__(self, maxlen):
+        self.maxlen = maxlen
+        self.data = bytearray()
+        self.reqs = 0
+
+    async def cmd(self, cmd, *a, **kw):
+        await anyio.sleep(random.random() / 100)
+        if cmd == "open":
+            if kw["m"] == "w":
+                self.data = bytearray()
+            return _Res(1)
+        if cmd == "cl":
+            return _Res(None)
+        if cmd == "stat":
+            return _Res({"d": (0x8000, 0, 0, 0, 0, 0, len(self.data), 0, 0, 0)})
+
+        self.reqs += 1
+        _, off = a
+        if cmd == "rd":
+            return _Res(bytes(self.data[off : off + min(kw["n"], self.maxlen)]))
+        if cmd == "wr":
+            d = kw["d"][: self.maxlen]
+            if len(self.data) < off:
+                self.data.extend(b"\0" * (off - len(self.data)))
+            self.data[off : off + len(d)] = d
+            return _Res(len(d))
+        raise ValueError(cmd)
+
+
+async def test_window_fake():
+    "Reordered and short replies"
+    fs = _FakeFS(50)
+    p = MoatFSPath("test").connect_repl(fs)
+    data = bytes(random.getrandbits(8) for _ in range(2000))
+
+    await p.write_bytes(data, chunk=128, window=4)
+    assert fs.data == data
+    await p.write_bytes(data[:100], chunk=128, window=4)
+    assert fs.data == data[:100]
+
+    fs.data = bytearray(data)
+    fs.reqs = 0
+    assert await p.read_bytes(chunk=128, window=4) == data
+    # the chunk size adapts to the remote's
+    assert fs.reqs < 2000 // 50 + 5
+
+    res = []
+    async for d in p.read_as_stream(chunk=64, window=3):
+        res.append(d)
+    assert b"".join(res) == data
+    assert len(res) > 1
+
+
+@pytest.mark.parametrize("window", [1, 4])
+async def test_window_speed(tmp_path, window):
+    "Transfer a file via a real link"
+    r = anyio.Path(tmp_path) / "root"
+    await r.mkdir()
+    data = bytes(random.getrandbits(8) for _ in range(20000))
+
+    async with (
+        mpy_stack(tmp_path, CFG, {"r": {"cfg": {"f": {"root": str(r)}}}}) as d,
+        d.sub_at(P("r.f")) as fs,
+    ):
+        p = MoatFSPath("test").connect_repl(fs)
+
+        t = time.monotonic()
+        await p.write_bytes(data, window=window)
+        assert await (r / "test").read_bytes() == data
+        res = await p.read_bytes(window=window)
+        t = time.monotonic() - t
+        assert res == data
+        print(f"Window {window}: {2 * len(data) / t:.0f} bytes/sec")
+
+
+async def test_window_fs(tmp_path):
+    "Many small concurrent requests via the real file system command"
+    r = anyio.Path(tmp_path) / "root"
+    await r.mkdir()
+    data = bytes(range(256)) * 40
+
+    async with (
+        mpy_stack(tmp_path, CFG, {"r": {"cfg": {"f": {"root": str(r)}}}}) as d,
+        d.sub_at(P("r.f")) as fs,
+    ):
+        p = MoatFSPath("test").connect_repl(fs)
+        await p.write_bytes(data, chunk=32, window=8)
+        assert await (r / "test").read_bytes() == data
+
+        await (r / "test2").write_bytes(data[::-1])
+        p = MoatFSPath("test2").connect_repl(fs)
+        assert await p.read_bytes(chunk=32, window=8) == data[::-1]
@@ -0,0 +1,92 @@
+"""
+Test the read planner, i.e. `DataBlock.ranges`
+"""
+
+from __future__ import annotations
+
+import pytest
+
+from moat.util import yload
+from moat.modbus.dev.device import BadRegisterError, Register, _data, fixup
+from moat.modbus.types import DataBlock, InaccessibleValue, IntValue, LongValue
+
+DEVICES = (
+    "energy/Eastron/SDM630.yaml",
+    "energy/Siemens/SENTRON PAC3200.yaml",
+    "energy/Janitza/UMG508.yaml",
+    "heating/Solvis.yaml",
+)
+
+
+def _regs(d, path=()):
+    if not isinstance(d, dict):
+        return
+    if "register" in d:
+        yield path, d
+        return
+    for k, v in d.items():
+        yield from _regs(v, (*path, k))
+
+
+def _blocks(fn):
+    f = _data / fn
+    with f.open("r") as df:
+        d = yload(df, attr=True)
+    d = fixup(d, this_file=f)
+
+    blocks = {}
+    for path, r in _regs(d):
+        try:
+            reg = Register(r, path)
+        except (AttributeError, BadRegisterError):
+            continue
+        blk = blocks.setdefault(reg.reg_type, DataBlock())
+        try:
+            blk.add(reg.register, reg.reg)
+        except ValueError:
+            pass
+    return blocks
+
+
+def _count(blocks, max_len, max_gap):
+    return sum(len(list(b.ranges(max_len=max_len, max_gap=max_gap))) for b in blocks.values())
+
+
+@pytest.mark.parametrize("fn", DEVICES)
+def test_device_requests(fn):
+    "Gap bridging must never increase the number of requests"
+    blocks = _blocks(fn)
+    assert blocks
+
+    last = None
+    for gap in (0, 2, 8, 32):
+        n = _count(blocks, 40, gap)
+        if last is not None:
+            assert n <= last, (gap, n, last)
+        last = n
+
+        for blk in blocks.values():
+            for start, length in blk.ranges(max_len=40, max_gap=gap):
+                assert length <= 40
+                assert start in blk
+
+
+def test_sdm630_requests():
+    "The SDM630 map has small holes; bridging them saves requests"
+    blocks = _blocks(DEVICES[0])
+    assert _count(blocks, 40, 4) < _count(blocks, 40, 0)
+
+
+def test_gap_limits():
+    "Gaps honour max_len, max_gap and inaccessible ranges"
+    blk = DataBlock()
+    blk.add(0, IntValue())
+    blk.add(2, LongValue())
+    blk.add(10, IntValue())
+    blk.add(11, InaccessibleValue(1))
+    blk.add(13, IntValue())
+
+    assert list(blk.ranges()) == [(0, 1), (2, 2), (10, 1), (13, 1)]
+    assert list(blk.ranges(max_gap=1)) == [(0, 4), (10, 1), (13, 1)]
+    assert list(blk.ranges(max_gap=6)) == [(0, 11), (13, 1)]
+    assert list(blk.ranges(max_gap=6, max_len=10)) == [(0, 4), (10, 1), (13, 1)]
@@ -0,0 +1,101 @@
+"""
+Test request coalescing and caching in the relay server
+"""
+
+from __future__ import annotations
+
+import anyio
+import pytest
+
+from pymodbus.pdu.register_message import (
+    ReadHoldingRegistersRequest,
+    ReadHoldingRegistersResponse,
+    WriteSingleRegisterRequest,
+    WriteSingleRegisterResponse,
+)
+
+from moat.modbus.server import RelayServer
+
+
+class _Client:
+    n = 0
+
+    async def execute(self, req):
+        self.n += 1
+        await anyio.sleep(0.05)
+        if isinstance(req, WriteSingleRegisterRequest):
+            return WriteSingleRegisterResponse(address=req.address, registers=req.registers)
+        return ReadHoldingRegistersResponse(registers=[self.n] * req.count, dev_id=req.dev_id)
+
+
+class _Relay(RelayServer):
+    pass
+
+
+def _rd(addr=10, count=2):
+    return ReadHoldingRegistersRequest(address=addr, count=count, dev_id=1)
+
+
+@pytest.mark.anyio
+async def test_coalesce():
+    """Concurrent identical reads share one transaction"""
+    cl = _Client()
+    rl = _Relay(cl)
+    res = []
+
+    async def rd(req):
+        res.append((await rl._forward(req)).registers)  # noqa: SLF001
+
+    async with anyio.create_task_group() as tg:
+        for _ in range(5):
+            tg.start_soon(rd, _rd())
+        tg.start_soon(rd, _rd(12))
+    assert cl.n == 2
+    assert len(res) == 6
+
+    # no cache: the next read goes upstream
+    await rl._forward(_rd())  # noqa: SLF001
+    assert cl.n == 3
+
+
+@pytest.mark.anyio
+async def test_coalesce_write():
+    """A read after a write doesn't share an earlier read's transaction"""
+    cl = _Client()
+    rl = _Relay(cl)
+    res = []
+
+    async def rd():
+        res.append((await rl.process_request(_rd())).registers)
+
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(rd)
+        await anyio.sleep(0.01)
+        tg.start_soon(rd)
+        await anyio.sleep(0.01)
+        await rl.process_request(WriteSingleRegisterRequest(address=10, registers=[5], dev_id=1))
+        tg.start_soon(rd)
+    assert cl.n == 3
+    assert res[0] == res[1]
+    assert res[2] != res[0]
+
+
+@pytest.mark.anyio
+async def test_cache():
+    """Reads are cached until they expire or a write happens"""
+    cl = _Client()
+    rl = _Relay(cl, cache=0.2)
+
+    r1 = await rl._forward(_rd())  # noqa: SLF001
+    r2 = await rl._forward(_rd())  # noqa: SLF001
+    assert r1 is r2
+    assert cl.n == 1
+
+    await rl._forward(WriteSingleRegisterRequest(address=10, registers=[5], dev_id=1))  # noqa: SLF001
+    assert cl.n == 2
+    await rl._forward(_rd())  # noqa: SLF001
+    assert cl.n == 3
+
+    await anyio.sleep(0.3)
+    await rl._forward(_rd())  # noqa: SLF001
+    assert cl.n == 4
@@ -0,0 +1,55 @@
+"""
+Test the bus-wide poll scheduler
+"""
+
+from __future__ import annotations
+
+import anyio
+import pytest
+
+from moat.modbus.client import ModbusClient
+from moat.modbus.server import ModbusServer
+from moat.modbus.types import HoldingRegisters, IntValue
+
+
+@pytest.mark.anyio
+async def test_sched():
+    """Several slots on one scheduled host"""
+    async with ModbusServer(address="127.0.0.1", port=0) as srv:
+        sru = srv.add_unit(12)
+        for i in range(6):
+            sru.add(HoldingRegisters, i, IntValue(i))
+
+        async with (
+            ModbusClient() as cli,
+            cli.host("127.0.0.1", srv.port, sched=True) as clh,
+            clh.unit(12) as clu,
+        ):
+            sched = clh.scheduler
+            assert sched is not None
+
+            vals = []
+            async with anyio.create_task_group() as tg:
+                for i in range(6):
+                    cls = await tg.start(_slot, clu, i, 0.05 * (1 + i % 2))
+                    vals.append(cls.add(HoldingRegisters, i, IntValue()))
+                    cls.start()
+
+                await anyio.sleep(0.5)
+                st = sched.stats()
+                load = sched.load
+                tg.cancel_scope.cancel()
+
+            assert [v.value for v in vals] == list(range(6))
+            assert len(st) == 6
+            for s in st.values():
+                assert s["polls"] >= 3
+                assert s["cost"] is not None
+                assert s["rate"] is not None
+            assert 0 < load < 1
+
+
+async def _slot(unit, i, delay, *, task_status):
+    async with unit.slot(f"s{i}", read_delay=delay) as slot:
+        task_status.started(slot)
+        await anyio.sleep_forever()
@@ -0,0 +1,139 @@
+"""
+Tests for the broker's topic trees.
+"""
+
+from __future__ import annotations
+
+import logging
+import random
+import time
+
+from moat.mqtt.topic_tree import RetainedTree, SubscriptionTree
+from moat.mqtt.utils import match_topic
+
+log = logging.getLogger(__name__)
+
+FILTERS = [
+    "#",
+    "+",
+    "a",
+    "a/#",
+    "a/+",
+    "a/b",
+    "a/+/c",
+    "a/b/#",
+    "+/b/c",
+    "+/+/+",
+    "$SYS/#",
+    "$SYS/+/x",
+    "",
+    "/+",
+    "/topic",
+]
+TOPICS = ["a", "a/b", "a/b/c", "a/x/c", "x/b/c", "a/b/c/d", "$SYS/y/x", "$SYS", "", "/topic", "b"]
+
+
+def _linear(subs, topic):
+    return {k for k in subs if match_topic(topic, k)}
+
+
+def _tree(subs, topic):
+    res = set()
+    for lst in subs.match(topic):
+        res.add(lst[0])
+    return res
+
+
+def _fill(filters):
+    flat = {}
+    tree = SubscriptionTree()
+    for f in filters:
+        f = tuple(f.split("/"))
+        flat[f] = None
+        tree.setdefault(f).append(f)
+    return flat, tree
+
+
+def test_match_like_match_topic():  # noqa: D103
+    flat, tree = _fill(FILTERS)
+    for t in TOPICS:
+        t = t.split("/")
+        assert _tree(tree, t) == _linear(flat, t), t
+
+
+def test_delete_prunes():  # noqa: D103
+    flat, tree = _fill(FILTERS)
+    for f in list(flat):
+        del tree[f]
+        del flat[f]
+        for t in TOPICS:
+            t = t.split("/")
+            assert _tree(tree, t) == _linear(flat, t), (f, t)
+    assert not len(tree)
+    assert not tree._root.children  # noqa:SLF001
+
+
+def test_empty_list_skipped():  # noqa: D103
+    tree = SubscriptionTree()
+    tree.setdefault(("a", "+")).append(1)
+    assert list(tree.match(["a", "b"])) == [[1]]
+    tree["a", "+"].pop()
+    assert list(tree.match(["a", "b"])) == []
+    assert ("a", "+") in tree
+
+
+def test_retained_match():  # noqa: D103
+    ret = RetainedTree()
+    for t in TOPICS:
+        ret[t] = t
+    assert ret == {t: t for t in TOPICS}
+    for f in FILTERS:
+        f = f.split("/")
+        assert set(ret.match(f)) == {t for t in TOPICS if match_topic(t.split("/"), f)}, f
+
+
+def test_retained_delete():  # noqa: D103
+    ret = RetainedTree()
+    for t in TOPICS:
+        ret[t] = t
+    ret["a/b"] = "new"
+    assert list(ret.match(["a", "b"])) == ["new"]
+    del ret["a/b"]
+    assert list(ret.match(["a", "b"])) == []
+    assert "a/b/c" in set(ret.match(["a", "b", "+"]))
+    for t in TOPICS:
+        if t != "a/b":
+            del ret[t]
+    assert ret == {}
+    assert not ret._root.children  # noqa:SLF001
+
+
+def test_bench_10k():
+    """Compare the flat scan with the trie, using 10k filters."""
+    rnd = random.Random(42)
+    words = [f"w{i}" for i in range(20)]
+
+    def rfilter():
+        res = []
+        for _ in range(rnd.randint(1, 6)):
+            x = rnd.random()
+            res.append("+" if x < 0.1 else rnd.choice(words))
+        if rnd.random() < 0.1:
+            res.append("#")
+        return "/".join(res)
+
+    filters = set()
+    while len(filters) < 10000:
+        filters.add(rfilter())
+    flat, tree = _fill(filters)
+    topics = [[rnd.choice(words) for _ in range(rnd.randint(1, 6))] for _ in range(200)]
+
+    t1 = time.perf_counter()
+    r_flat = [_linear(flat, t) for t in topics]
+    t2 = time.perf_counter()
+    r_tree = [_tree(tree, t) for t in topics]
+    t3 = time.perf_counter()
+
+    assert r_flat == r_tree
+    log.info("10k filters, 200 topics: flat %.3fs, trie %.3fs", t2 - t1, t3 - t2)
+    assert t3 - t2 < t2 - t1
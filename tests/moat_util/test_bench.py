@@ -0,0 +1,47 @@
+"""
+Smoke test for the benchmark runner
+"""
+
+# ruff:noqa:D103
+from __future__ import annotations
+
+import json
+import pytest
+
+from moat.util import bench
+
+
+@pytest.mark.anyio
+async def test_bench():
+    seen = []
+    res = await bench.run(sizes=(10, 20), rounds=2, report=seen.append)
+    assert res == seen
+    names = {r.name for r in res}
+    for n in (
+        "codec.cbor.decode",
+        "codec.msgpack-py.encode",
+        "path.from_str",
+        "path.longen",
+        "link.node.load",
+        "kv.entry.walk",
+        "rpc.unix.batch32",
+        "bus.crc16.buf2",
+        "link.mqtt.decode.cached",
+    ):
+        assert n in names
+    assert all(len(r.times) == 2 for r in res)
+
+    old = json.loads(json.dumps(bench.save(res)))
+    assert old["results"][0]["size"] == 10
+    assert not list(bench.compare(old, old))
+
+    new = json.loads(json.dumps(old))
+    new["results"][0]["best"] *= 2
+    (slow,) = bench.compare(old, new)
+    assert slow[:2] == (res[0].name, 10)
+
+
+def test_gen_paths():
+    p = bench.gen_paths(1000)
+    assert len(set(p)) == 1000
+    assert p == sorted(p)
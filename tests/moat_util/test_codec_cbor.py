@@ -163,3 +163,20 @@ def test_tags():
     t = gen_stop(bar=123.5)
     assert t.tag == 1298493254
     assert t.value["bar"] == 123.5
+
+
+def test_bytewise():
+    codec = CBOR(min_memview_len=100)
+    p = [dict(a=b"x" * 300, b="ü" * 50, c=[1.5, -3, 2**40]), b"y" * 70000, "!"]
+    m = b"".join(codec.encode(x) for x in p)
+    r = []
+    for i in range(len(m)):
+        codec.feed(m[i : i + 1])
+        r.extend(iter(codec))
+    assert r == p
+
+    codec.feed(m)
+    r = list(iter(codec))
+    assert r == p
+    assert type(r[1]) is memoryview
+    assert type(r[0]["b"]) is str
@@ -15,9 +15,9 @@ from ipaddress import (
     IPv6Network,
 )
 
-from moat.util import attrdict
+from moat.util import OutOfData, P, attrdict
 from moat.lib.codec import get_codec
-from moat.lib.codec.msgpack import ExtType
+from moat.lib.codec.msgpack import ExtraData, ExtType
 from moat.lib.proxy import DProxy, as_proxy, name2obj
 
 as_proxy("_ip4", IPv4Address)
@@ -55,30 +55,38 @@ _val = [
 ]
 
 
-def test_basic():
-    codec = get_codec("std-msgpack")
+@pytest.fixture(params=[False, True], ids=["py", "c"])
+def fast(request):
+    "run each test with both backends"
+    if request.param:
+        pytest.importorskip("msgpack")
+    return request.param
+
+
+def test_basic(fast):
+    codec = get_codec("std-msgpack", fast=fast)
     for v in _val:
         w = codec.decode(codec.encode(v))
         assert v == w, (v, w)
 
 
-def test_bar():
+def test_bar(fast):
     b = Bar(95)
-    as_proxy("b_m", b)
-    codec = get_codec("std-msgpack")
+    as_proxy("b_m", b, replace=True)
+    codec = get_codec("std-msgpack", fast=fast)
     c = codec.decode(codec.encode(b))
     assert b == c
 
     cc = codec.encode(Bar(94))
-    dec = get_codec("msgpack")
+    dec = get_codec("msgpack", fast=fast)
     cd = dec.decode(cc)
     assert cd.code == 4
     assert name2obj(cd.data.decode("utf-8")).x == 94
 
 
 @pytest.mark.parametrize("chunks", [1, 2, 5])
-def test_chunked(chunks):
-    codec = get_codec("std-msgpack")
+def test_chunked(chunks, fast):
+    codec = get_codec("std-msgpack", fast=fast)
     p = [(dict(a=1, b=23, c=345, d=6789012345678901234567890, e="duh")), "!"]
     m = b"".join(codec.encode(x) for x in p)
     r = []
@@ -91,8 +99,8 @@ def test_chunked(chunks):
     assert r == p
 
 
-def test_ip():
-    codec = get_codec("std-msgpack")
+def test_ip(fast):
+    codec = get_codec("std-msgpack", fast=fast)
     adrs = (
         IPv4Address("1.23.45.181"),
         IPv6Address("FE80::12:34:0:0"),
@@ -108,9 +116,9 @@ def test_ip():
         assert str(a) == str(b)
 
 
-def test_dproxy():
+def test_dproxy(fast):
     # first manually construct such a thing
-    codec = get_codec("std-msgpack")
+    codec = get_codec("std-msgpack", fast=fast)
     d = ("FuBar", 1, 2, 42, {"one": "two", "three": "four"})
     p = codec.encode(ExtType(5, b"".join(codec.encode(x) for x in d)))
     dp = codec.decode(p)
@@ -121,3 +129,83 @@ def test_dproxy():
     assert dp["three" == "four"]
     pp = codec.encode(dp)
     assert codec.decode(p) == codec.decode(pp)
+
+
+_same = [
+    None,
+    True,
+    -1,
+    -33,
+    200,
+    -40000,
+    2**40,
+    -(2**40),
+    6789012345678901234567890,
+    99.5,
+    "",
+    "x" * 40,
+    "ü" * 200,
+    b"\x00\xff",
+    b"y" * 70000,
+    [1, [2, [3, 4]], {}],
+    {"a": {1: 2, b"b": [None]}},
+    P("a.b:3.c"),
+    Foo(23),
+    ExtType(42, b"abc"),
+    ValueError("duh", 2),
+]
+
+
+@pytest.mark.parametrize("v", _same, ids=repr)
+def test_backends_agree(v):
+    pytest.importorskip("msgpack")
+    py = get_codec("std-msgpack", fast=False)
+    c = get_codec("std-msgpack", fast=True)
+    m = py.encode(v)
+    mc = c.encode(v)
+    # The Python packer emits map entries in reverse order.
+    assert len(mc) == len(m)
+    for a, b in ((py.decode(m), c.decode(m)), (py.decode(mc), c.decode(mc))):
+        assert type(a) is type(b)
+        if isinstance(v, ExtType):
+            assert (a.code, a.data) == (b.code, b.data)
+        elif not isinstance(v, Exception):
+            assert a == b == v
+
+
+def test_errors(fast):
+    codec = get_codec("std-msgpack", fast=fast)
+    m = codec.encode([1, 2, 3])
+    with pytest.raises(OutOfData):
+        codec.decode(m[:-1])
+    with pytest.raises(ExtraData) as exc:
+        codec.decode(m + b"\x01")
+    assert exc.value.unpacked == [1, 2, 3]
+
+
+def test_unfeed(fast):
+    codec = get_codec("msgpack", fast=fast)
+    codec.feed(b"\x01abc\x02")
+    assert next(codec) == 1
+    buf = bytearray(3)
+    assert codec.unfeed(buf) == 3
+    assert buf == b"abc"
+    assert next(codec) == 2
+    assert codec.unfeed(buf) == 0
+
+
+def test_bytewise():
+    codec = get_codec("msgpack", fast=False, min_memview_len=100)
+    p = [dict(a=b"x" * 300, b="ü" * 50, c=[1.5, -3, 2**40]), b"y" * 70000, "!"]
+    m = b"".join(codec.encode(x) for x in p)
+    r = []
+    for i in range(len(m)):
+        codec.feed(m[i : i + 1])
+        r.extend(codec)
+    assert r == p
+
+    codec.feed(m)
+    r = list(codec)
+    assert r == p
+    assert type(r[1]) is memoryview
+    assert type(r[0]["b"]) is str